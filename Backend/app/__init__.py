@@ -28,6 +28,15 @@ def create_app(config_object='config.Config'):
     app.config.from_object(config_class)
     _apply_environment_overrides(app)
     
+    from app.json_provider import create_json_provider
+    app.json = create_json_provider(app)
+    
+    from app.cache import init_cache
+    init_cache(app)
+    
+    from app.password_hashing import init_password_hasher
+    init_password_hasher(app)
+    
     # Initialize extensions
     db.init_app(app)
     jwt.init_app(app)
@@ -39,10 +48,14 @@ def create_app(config_object='config.Config'):
     from app.api.v1 import api_v1
     app.register_blueprint(api_v1)
     
+    from app.cli import register_commands
+    register_commands(app)
+    
     # Create database tables
     with app.app_context():
         db.create_all()
         _ensure_schema_integrity()
+        _ensure_search_indexes(app)
         _ensure_default_admin(app)
     
     @app.route('/')
@@ -77,6 +90,64 @@ def _ensure_schema_integrity():
         with db.engine.begin() as connection:
             connection.execute(text('ALTER TABLE users ADD COLUMN is_admin BOOLEAN NOT NULL DEFAULT 0'))
 
+    for column, source, length in (('email_normalized', 'email', 120), ('username_normalized', 'username', 80)):
+        if column in user_columns:
+            continue
+        with db.engine.begin() as connection:
+            connection.execute(text(f'ALTER TABLE users ADD COLUMN {column} VARCHAR({length})'))
+            rows = connection.execute(text(f'SELECT id, {source} FROM users ORDER BY created_at, id')).all()
+            # The oldest account keeps a value that differs from others only in case;
+            # the rest stay NULL (exact-match logins only) so the unique index can be built
+            seen = set()
+            updates = []
+            for row in rows:
+                normalized = row[1].strip().lower()
+                if normalized not in seen:
+                    seen.add(normalized)
+                    updates.append({'id': row.id, 'value': normalized})
+            if updates:
+                connection.execute(text(f'UPDATE users SET {column} = :value WHERE id = :id'), updates)
+
+    from app.models.place import RATING_AGGREGATE_COLUMNS
+    place_columns = {column['name'] for column in inspector.get_columns('places')}
+    missing_aggregates = [name for name in RATING_AGGREGATE_COLUMNS if name not in place_columns]
+    if missing_aggregates:
+        with db.engine.begin() as connection:
+            for name in missing_aggregates:
+                connection.execute(text(f'ALTER TABLE places ADD COLUMN {name} INTEGER NOT NULL DEFAULT 0'))
+        from app.repositories.place_repository import PlaceRepository
+        PlaceRepository().recompute_rating_aggregates()
+
+    if 'geohash' not in place_columns:
+        from app.models import geohash
+        with db.engine.begin() as connection:
+            connection.execute(text('ALTER TABLE places ADD COLUMN geohash VARCHAR(12)'))
+            rows = connection.execute(text(
+                'SELECT id, latitude, longitude FROM places WHERE latitude IS NOT NULL AND longitude IS NOT NULL'
+            )).all()
+            updates = [
+                {'id': row.id, 'geohash': geohash.encode_or_none(row.latitude, row.longitude)}
+                for row in rows
+            ]
+            if updates:
+                connection.execute(text('UPDATE places SET geohash = :geohash WHERE id = :id'), updates)
+
+    photo_columns = {column['name'] for column in inspector.get_columns('photos')}
+    if 'renditions' not in photo_columns:
+        with db.engine.begin() as connection:
+            connection.execute(text('ALTER TABLE photos ADD COLUMN renditions JSON'))
+
+    # create_all() skips existing tables, so indexes added to models later are created here
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=db.engine, checkfirst=True)
+
+
+def _ensure_search_indexes(app):
+    """Create full-text indexes and record which search backend is active."""
+    from app.repositories.search_index import ensure_search_indexes
+    app.extensions['naya_full_text'] = ensure_search_indexes(db.engine)
+
 
 def _apply_environment_overrides(app):
     """Refresh configuration settings that depend on environment variables."""
@@ -112,7 +183,7 @@ def _ensure_default_admin(app):
 
     from app.models.user import User
 
-    existing = User.query.filter_by(email=admin_email).first()
+    existing = User.query.filter_by(email_normalized=admin_email).first()
     if existing:
         changed = False
         if not existing.is_admin:
@@ -126,6 +197,8 @@ def _ensure_default_admin(app):
                 app.logger.warning('Provided ADMIN_DEFAULT_PASSWORD is invalid; skipping password update')
         if changed:
             db.session.commit()
+            from app.services.user_snapshots import invalidate_user_snapshots
+            invalidate_user_snapshots([existing.id])
             app.logger.info('Updated admin account %s', admin_email)
         return
 
@@ -136,7 +209,7 @@ def _ensure_default_admin(app):
     base_username = admin_email.split('@')[0] or 'admin'
     username = base_username
     suffix = 1
-    while User.query.filter_by(username=username).first():
+    while User.query.filter_by(username_normalized=username.lower()).first():
         username = f"{base_username}{suffix}"
         suffix += 1
 
@@ -26,6 +26,10 @@ def create_v1_blueprint():
     from .photos import photos_bp
     v1_bp.register_blueprint(photos_bp, url_prefix='/photos')
     
+    # Import and register admin routes
+    from .admin import admin_bp
+    v1_bp.register_blueprint(admin_bp, url_prefix='/admin')
+    
     return v1_bp
 
 # Create the blueprint instance
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Admin API endpoints
+"""
+
+from datetime import datetime, timezone
+
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.services.export_service import EXPORT_FILTERS, EXPORT_MODELS, ExportService
+from app.services.import_service import IMPORT_KINDS, ImportService, read_records
+from app.services.user_snapshots import load_user_snapshot
+from app.cache import get_cache
+from app.password_hashing import get_password_hasher
+from app.repositories.pending_file_deletion_repository import PendingFileDeletionRepository
+
+admin_bp = Blueprint('admin', __name__)
+pending_file_deletion_repository = PendingFileDeletionRepository()
+import_service = ImportService()
+export_service = ExportService()
+
+_IMPORT_MIMETYPES = {'text/csv': 'csv', 'application/x-ndjson': 'ndjson', 'application/jsonl': 'ndjson'}
+_EXPORT_MIMETYPES = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}
+
+def _load_requester(user_id):
+    """Return the caller's snapshot, raising ValueError for unknown users"""
+    requester = load_user_snapshot(user_id)
+    if not requester:
+        raise ValueError("User not found")
+    return requester
+
+@admin_bp.route('/metrics', methods=['GET'])
+@jwt_required()
+def get_metrics():
+    """Get cache, password hashing and file deletion counters for monitoring (admin only)"""
+    try:
+        if not _load_requester(get_jwt_identity()).is_admin:
+            return jsonify({
+                'success': False,
+                'error': 'Admin privileges required'
+            }), 403
+        
+        return jsonify({
+            'success': True,
+            'metrics': {
+                'cache': get_cache().metrics(),
+                'password_hashing': get_password_hasher().metrics(),
+                'file_deletions': {
+                    'pending': pending_file_deletion_repository.count_pending()
+                }
+            }
+        }), 200
+        
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 404
+    except Exception:
+        return jsonify({
+            'success': False,
+            'error': 'Internal server error'
+        }), 500
+
+@admin_bp.route('/import/<kind>', methods=['POST'])
+@jwt_required()
+def import_data(kind):
+    """
+    Bulk import places or reviews (admin only)
+    The body is NDJSON or CSV, sent raw or as a multipart 'file'. The format comes
+    from ?format= or the content type. Reviews without user_id are attributed to the caller.
+    """
+    try:
+        current_user_id = get_jwt_identity()
+        if not _load_requester(current_user_id).is_admin:
+            return jsonify({
+                'success': False,
+                'error': 'Admin privileges required'
+            }), 403
+        
+        if kind not in IMPORT_KINDS:
+            return jsonify({
+                'success': False,
+                'error': f"Unsupported import type. Use one of: {', '.join(IMPORT_KINDS)}"
+            }), 404
+        
+        upload = request.files.get('file')
+        stream = upload.stream if upload else request.stream
+        mimetype = upload.mimetype if upload else request.mimetype
+        fmt = (request.args.get('format') or _IMPORT_MIMETYPES.get(mimetype, 'ndjson')).lower()
+        
+        report = import_service.import_records(kind, read_records(stream, fmt), default_user_id=current_user_id)
+        return jsonify({
+            'success': True,
+            'report': report
+        }), 200
+        
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception:
+        return jsonify({
+            'success': False,
+            'error': 'Internal server error'
+        }), 500
+
+@admin_bp.route('/export/<kind>', methods=['GET'])
+@jwt_required()
+def export_data(kind):
+    """
+    Stream reviews, places or photo metadata as NDJSON or CSV (admin only)
+    Query: format (ndjson|csv), since, until, place_id, country, user_id
+    """
+    try:
+        if not _load_requester(get_jwt_identity()).is_admin:
+            return jsonify({
+                'success': False,
+                'error': 'Admin privileges required'
+            }), 403
+        
+        if kind not in EXPORT_MODELS:
+            return jsonify({
+                'success': False,
+                'error': f"Unsupported export type. Use one of: {', '.join(EXPORT_MODELS)}"
+            }), 404
+        
+        fmt = request.args.get('format', 'ndjson').lower()
+        filters = {name: request.args.get(name) for name in EXPORT_FILTERS}
+        rows = export_service.export(kind, fmt, filters)
+        
+        filename = f"naya-{kind}-{datetime.now(timezone.utc):%Y%m%dT%H%M%SZ}.{fmt}"
+        return Response(
+            stream_with_context(rows),
+            mimetype=_EXPORT_MIMETYPES[fmt],
+            headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+        )
+        
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception:
+        return jsonify({
+            'success': False,
+            'error': 'Internal server error'
+        }), 500
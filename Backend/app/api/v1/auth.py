@@ -5,11 +5,20 @@ Authentication API endpoints
 
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity, create_access_token
+from app.models import Photo, Place, Review, User
+from app.password_hashing import PasswordHashingBusy
 from app.services.auth import AuthService
+from .conditional import conditional
 
 auth_bp = Blueprint('auth', __name__)
 auth_service = AuthService()
 
+def _busy_response(error):
+    """503 for requests refused because the password hashing queue is full"""
+    response = jsonify({"error": str(error)})
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
 @auth_bp.route('/register', methods=['POST'])
 def register():
     """Register new user"""
@@ -24,6 +33,8 @@ def register():
         
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
+    except PasswordHashingBusy as e:
+        return _busy_response(e)
     except Exception as e:
         return jsonify({"error": "Registration failed"}), 500
 
@@ -47,11 +58,14 @@ def login():
         
     except ValueError as e:
         return jsonify({"error": str(e)}), 401
+    except PasswordHashingBusy as e:
+        return _busy_response(e)
     except Exception as e:
         return jsonify({"error": "Login failed"}), 500
 
 @auth_bp.route('/profile', methods=['GET'])
 @jwt_required()
+@conditional(User)
 def get_profile():
     """Get user profile"""
     try:
@@ -105,6 +119,8 @@ def change_password():
         
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
+    except PasswordHashingBusy as e:
+        return _busy_response(e)
     except Exception as e:
         return jsonify({"error": "Failed to change password"}), 500
 
@@ -124,6 +140,7 @@ def deactivate_account():
 
 @auth_bp.route('/stats', methods=['GET'])
 @jwt_required()
+@conditional(User, Review, Place, Photo)
 def get_user_stats():
     """Get user statistics"""
     try:
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Conditional GET support for API v1 endpoints
+"""
+
+import hashlib
+from functools import wraps
+
+from flask import current_app, make_response, request
+
+from app.repositories.base_repository import get_change_marker
+
+
+def conditional(*model_classes):
+    """
+    Answer If-None-Match from the state of the tables a view reads
+    
+    The ETag hashes the request path, the caller's credentials and the row count
+    plus latest ``updated_at`` of every listed table, so it can be checked with
+    one aggregate query and a 304 is returned without running the view.
+    No Last-Modified is sent and If-Modified-Since is ignored: deletes do not
+    advance ``updated_at`` and dates only have one-second precision, so only
+    the ETag (which includes row counts) validates reliably.
+    Args:
+        *model_classes: Models whose rows appear in the response
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            try:
+                markers = get_change_marker(model_classes)
+            except Exception:
+                current_app.logger.warning('Change marker unavailable for %s', request.path, exc_info=True)
+                return view(*args, **kwargs)
+            
+            authorization = request.headers.get('Authorization', '')
+            digest = hashlib.sha256(
+                f'{request.full_path}|{authorization}|{markers!r}'.encode('utf-8')
+            ).hexdigest()[:40]
+            
+            if request.if_none_match.contains_weak(digest):
+                response = current_app.response_class(status=304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            
+            response.set_etag(digest)
+            # Always revalidate; responses for signed-in callers stay out of shared caches
+            response.headers['Cache-Control'] = 'private, no-cache' if authorization else 'no-cache'
+            return response
+        return wrapper
+    return decorator
+
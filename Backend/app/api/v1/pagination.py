@@ -0,0 +1,20 @@
+#!/usr/bin/env python3
+"""
+Pagination helpers for API v1 endpoints
+"""
+
+from flask import current_app, request
+
+
+def get_pagination_args():
+    """
+    Read ``limit`` and ``cursor`` query parameters
+    Returns:
+        tuple: (page size clamped to MAX_PAGE_SIZE, cursor or None)
+    """
+    default_size = current_app.config.get('DEFAULT_PAGE_SIZE', 20)
+    max_size = current_app.config.get('MAX_PAGE_SIZE', 100)
+    limit = request.args.get('limit', default_size, type=int)
+    limit = max(1, min(limit, max_size))
+    cursor = request.args.get('cursor') or None
+    return limit, cursor
@@ -3,37 +3,46 @@
 Photos API endpoints
 """
 
+import mimetypes
 import os
+from urllib.parse import quote
 
-from flask import Blueprint, request, jsonify, current_app, send_from_directory
+from flask import Blueprint, request, jsonify, current_app, abort, send_file
+from werkzeug.utils import send_file as send_file_from_path
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.models import Photo, Review, User
 from app.services.photo_service import PhotoService
+from app.services.photo_storage import locate_stored_file, upload_root
+from .conditional import conditional
+from .pagination import get_pagination_args
 
 photos_bp = Blueprint('photos', __name__)
 photo_service = PhotoService()
 
 @photos_bp.route('', methods=['GET'])
+@conditional(Photo, User, Review)
 def get_photos():
     """Get photos with optional filters"""
     try:
         # Get query parameters
         user_id = request.args.get('user_id')
         review_id = request.args.get('review_id')
-        limit = request.args.get('limit', 20, type=int)
+        limit, cursor = get_pagination_args()
         
         # Apply filters
         if user_id:
-            photos = photo_service.get_photos_by_user(user_id, limit)
+            photos, next_cursor = photo_service.get_photos_page(limit, cursor, user_id=user_id)
         elif review_id:
-            photos = photo_service.get_photos_by_review(review_id, limit)
+            photos, next_cursor = photo_service.get_photos_page(limit, cursor, review_id=review_id)
         else:
             # Get recent photos by default
-            photos = photo_service.get_recent_photos(limit)
+            photos, next_cursor = photo_service.get_photos_page(limit, cursor)
         
         return jsonify({
             'success': True,
             'photos': photos,
-            'count': len(photos)
+            'count': len(photos),
+            'next_cursor': next_cursor
         }), 200
         
     except ValueError as e:
@@ -100,15 +109,41 @@ def create_photo():
 
 @photos_bp.route('/files/<path:filename>', methods=['GET'])
 def serve_photo_file(filename):
-    """Serve uploaded photo files."""
-    upload_folder = current_app.config.get('UPLOAD_FOLDER', 'uploads')
-    if not os.path.isabs(upload_folder):
-        directory = os.path.join(current_app.root_path, upload_folder)
+    """
+    Serve uploaded photo files
+    Stored names never change content, so responses are cacheable forever. Depending
+    on PHOTO_DELIVERY the bytes are sent by Flask (with range support), or handed to
+    the fronting web server through X-Sendfile or X-Accel-Redirect.
+    """
+    # Files live in the sharded layout, or flat if not migrated yet
+    stored_name = locate_stored_file(filename)
+    if stored_name is None:
+        abort(404)
+    path = os.path.join(upload_root(), stored_name)
+    
+    delivery = current_app.config.get('PHOTO_DELIVERY', 'direct')
+    if delivery == 'x-accel-redirect':
+        prefix = current_app.config.get('PHOTO_ACCEL_REDIRECT_PREFIX', '/protected-uploads/')
+        response = current_app.response_class(
+            mimetype=mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        )
+        response.headers['X-Accel-Redirect'] = f"{prefix.rstrip('/')}/{quote(stored_name)}"
+    elif delivery == 'x-sendfile':
+        response = send_file_from_path(
+            path, request.environ, use_x_sendfile=True, conditional=True,
+            response_class=current_app.response_class, _root_path=current_app.root_path
+        )
     else:
-        directory = upload_folder
-    return send_from_directory(directory, filename)
+        # conditional=True answers If-None-Match/If-Modified-Since and Range requests
+        response = send_file(path, conditional=True)
+    
+    response.headers['Cache-Control'] = (
+        f"public, max-age={current_app.config.get('PHOTO_CACHE_MAX_AGE', 31536000)}, immutable"
+    )
+    return response
 
 @photos_bp.route('/<photo_id>', methods=['GET'])
+@conditional(Photo, User, Review)
 def get_photo(photo_id):
     """Get specific photo by ID"""
     try:
@@ -208,18 +243,26 @@ def delete_photo(photo_id):
 
 @photos_bp.route('/orphaned', methods=['GET'])
 @jwt_required()
+@conditional(Photo, User)
 def get_orphaned_photos():
     """Get photos not associated with any review (owner only)"""
     try:
         user_id = get_jwt_identity()
-        photos = photo_service.get_orphaned_photos(user_id)
+        limit, cursor = get_pagination_args()
+        photos, next_cursor = photo_service.get_orphaned_photos_page(user_id, limit, cursor)
         
         return jsonify({
             'success': True,
             'photos': photos,
-            'count': len(photos)
+            'count': len(photos),
+            'next_cursor': next_cursor
         }), 200
         
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
     except PermissionError as e:
         return jsonify({
             'success': False,
@@ -230,3 +273,43 @@ def get_orphaned_photos():
             'success': False,
             'error': 'Internal server error'
         }), 500
+
+@photos_bp.route('/attach', methods=['POST'])
+@jwt_required()
+def attach_photos():
+    """Link several orphaned photos to a review in one request"""
+    try:
+        user_id = get_jwt_identity()
+        data = request.get_json(silent=True) or {}
+        
+        if not data.get('review_id'):
+            return jsonify({
+                'success': False,
+                'error': 'review_id is required'
+            }), 400
+        
+        result = photo_service.attach_photos_to_review(
+            data['review_id'], data.get('photo_ids'), user_id
+        )
+        
+        return jsonify({
+            'success': True,
+            'data': result
+        }), 200
+        
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except PermissionError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 403
+    except Exception:
+        current_app.logger.exception('Failed to attach photos')
+        return jsonify({
+            'success': False,
+            'error': 'Internal server error'
+        }), 500
@@ -5,12 +5,17 @@ Places API endpoints
 
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.models import Photo, Place, Review, User
+from app.repositories.base_repository import decode_cursor
 from app.services.place_service import PlaceService
+from .conditional import conditional
+from .pagination import get_pagination_args
 
 places_bp = Blueprint('places', __name__)
 place_service = PlaceService()
 
 @places_bp.route('', methods=['GET'])
+@conditional(Place)
 def get_places():
     """Get places with optional filters"""
     try:
@@ -18,15 +23,20 @@ def get_places():
         search = request.args.get('search')
         country = request.args.get('country')
         city = request.args.get('city')
-        limit = request.args.get('limit', 20, type=int)
+        limit, cursor = get_pagination_args()
+        next_cursor = None
         
         # Apply filters
-        places = place_service.search_places(search_term=search or '', city=city or '', country=country or '', limit=limit)
+        if search and not city and not country:
+            places = place_service.search_places(search_term=search, limit=limit)
+        else:
+            places, next_cursor = place_service.get_places_page(limit, cursor, city=city or '', country=country or '')
         
         return jsonify({
             'success': True,
             'places': places,
-            'count': len(places)
+            'count': len(places),
+            'next_cursor': next_cursor
         }), 200
         
     except Exception as e:
@@ -67,6 +77,7 @@ def create_place():
         }), 500
 
 @places_bp.route('/<place_id>', methods=['GET'])
+@conditional(Place)
 def get_place(place_id):
     """Get specific place"""
     try:
@@ -148,19 +159,30 @@ def delete_place(place_id):
         }), 500
 
 @places_bp.route('/<place_id>/reviews', methods=['GET'])
+@conditional(Review, User, Place, Photo)
 def get_place_reviews(place_id):
     """Get reviews for place"""
     try:
         from app.services.review_service import ReviewService
         review_service = ReviewService()
         
-        limit = request.args.get('limit', 20, type=int)
-        reviews = review_service.get_reviews_by_place(place_id, limit)
+        limit, cursor = get_pagination_args()
+        if cursor:
+            # A malformed cursor is a bad request; ValueErrors below mean an unknown place
+            try:
+                decode_cursor(cursor)
+            except ValueError as e:
+                return jsonify({
+                    'success': False,
+                    'error': str(e)
+                }), 400
+        reviews, next_cursor = review_service.get_reviews_page(limit, cursor, place_id=place_id)
         
         return jsonify({
             'success': True,
             'reviews': reviews,
-            'count': len(reviews)
+            'count': len(reviews),
+            'next_cursor': next_cursor
         }), 200
         
     except ValueError as e:
@@ -175,6 +197,7 @@ def get_place_reviews(place_id):
         }), 500
 
 @places_bp.route('/search', methods=['GET'])
+@conditional(Place)
 def search_places():
     """Search places"""
     try:
@@ -201,6 +224,7 @@ def search_places():
         }), 500
 
 @places_bp.route('/nearby', methods=['GET'])
+@conditional(Place)
 def get_nearby_places():
     """Get nearby places"""
     try:
@@ -5,12 +5,16 @@ Reviews API endpoints
 
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.models import Photo, Place, Review, User
 from app.services.review_service import ReviewService
+from .conditional import conditional
+from .pagination import get_pagination_args
 
 reviews_bp = Blueprint('reviews', __name__)
 review_service = ReviewService()
 
 @reviews_bp.route('', methods=['GET'])
+@conditional(Review, User, Place, Photo)
 def get_reviews():
     """Get reviews with optional filters"""
     try:
@@ -18,23 +22,25 @@ def get_reviews():
         user_id = request.args.get('user_id')
         place_id = request.args.get('place_id')
         search = request.args.get('search')
-        limit = request.args.get('limit', 20, type=int)
+        limit, cursor = get_pagination_args()
+        next_cursor = None
         
         # Apply filters
         if user_id:
-            reviews = review_service.get_reviews_by_user(user_id, limit)
+            reviews, next_cursor = review_service.get_reviews_page(limit, cursor, user_id=user_id)
         elif place_id:
-            reviews = review_service.get_reviews_by_place(place_id, limit)
+            reviews, next_cursor = review_service.get_reviews_page(limit, cursor, place_id=place_id)
         elif search:
             reviews = review_service.search_reviews(search, limit)
         else:
             # Get recent reviews by default
-            reviews = review_service.get_recent_reviews(limit)
+            reviews, next_cursor = review_service.get_reviews_page(limit, cursor)
         
         return jsonify({
             'success': True,
             'reviews': reviews,
-            'count': len(reviews)
+            'count': len(reviews),
+            'next_cursor': next_cursor
         }), 200
         
     except ValueError as e:
@@ -83,6 +89,7 @@ def create_review():
         }), 500
 
 @reviews_bp.route('/<review_id>', methods=['GET'])
+@conditional(Review, User, Place, Photo)
 def get_review(review_id):
     """Get specific review by ID"""
     try:
@@ -181,6 +188,7 @@ def delete_review(review_id):
         }), 500
 
 @reviews_bp.route('/statistics/<place_id>', methods=['GET'])
+@conditional(Place)
 def get_place_statistics(place_id):
     """Get rating statistics for a place"""
     try:
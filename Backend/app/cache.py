@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+Application cache for NAYA Travel Journal
+
+CACHE_BACKEND selects where cached payloads live:
+
+- ``memory``: a bounded LRU in the current process (default)
+- ``redis``: any Redis-protocol server at CACHE_URL, shared by all workers
+- ``null``: caching disabled
+
+Services use named namespaces. Each key (and each namespace) carries a
+version token, and values are stored under the pair. Invalidating drops the
+token, and the next reader creates a fresh one. A load that raced a write is therefore stored under a
+stale token that nobody reads again. Backend errors are logged and treated
+as misses, so an unavailable cache never fails a request.
+"""
+
+import logging
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from flask import current_app
+
+logger = logging.getLogger(__name__)
+
+EXTENSION_KEY = 'naya_cache'
+_MISSING = object()
+# Version tokens outlive the values stored under them
+_VERSION_TTL = 30 * 24 * 3600
+
+
+class MemoryCache:
+    """Bounded, thread-safe in-process LRU cache with per-entry expiry"""
+
+    name = 'memory'
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _live(self, key: str, now: float):
+        entry = self._entries.get(key)
+        if entry is None:
+            return _MISSING
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= now:
+            del self._entries[key]
+            return _MISSING
+        self._entries.move_to_end(key)
+        return value
+
+    def _store(self, key: str, value: Any, ttl: Optional[float]) -> None:
+        self._entries[key] = (time.monotonic() + ttl if ttl else None, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get_many(self, keys: List[str]) -> List[Any]:
+        now = time.monotonic()
+        with self._lock:
+            return [self._live(key, now) for key in keys]
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        with self._lock:
+            self._store(key, value, ttl)
+
+    def get_tokens(self, keys: List[str]) -> List[Optional[int]]:
+        return [None if value is _MISSING else value for value in self.get_many(keys)]
+
+    def add_token(self, key: str, token: int, ttl: float) -> None:
+        with self._lock:
+            if self._live(key, time.monotonic()) is _MISSING:
+                self._store(key, token, ttl)
+
+    def delete(self, keys: List[str]) -> None:
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def size(self) -> Optional[int]:
+        return len(self._entries)
+
+
+class RedisCache:
+    """Cache stored on a Redis-protocol server (requires the ``redis`` package)"""
+
+    name = 'redis'
+
+    def __init__(self, url: Optional[str] = None, client=None):
+        if client is None:
+            try:
+                import redis
+            except ImportError:
+                raise ValueError("CACHE_BACKEND is 'redis' but the redis package is not installed")
+            client = redis.Redis.from_url(url)
+        self.client = client
+
+    def get_many(self, keys: List[str]) -> List[Any]:
+        return [_MISSING if raw is None else pickle.loads(raw) for raw in self.client.mget(keys)]
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self.client.set(key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), ex=int(ttl) if ttl else None)
+
+    def get_tokens(self, keys: List[str]) -> List[Optional[int]]:
+        # Tokens are stored as plain integers rather than pickles
+        return [None if raw is None else int(raw) for raw in self.client.mget(keys)]
+
+    def add_token(self, key: str, token: int, ttl: float) -> None:
+        self.client.set(key, token, ex=int(ttl), nx=True)
+
+    def delete(self, keys: List[str]) -> None:
+        if keys:
+            self.client.delete(*keys)
+
+    def size(self) -> Optional[int]:
+        return None
+
+
+class NullCache:
+    """Backend that stores nothing"""
+
+    name = 'null'
+
+    def get_many(self, keys: List[str]) -> List[Any]:
+        return [_MISSING] * len(keys)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        pass
+
+    def get_tokens(self, keys: List[str]) -> List[Optional[int]]:
+        return [None] * len(keys)
+
+    def add_token(self, key: str, token: int, ttl: float) -> None:
+        pass
+
+    def delete(self, keys: List[str]) -> None:
+        pass
+
+    def size(self) -> Optional[int]:
+        return 0
+
+
+class CacheNamespace:
+    """Versioned keys within one namespace of the application cache"""
+
+    def __init__(self, cache: 'Cache', name: str, ttl: Optional[float] = None):
+        self.cache = cache
+        self.name = name
+        self.ttl = ttl if ttl is not None else cache.default_ttl
+        self._prefix = f'{cache.key_prefix}:{name}'
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.errors = 0
+
+    @property
+    def _generation_key(self) -> str:
+        return f'{self._prefix}:generation'
+
+    def _version_key(self, key: str) -> str:
+        return f'{self._prefix}:{key}:version'
+
+    def _versions(self, keys: List[str]) -> List[Optional[str]]:
+        """
+        Current version per key: the namespace generation plus the key's own
+        token, creating missing tokens (None when no token could be stored)
+        """
+        backend = self.cache.backend
+        token_keys = [self._generation_key] + [self._version_key(key) for key in keys]
+        tokens = backend.get_tokens(token_keys)
+        missing = [index for index, token in enumerate(tokens) if token is None]
+        if missing:
+            new_token = time.time_ns()
+            for index in missing:
+                backend.add_token(token_keys[index], new_token, _VERSION_TTL)
+            # Re-read: a concurrent reader may have stored its token first
+            for index, token in zip(missing, backend.get_tokens([token_keys[i] for i in missing])):
+                tokens[index] = token
+        generation = tokens[0]
+        if generation is None:
+            return [None] * len(keys)
+        return [None if token is None else f'{generation}.{token}' for token in tokens[1:]]
+
+    def _value_key(self, key: str, version: str) -> str:
+        return f'{self._prefix}:{key}:v{version}'
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """
+        Fetch several keys
+        Args:
+            keys (iterable): Keys within the namespace
+        Returns:
+            dict: Cached values for the keys that were found
+        """
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return {}
+        try:
+            versions = self._versions(keys)
+            lookups = [(key, self._value_key(key, version))
+                       for key, version in zip(keys, versions) if version is not None]
+            values = self.cache.backend.get_many([value_key for _, value_key in lookups]) if lookups else []
+        except Exception:
+            self._record_error('get')
+            self.misses += len(keys)
+            return {}
+        found = {key: value for (key, _), value in zip(lookups, values) if value is not _MISSING}
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Fetch one key, returning default on a miss"""
+        return self.get_many([key]).get(key, default)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None, version: Any = _MISSING) -> None:
+        """
+        Store a value
+        Args:
+            key (str): Key within the namespace
+            value: Picklable value
+            ttl (float, optional): Seconds to keep it; the namespace default when omitted
+            version: Version read before the value was computed (see get_or_load)
+        """
+        try:
+            if version is _MISSING:
+                version = self._versions([key])[0]
+            if version is not None:
+                self.cache.backend.set(self._value_key(key, version), value, ttl or self.ttl)
+        except Exception:
+            self._record_error('set')
+
+    def get_or_load(self, key: str, loader: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        """
+        Return the cached value, or compute, store and return it
+        Args:
+            key (str): Key within the namespace
+            loader (callable): Computes the value; exceptions propagate uncached
+            ttl (float, optional): Seconds to keep a loaded value
+        Returns:
+            Cached or freshly loaded value
+        """
+        try:
+            version = self._versions([key])[0]
+            value = _MISSING
+            if version is not None:
+                value = self.cache.backend.get_many([self._value_key(key, version)])[0]
+        except Exception:
+            self._record_error('get')
+            version, value = _MISSING, _MISSING
+        if value is not _MISSING:
+            self.hits += 1
+            return value
+        self.misses += 1
+        value = loader()
+        if version not in (_MISSING, None):
+            self.set(key, value, ttl, version=version)
+        return value
+
+    def delete(self, keys: Iterable[str]) -> None:
+        """Invalidate keys; the next reader starts a new version"""
+        keys = [key for key in keys if key]
+        try:
+            self.cache.backend.delete([self._version_key(key) for key in keys])
+            self.invalidations += len(keys)
+        except Exception:
+            self._record_error('delete')
+
+    def clear(self) -> None:
+        """Invalidate every key in the namespace"""
+        try:
+            self.cache.backend.delete([self._generation_key])
+            self.invalidations += 1
+        except Exception:
+            self._record_error('clear')
+
+    def metrics(self) -> Dict[str, Any]:
+        """Counters for monitoring (this process only)"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'invalidations': self.invalidations,
+            'errors': self.errors,
+            'hit_ratio': self.hits / lookups if lookups else None,
+        }
+
+    def _record_error(self, operation: str) -> None:
+        self.errors += 1
+        logger.warning('Cache %s failed in namespace %s', operation, self.name, exc_info=True)
+
+
+class Cache:
+    """Application cache: a backend plus its namespaces"""
+
+    def __init__(self, backend, key_prefix: str = 'naya', default_ttl: float = 300):
+        self.backend = backend
+        self.key_prefix = key_prefix
+        self.default_ttl = default_ttl
+        self._namespaces: Dict[str, CacheNamespace] = {}
+        self._lock = threading.Lock()
+
+    def namespace(self, name: str, ttl: Optional[float] = None) -> CacheNamespace:
+        """Return the namespace with this name, creating it on first use"""
+        namespace = self._namespaces.get(name)
+        if namespace is None:
+            with self._lock:
+                namespace = self._namespaces.setdefault(name, CacheNamespace(self, name, ttl))
+        return namespace
+
+    def metrics(self) -> Dict[str, Any]:
+        """Backend description and per-namespace counters"""
+        return {
+            'backend': self.backend.name,
+            'entries': self.backend.size(),
+            'namespaces': {name: namespace.metrics() for name, namespace in self._namespaces.items()},
+        }
+
+
+def create_cache(config) -> Cache:
+    """
+    Build the application cache from configuration
+    Args:
+        config: Flask config mapping
+    Returns:
+        Cache: Configured cache
+    Raises:
+        ValueError: If the backend is unknown or its client library is missing
+    """
+    backend_name = (config.get('CACHE_BACKEND') or 'memory').lower()
+    if backend_name == 'memory':
+        backend = MemoryCache(max_entries=config.get('CACHE_MAX_ENTRIES', 10000))
+    elif backend_name == 'redis':
+        url = config.get('CACHE_URL')
+        if not url:
+            raise ValueError("CACHE_BACKEND is 'redis' but CACHE_URL is not set")
+        backend = RedisCache(url)
+    elif backend_name == 'null':
+        backend = NullCache()
+    else:
+        raise ValueError(f"Unknown CACHE_BACKEND: {backend_name}")
+    return Cache(backend, key_prefix=config.get('CACHE_KEY_PREFIX', 'naya'),
+                 default_ttl=config.get('CACHE_DEFAULT_TTL', 300))
+
+
+def init_cache(app) -> Cache:
+    """Create the application cache and register it on the app"""
+    cache = create_cache(app.config)
+    app.extensions[EXTENSION_KEY] = cache
+    return cache
+
+
+def get_cache() -> Cache:
+    """Return the current application's cache"""
+    cache = current_app.extensions.get(EXTENSION_KEY)
+    if cache is None:
+        cache = init_cache(current_app)
+    return cache
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Maintenance CLI commands for NAYA Travel Journal
+"""
+
+import click
+
+
+def register_commands(app):
+    """Attach maintenance commands to the Flask CLI."""
+
+    @app.cli.command('recompute-aggregates')
+    @click.option('--place-id', 'place_ids', multiple=True, help='Only repair these places (repeatable).')
+    def recompute_aggregates(place_ids):
+        """Rebuild place rating aggregates from the reviews table."""
+        from app.services.place_service import PlaceService
+
+        updated = PlaceService().recompute_rating_aggregates(list(place_ids) or None)
+        click.echo(f'Recomputed rating aggregates for {updated} place(s)')
+
+    @app.cli.command('rebuild-search-index')
+    def rebuild_search_index():
+        """Re-index reviews and places for full-text search."""
+        from app import db
+        from app.repositories.search_index import rebuild_search_indexes
+
+        rebuild_search_indexes(db.engine)
+        click.echo('Search index rebuilt')
+
+    @app.cli.command('generate-renditions')
+    @click.option('--batch-size', default=100, show_default=True, help='Photos rendered per batch.')
+    def generate_renditions_command(batch_size):
+        """Render thumbnails for photos uploaded before renditions existed."""
+        from app.repositories.photo_repository import PhotoRepository
+        from app.services.photo_service import PhotoService
+        from app.services.renditions import generate_renditions, renditions_available
+
+        if not renditions_available():
+            raise click.ClickException('Pillow is not installed')
+
+        repository = PhotoRepository()
+        service = PhotoService()
+        rendered = skipped = 0
+        while True:
+            batch = repository.get_without_renditions(batch_size)
+            if not batch:
+                break
+            for photo in batch:
+                source_path, _ = service._resolve_storage_paths(photo.filename)
+                try:
+                    renditions = generate_renditions(source_path, photo.filename,
+                                                     app.config.get('PHOTO_RENDITION_SIZES'))
+                    rendered += 1
+                except Exception as error:
+                    # Recorded as empty so the photo is not retried on every run
+                    click.echo(f'Skipping {photo.filename}: {error}', err=True)
+                    renditions = {}
+                    skipped += 1
+                repository.set_renditions(photo.id, renditions)
+        click.echo(f'Rendered {rendered} photo(s), skipped {skipped}')
+
+    @app.cli.command('migrate-upload-layout')
+    @click.option('--batch-size', default=500, show_default=True, help='Photos migrated per transaction.')
+    @click.option('--after', 'after_id', default=None, help='Resume after this photo id.')
+    def migrate_upload_layout(batch_size, after_id):
+        """Move uploads into the sharded directory layout and update photo paths."""
+        from app.services.photo_service import PhotoService
+
+        moved = updated = missing = 0
+        for batch in PhotoService().migrate_storage_layout(batch_size, after_id):
+            moved += batch['moved']
+            updated += batch['updated']
+            missing += batch['missing']
+            click.echo(f"Migrated through photo {batch['last_id']} (resume with --after {batch['last_id']})")
+        click.echo(f'Moved {moved} file(s), updated {updated} photo(s), {missing} file(s) missing')
+
+    @app.cli.command('process-file-deletions')
+    @click.option('--limit', type=int, default=None, help='Stop after this many queued files.')
+    def process_file_deletions(limit):
+        """Remove the files of deleted photos whose deletion is due."""
+        from app.services.file_deletions import process_pending_file_deletions
+
+        counts = process_pending_file_deletions(limit)
+        click.echo(f"Removed {counts['removed']} file(s), kept {counts['kept']} still in use, "
+                   f"{counts['failed']} failed (will retry)")
+
+    @app.cli.command('import-data')
+    @click.argument('kind', type=click.Choice(['places', 'reviews']))
+    @click.argument('source', type=click.File('rb'))
+    @click.option('--format', 'fmt', type=click.Choice(['ndjson', 'csv']), default=None,
+                  help='Input format (default: from the file extension, else ndjson).')
+    @click.option('--user-id', default=None, help='Author of reviews that carry no user_id.')
+    @click.option('--chunk-size', type=int, default=None, help='Records per transaction.')
+    def import_data(kind, source, fmt, user_id, chunk_size):
+        """Bulk import places or reviews from an NDJSON or CSV file ('-' for stdin)."""
+        import json
+
+        from app.services.import_service import ImportService, read_records
+
+        if fmt is None:
+            fmt = 'csv' if source.name.lower().endswith('.csv') else 'ndjson'
+        report = ImportService().import_records(kind, read_records(source, fmt),
+                                                default_user_id=user_id, chunk_size=chunk_size)
+        for error in report['errors']:
+            click.echo(f"Row {error['row']}: {error['error']}", err=True)
+        if report['errors_truncated']:
+            click.echo('(further errors omitted)', err=True)
+        click.echo(json.dumps({key: report[key] for key in ('processed', 'created', 'failed')}))
+
+    @app.cli.command('export-data')
+    @click.argument('kind', type=click.Choice(['reviews', 'places', 'photos']))
+    @click.option('--format', 'fmt', type=click.Choice(['ndjson', 'csv']), default='ndjson', show_default=True)
+    @click.option('--output', type=click.File('w', encoding='utf-8'), default='-', help='Destination file (default: stdout).')
+    @click.option('--since', default=None, help='Created on or after this ISO date/datetime.')
+    @click.option('--until', default=None, help='Created on or before this ISO date/datetime.')
+    @click.option('--place-id', default=None, help='Only rows for this place.')
+    @click.option('--country', default=None, help='Only rows for places in this country.')
+    @click.option('--user-id', default=None, help='Only rows by this user (places: reviewed by them).')
+    def export_data(kind, fmt, output, since, until, place_id, country, user_id):
+        """Stream reviews, places or photo metadata as NDJSON or CSV."""
+        from app.services.export_service import ExportService
+
+        filters = {'since': since, 'until': until, 'place_id': place_id, 'country': country, 'user_id': user_id}
+        try:
+            rows = ExportService().export(kind, fmt, filters)
+        except ValueError as error:
+            raise click.BadParameter(str(error))
+        for chunk in rows:
+            output.write(chunk)
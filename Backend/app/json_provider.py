@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+JSON providers for NAYA Travel Journal
+
+``orjson`` encodes and parses API payloads when it is installed; otherwise the
+standard library provider is used. Both write dates and datetimes as ISO 8601
+strings and UUIDs as plain strings, so responses look the same either way.
+"""
+
+import dataclasses
+import decimal
+import uuid
+from datetime import date
+from typing import Any
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    """Encode values neither encoder handles natively"""
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, (decimal.Decimal, uuid.UUID)):
+        return str(value)
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    if hasattr(value, '__html__'):
+        return str(value.__html__())
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class StdlibJSONProvider(DefaultJSONProvider):
+    """Flask's default provider, with ISO 8601 dates instead of HTTP dates"""
+
+    default = staticmethod(_default)
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider backed by orjson"""
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.option = orjson.OPT_NON_STR_KEYS  # rating distributions use integer keys
+
+    def _options(self, pretty: bool) -> int:
+        option = self.option
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        pretty = bool(kwargs.pop('indent', None))
+        kwargs.pop('sort_keys', None)
+        kwargs.pop('default', None)
+        if kwargs:
+            # Options orjson has no equivalent for (cls, separators, ...)
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=_default, option=self._options(pretty)).decode()
+
+    def loads(self, s, **kwargs: Any) -> Any:
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        pretty = self.compact is False or (self.compact is None and self._app.debug)
+        body = orjson.dumps(obj, default=_default,
+                            option=self._options(pretty) | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def create_json_provider(app) -> DefaultJSONProvider:
+    """
+    Build the JSON provider selected by the JSON_BACKEND setting
+    Args:
+        app: Flask application
+    Returns:
+        JSON provider ('auto' prefers orjson and falls back to the stdlib)
+    Raises:
+        ValueError: If orjson is requested but not installed, or the backend is unknown
+    """
+    backend = (app.config.get('JSON_BACKEND') or 'auto').lower()
+    if backend not in ('auto', 'orjson', 'stdlib'):
+        raise ValueError(f"Unknown JSON_BACKEND: {backend}")
+    if backend == 'orjson' and orjson is None:
+        raise ValueError("JSON_BACKEND is 'orjson' but orjson is not installed")
+    if backend != 'stdlib' and orjson is not None:
+        return OrjsonProvider(app)
+    return StdlibJSONProvider(app)
@@ -8,5 +8,6 @@ from .user import User
 from .place import Place
 from .review import Review
 from .photo import Photo
+from .pending_file_deletion import PendingFileDeletion
 
-__all__ = ['BaseModel', 'User', 'Place', 'Review', 'Photo']
\ No newline at end of file
+__all__ = ['BaseModel', 'User', 'Place', 'Review', 'Photo', 'PendingFileDeletion']
\ No newline at end of file
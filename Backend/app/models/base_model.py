@@ -3,10 +3,11 @@
 Base Model for NAYA Travel Journal
 """
 
-from datetime import datetime, date, timezone
+from datetime import datetime, timezone
 import uuid
 
 from app import db
+from app.models.serializer import serializer_for
 
 
 def _utcnow():
@@ -16,6 +17,8 @@ def _utcnow():
 class BaseModel(db.Model):
     """Base class for all models"""
     __abstract__ = True
+    # Columns left out of to_dict()
+    __serializer_exclude__ = ()
     
     id = db.Column(db.String(60), primary_key=True, default=lambda: str(uuid.uuid4()))
     created_at = db.Column(db.DateTime(timezone=True), default=_utcnow, nullable=False)
@@ -47,17 +50,7 @@ class BaseModel(db.Model):
     
     def to_dict(self):
         """Convert instance to dictionary"""
-        dict_repr = {}
-        for key, value in self.__dict__.items():
-            if key.startswith('_'):
-                continue
-            if isinstance(value, datetime):
-                dict_repr[key] = value.isoformat()
-            elif isinstance(value, date):
-                dict_repr[key] = value.isoformat()
-            else:
-                dict_repr[key] = value
-        return dict_repr
+        return serializer_for(type(self))(self)
     
     def update(self, **kwargs):
         """Update instance attributes"""
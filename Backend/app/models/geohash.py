@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Geohash helpers for NAYA Travel Journal
+
+A geohash interleaves longitude and latitude bits into a base32 string, so
+places sharing a prefix lie in the same cell and a plain string index can
+serve proximity lookups.
+"""
+
+import math
+from typing import List, Optional, Tuple
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+DEFAULT_PRECISION = 9  # ~5m x 5m cells
+EARTH_RADIUS_KM = 6371.0
+# Great-circle length of one degree on the sphere haversine_km uses
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+
+def encode(latitude: float, longitude: float, precision: int = DEFAULT_PRECISION) -> str:
+    """Encode coordinates as a geohash of the given length"""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(chars) < precision:
+        interval, value = (lon_range, longitude) if even else (lat_range, latitude)
+        mid = (interval[0] + interval[1]) / 2
+        if value >= mid:
+            bits = (bits << 1) | 1
+            interval[0] = mid
+        else:
+            bits <<= 1
+            interval[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(BASE32[bits])
+            bits = 0
+            bit_count = 0
+    return ''.join(chars)
+
+
+def cell_degrees(precision: int) -> Tuple[float, float]:
+    """Return (latitude, longitude) span in degrees of a cell at this precision"""
+    total_bits = precision * 5
+    lon_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return 180.0 / (2 ** lat_bits), 360.0 / (2 ** lon_bits)
+
+
+def covered_radius_km(precision: int, latitude: float) -> float:
+    """
+    Distance around a point that is guaranteed to fall inside the 3x3 block of
+    cells centred on the point's cell (the smallest cell dimension, measured at
+    the block's poleward edge).
+    """
+    lat_span, lon_span = cell_degrees(precision)
+    edge_latitude = min(90.0, abs(latitude) + lat_span)
+    width_km = lon_span * KM_PER_DEGREE * math.cos(math.radians(edge_latitude))
+    return min(lat_span * KM_PER_DEGREE, width_km)
+
+
+def neighbourhood(latitude: float, longitude: float, precision: int) -> List[str]:
+    """Return the point's cell and its (up to) eight neighbours"""
+    lat_span, lon_span = cell_degrees(precision)
+    center_lat = (math.floor((latitude + 90.0) / lat_span) + 0.5) * lat_span - 90.0
+    center_lon = (math.floor((longitude + 180.0) / lon_span) + 0.5) * lon_span - 180.0
+    cells = []
+    for dlat in (-1, 0, 1):
+        lat = center_lat + dlat * lat_span
+        if lat <= -90.0 or lat >= 90.0:
+            continue
+        for dlon in (-1, 0, 1):
+            lon = (center_lon + dlon * lon_span + 180.0) % 360.0 - 180.0
+            cell = encode(lat, lon, precision)
+            if cell not in cells:
+                cells.append(cell)
+    return cells
+
+
+def precision_for_radius(radius_km: float, latitude: float) -> int:
+    """Finest precision whose 3x3 neighbourhood still covers the radius (0 if none does)"""
+    for precision in range(DEFAULT_PRECISION, 0, -1):
+        if covered_radius_km(precision, latitude) >= radius_km:
+            return precision
+    return 0
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two points in kilometers"""
+    lat1, lon1, lat2, lon2 = map(math.radians, [lat1, lon1, lat2, lon2])
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+    a = math.sin(dlat / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def encode_or_none(latitude, longitude) -> Optional[str]:
+    """Encode coordinates, returning None when either is missing or invalid"""
+    try:
+        lat = float(latitude)
+        lon = float(longitude)
+    except (TypeError, ValueError):
+        return None
+    if not (-90.0 <= lat <= 90.0 and -180.0 <= lon <= 180.0):
+        return None
+    return encode(lat, lon)
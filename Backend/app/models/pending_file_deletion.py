@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+"""
+Pending File Deletion Model for NAYA Travel Journal
+"""
+
+from app import db
+from app.models.base_model import BaseModel, _utcnow
+
+class PendingFileDeletion(BaseModel):
+    """Stored photo file queued for removal once its rows are gone"""
+    __tablename__ = 'pending_file_deletions'
+    __table_args__ = (
+        # The worker picks up due entries oldest first
+        db.Index('ix_pending_file_deletions_next_attempt_at', 'next_attempt_at', 'id'),
+    )
+    
+    filename = db.Column(db.String(255), nullable=False)
+    file_path = db.Column(db.String(500), nullable=False)
+    renditions = db.Column(db.JSON(none_as_null=True))
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime(timezone=True), nullable=False, default=_utcnow)
+    last_error = db.Column(db.Text)
+    
+    def __repr__(self):
+        return f'<PendingFileDeletion {self.filename}>'
@@ -9,11 +9,24 @@ from app.models.base_model import BaseModel
 class Photo(BaseModel):
     """Photo model for travel journal"""
     __tablename__ = 'photos'
+    __table_args__ = (
+        # Listings filter by review or uploader and page through (created_at, id)
+        db.Index('ix_photos_review_id_created_at', 'review_id', 'created_at', 'id'),
+        db.Index('ix_photos_user_id_created_at', 'user_id', 'created_at', 'id'),
+        # Per-user orphaned photos (review_id IS NULL)
+        db.Index('ix_photos_user_id_review_id', 'user_id', 'review_id', 'created_at', 'id'),
+        db.Index('ix_photos_created_at', 'created_at', 'id'),
+        # Shared content-addressed files are reference counted by filename
+        db.Index('ix_photos_filename', 'filename'),
+    )
     
     filename = db.Column(db.String(255), nullable=False)
     original_name = db.Column(db.String(255), nullable=False)
     file_path = db.Column(db.String(500), nullable=False)
     description = db.Column(db.Text)
+    # Downscaled copies stored next to the original: {size: {format: filename}};
+    # null until rendered, empty if the file could not be rendered
+    renditions = db.Column(db.JSON(none_as_null=True))
     
     # Foreign keys
     user_id = db.Column(db.String(60), db.ForeignKey('users.id'), nullable=False)
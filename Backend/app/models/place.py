@@ -3,22 +3,106 @@
 Place Model for NAYA Travel Journal
 """
 
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import validates
+
 from app import db
+from app.models import geohash
 from app.models.base_model import BaseModel
 
+# Denormalised per-star review counters, keyed by rating value
+RATING_COUNT_COLUMNS = {rating: f'rating_{rating}_count' for rating in range(1, 6)}
+RATING_AGGREGATE_COLUMNS = ('review_count', 'rating_sum') + tuple(RATING_COUNT_COLUMNS.values())
+
 class Place(BaseModel):
     """Place model for travel destinations"""
     __tablename__ = 'places'
+    # Raw rating counters are exposed via statistics
+    __serializer_exclude__ = tuple(column for column in RATING_AGGREGATE_COLUMNS if column != 'review_count')
+    __table_args__ = (
+        # Duplicate detection and get-or-create look places up by their identity
+        db.Index('ix_places_name_city_country', 'name', 'city', 'country'),
+        db.Index('ix_places_created_at', 'created_at', 'id'),
+    )
     
     name = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text)
-    city = db.Column(db.String(100), nullable=False)
-    country = db.Column(db.String(100), nullable=False)
+    city = db.Column(db.String(100), nullable=False, index=True)
+    country = db.Column(db.String(100), nullable=False, index=True)
     latitude = db.Column(db.Float)
     longitude = db.Column(db.Float)
+    geohash = db.Column(db.String(12), index=True)
+    
+    # Rating aggregates, maintained by ReviewService alongside review writes
+    review_count = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    rating_sum = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    rating_1_count = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    rating_2_count = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    rating_3_count = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    rating_4_count = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    rating_5_count = db.Column(db.Integer, default=0, server_default='0', nullable=False)
     
     # Relationships
     reviews = db.relationship('Review', backref='place', lazy=True, cascade='all, delete-orphan')
     
+    @validates('latitude', 'longitude')
+    def _sync_geohash(self, key, value):
+        """Keep the indexed geohash cell in step with the coordinates"""
+        latitude = value if key == 'latitude' else self.latitude
+        longitude = value if key == 'longitude' else self.longitude
+        self.geohash = geohash.encode_or_none(latitude, longitude)
+        return value
+    
+    @property
+    def average_rating(self) -> Optional[float]:
+        """Average review rating, or None when the place has no reviews"""
+        if not self.review_count:
+            return None
+        return self.rating_sum / self.review_count
+    
+    @property
+    def rating_distribution(self) -> Dict[int, int]:
+        """Number of reviews per star rating (1-5)"""
+        return {rating: getattr(self, column) or 0 for rating, column in RATING_COUNT_COLUMNS.items()}
+    
+    def record_rating_change(self, added: Optional[int] = None, removed: Optional[int] = None) -> None:
+        """
+        Adjust rating aggregates for a review being added, removed or re-rated.
+        Values are written as SQL increments so concurrent writers cannot lose updates;
+        they are flushed with the surrounding review transaction.
+        """
+        deltas = {column: 0 for column in RATING_AGGREGATE_COLUMNS}
+        if added:
+            deltas['review_count'] += 1
+            deltas['rating_sum'] += added
+            deltas[RATING_COUNT_COLUMNS[added]] += 1
+        if removed:
+            deltas['review_count'] -= 1
+            deltas['rating_sum'] -= removed
+            deltas[RATING_COUNT_COLUMNS[removed]] -= 1
+        
+        self._apply_rating_deltas(deltas)
+    
+    def record_ratings_added(self, ratings: Iterable[int]) -> None:
+        """Adjust rating aggregates for several new reviews at once (bulk imports)"""
+        deltas = {column: 0 for column in RATING_AGGREGATE_COLUMNS}
+        for rating in ratings:
+            deltas['review_count'] += 1
+            deltas['rating_sum'] += rating
+            deltas[RATING_COUNT_COLUMNS[rating]] += 1
+        self._apply_rating_deltas(deltas)
+    
+    def _apply_rating_deltas(self, deltas: Dict[str, int]) -> None:
+        # A place not yet inserted has no row to increment
+        persistent = inspect(self).persistent
+        for column, delta in deltas.items():
+            if delta:
+                if persistent:
+                    setattr(self, column, getattr(type(self), column) + delta)
+                else:
+                    setattr(self, column, (getattr(self, column) or 0) + delta)
+    
     def __repr__(self):
-        return f'<Place {self.name}>'
\ No newline at end of file
+        return f'<Place {self.name}>'
@@ -9,6 +9,12 @@ from app.models.base_model import BaseModel
 class Review(BaseModel):
     """Review model for travel places"""
     __tablename__ = 'reviews'
+    __table_args__ = (
+        # Listings filter by author or place and page through (created_at, id)
+        db.Index('ix_reviews_place_id_created_at', 'place_id', 'created_at', 'id'),
+        db.Index('ix_reviews_user_id_created_at', 'user_id', 'created_at', 'id'),
+        db.Index('ix_reviews_created_at', 'created_at', 'id'),
+    )
     
     title = db.Column(db.String(200), nullable=False)
     content = db.Column(db.Text, nullable=False)
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Column-driven model serializers for NAYA Travel Journal
+
+A serializer is compiled once per model class (and field subset): the column
+list, the value getters and the fields needing conversion are resolved up
+front, so turning a row into a dict is a single C-level fetch plus a handful of
+conversions instead of a type-checked walk over the instance ``__dict__``.
+"""
+
+from operator import attrgetter, itemgetter, methodcaller
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import Boolean, Date, DateTime, inspect
+
+_serializers: Dict[Tuple[type, Optional[Tuple[str, ...]]], 'ModelSerializer'] = {}
+
+
+_isoformat = methodcaller('isoformat')
+
+
+class ModelSerializer:
+    """Serialise instances of one model class to JSON-ready dicts"""
+
+    def __init__(self, model_class: type, fields: Optional[Iterable[str]] = None):
+        columns = {attr.key: attr.columns[0].type for attr in inspect(model_class).column_attrs}
+        if fields is None:
+            excluded = set(getattr(model_class, '__serializer_exclude__', ()))
+            fields = [name for name in columns if name not in excluded]
+        else:
+            fields = list(fields)
+            unknown = [name for name in fields if name not in columns]
+            if unknown:
+                raise ValueError(f"Unknown {model_class.__name__} fields: {', '.join(unknown)}")
+
+        self.model_class = model_class
+        self.fields: Tuple[str, ...] = tuple(fields)
+        self._temporal_fields = tuple(
+            name for name in self.fields if isinstance(columns[name], (DateTime, Date))
+        )
+        # Flags not yet defaulted by a flush serialise as False rather than null
+        self._boolean_fields = tuple(
+            name for name in self.fields if isinstance(columns[name], Boolean)
+        )
+        # Loaded values are read straight from the instance dict; the instrumented
+        # attributes are only used when something is expired or not yet loaded.
+        # Both getters return a bare value rather than a tuple for a single field.
+        state_getter = itemgetter(*self.fields)
+        attribute_getter = attrgetter(*self.fields)
+        if len(self.fields) == 1:
+            self._state_getter = lambda state: (state_getter(state),)
+            self._attribute_getter = lambda obj: (attribute_getter(obj),)
+        else:
+            self._state_getter = state_getter
+            self._attribute_getter = attribute_getter
+
+    def __call__(self, obj) -> Dict[str, Any]:
+        try:
+            values = self._state_getter(obj.__dict__)
+        except KeyError:
+            values = self._attribute_getter(obj)
+        data = dict(zip(self.fields, values))
+        for name in self._temporal_fields:
+            value = data[name]
+            if value is not None:
+                data[name] = _isoformat(value)
+        for name in self._boolean_fields:
+            if data[name] is None:
+                data[name] = False
+        return data
+
+    def many(self, objects: Iterable[Any]):
+        """Serialise an iterable of instances"""
+        return [self(obj) for obj in objects]
+
+
+def serializer_for(model_class: type, fields: Optional[Iterable[str]] = None) -> ModelSerializer:
+    """
+    Return the cached serializer for a model class
+    Args:
+        model_class (type): Mapped model class
+        fields (iterable, optional): Column subset, in output order; defaults to
+            every column not listed in the class ``__serializer_exclude__``
+    Returns:
+        ModelSerializer: Compiled serializer, shared by all callers
+    """
+    key = (model_class, tuple(fields) if fields is not None else None)
+    serializer = _serializers.get(key)
+    if serializer is None:
+        serializer = _serializers[key] = ModelSerializer(model_class, fields)
+    return serializer
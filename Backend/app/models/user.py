@@ -3,14 +3,30 @@
 User Model for NAYA Travel Journal
 """
 
-from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy.orm import validates
+
 from app.models.base_model import BaseModel, db
+from app.password_hashing import get_password_hasher
+from app.models.serializer import serializer_for
+
+PUBLIC_FIELDS = ('id', 'username', 'first_name', 'last_name', 'bio', 'location', 'created_at')
+
+
+def normalize_login(value):
+    """Case-insensitive form of an email address or username"""
+    return value.strip().lower() if isinstance(value, str) else value
+
 
 class User(BaseModel):
     """User model for authentication and profiles"""
     __tablename__ = 'users'
+    __serializer_exclude__ = ('password_hash', 'email_normalized', 'username_normalized')
     email = db.Column(db.String(120), unique=True, nullable=False, index=True)
     username = db.Column(db.String(80), unique=True, nullable=False, index=True)
+    # Lower-cased copies for case-insensitive lookups and uniqueness; NULL only for
+    # legacy rows whose value clashed with an older account's when the columns were added
+    email_normalized = db.Column(db.String(120), unique=True, index=True)
+    username_normalized = db.Column(db.String(80), unique=True, index=True)
     password_hash = db.Column(db.String(255), nullable=False)
     
     # Profile information (Travel Journal specific)
@@ -35,38 +51,31 @@ class User(BaseModel):
         if password:
             self.set_password(password)
     
+    @validates('email', 'username')
+    def _sync_normalized(self, key, value):
+        """Keep the lower-cased lookup columns in step"""
+        setattr(self, f'{key}_normalized', normalize_login(value))
+        return value
+    
     def set_password(self, password):
-        """Hash password"""
+        """Hash password (on the bounded hashing pool; may raise PasswordHashingBusy)"""
         if not password or len(password) < 6:
             raise ValueError("Password must be at least 6 characters long")
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = get_password_hasher().hash(password)
     
     def check_password(self, password):
-        """Check if provided password matches hash"""
+        """Check if provided password matches hash (may raise PasswordHashingBusy)"""
         if not password or not self.password_hash:
             return False
-        return check_password_hash(self.password_hash, password)
+        return get_password_hasher().verify(self.password_hash, password)
     
-    def to_dict(self):
-        """Convert user to dictionary (exclude sensitive data)"""
-        user_dict = super().to_dict()
-        # Remove sensitive information
-        user_dict.pop('password_hash', None)
-        # Ensure boolean flags present
-        user_dict['is_admin'] = bool(user_dict.get('is_admin'))
-        return user_dict
+    def password_needs_rehash(self):
+        """Whether the stored hash predates the configured hash parameters"""
+        return bool(self.password_hash) and get_password_hasher().needs_rehash(self.password_hash)
     
     def to_public_dict(self):
         """Public user information for display"""
-        return {
-            'id': self.id,
-            'username': self.username,
-            'first_name': self.first_name,
-            'last_name': self.last_name,
-            'bio': self.bio,
-            'location': self.location,
-            'created_at': self.created_at.isoformat() if self.created_at else None
-        }
+        return serializer_for(User, PUBLIC_FIELDS)(self)
     
     @property
     def full_name(self):
@@ -77,13 +86,15 @@ class User(BaseModel):
     
     @property
     def reviews_count(self):
-        """Get number of reviews by user"""
-        return len(self.reviews)
+        """Get number of reviews by user (COUNT query, the relationship stays unloaded)"""
+        from app.models.review import Review
+        return db.session.query(db.func.count(Review.id)).filter(Review.user_id == self.id).scalar()
     
     @property
     def photos_count(self):
-        """Get number of photos by user"""
-        return len(self.photos)
+        """Get number of photos by user (COUNT query, the relationship stays unloaded)"""
+        from app.models.photo import Photo
+        return db.session.query(db.func.count(Photo.id)).filter(Photo.user_id == self.id).scalar()
     
     def validate_email(self):
         """Validate email format"""
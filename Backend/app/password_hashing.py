@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Password hashing for NAYA Travel Journal
+
+Password hashes are deliberately slow, so they run on a small dedicated
+thread pool instead of on every request thread at once. Werkzeug's scrypt
+and pbkdf2 release the GIL while hashing. At most PASSWORD_HASH_WORKERS
+hashes run concurrently and PASSWORD_HASH_QUEUE_SIZE more may wait. Beyond
+that, callers get PasswordHashingBusy immediately (served as a 503), so a
+login burst cannot starve cheap requests.
+
+PASSWORD_HASH_METHOD takes any Werkzeug method string (e.g.
+``scrypt:32768:8:1`` or ``pbkdf2:sha256:600000``). Stored hashes made with
+other parameters are reported by needs_rehash, so they can be upgraded at
+the next successful login.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from flask import current_app
+from werkzeug.security import check_password_hash, generate_password_hash
+
+EXTENSION_KEY = 'naya_password_hasher'
+
+
+class PasswordHashingBusy(RuntimeError):
+    """Raised when the hashing queue is full"""
+
+
+class PasswordHasher:
+    """Bounded executor for password hashing and verification"""
+
+    def __init__(self, method: str = 'pbkdf2', workers: int = 2, max_queue: int = 16):
+        self.method = method
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='naya-password-hash')
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+        self._lock = threading.Lock()
+        self._canonical_method: Optional[str] = None
+        self._pending = 0
+        self._running = 0
+        self._operations = 0
+        self._rejected = 0
+        self._total_seconds = 0.0
+        self._max_seconds = 0.0
+
+    def hash(self, password: str) -> str:
+        """
+        Hash a password with the configured method
+        Raises:
+            PasswordHashingBusy: If the queue is full
+        """
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, password_hash: str, password: str) -> bool:
+        """
+        Check a password against a stored hash
+        Raises:
+            PasswordHashingBusy: If the queue is full
+        """
+        return self._run(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        """Whether a stored hash was made with other parameters than the configured ones"""
+        return password_hash.split('$', 1)[0] != self._get_canonical_method()
+
+    def metrics(self) -> Dict[str, Any]:
+        """Counters for monitoring (this process only)"""
+        method = self._get_canonical_method().split(':', 1)[0]
+        with self._lock:
+            return {
+                'method': method,
+                'workers': self.workers,
+                'max_queue': self.max_queue,
+                'running': self._running,
+                'queue_depth': self._pending - self._running,
+                'operations': self._operations,
+                'rejected': self._rejected,
+                'avg_ms': round(self._total_seconds * 1000 / self._operations, 2) if self._operations else None,
+                'max_ms': round(self._max_seconds * 1000, 2),
+            }
+
+    def _get_canonical_method(self) -> str:
+        # Werkzeug fills in default parameters ('pbkdf2' -> 'pbkdf2:sha256:600000');
+        # learn the full form once from a throwaway hash
+        if self._canonical_method is None:
+            self._canonical_method = generate_password_hash('', self.method).split('$', 1)[0]
+        return self._canonical_method
+
+    def _run(self, function: Callable, *args) -> Any:
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise PasswordHashingBusy("Too many password operations in progress, retry shortly")
+        with self._lock:
+            self._pending += 1
+        try:
+            return self._executor.submit(self._timed, function, *args).result()
+        finally:
+            with self._lock:
+                self._pending -= 1
+            self._slots.release()
+
+    def _timed(self, function: Callable, *args) -> Any:
+        with self._lock:
+            self._running += 1
+        started = time.perf_counter()
+        try:
+            return function(*args)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self._running -= 1
+                self._operations += 1
+                self._total_seconds += elapsed
+                self._max_seconds = max(self._max_seconds, elapsed)
+
+
+def init_password_hasher(app) -> PasswordHasher:
+    """Create the password hasher from configuration and register it on the app"""
+    hasher = PasswordHasher(
+        method=app.config.get('PASSWORD_HASH_METHOD', 'pbkdf2'),
+        workers=app.config.get('PASSWORD_HASH_WORKERS', 2),
+        max_queue=app.config.get('PASSWORD_HASH_QUEUE_SIZE', 16),
+    )
+    app.extensions[EXTENSION_KEY] = hasher
+    return hasher
+
+
+def get_password_hasher() -> PasswordHasher:
+    """Return the current application's password hasher"""
+    hasher = current_app.extensions.get(EXTENSION_KEY)
+    if hasher is None:
+        hasher = init_password_hasher(current_app)
+    return hasher
@@ -3,10 +3,51 @@
 Repository Pattern for NAYA Travel Journal
 """
 
+import base64
+import binascii
+import json
 from abc import ABC, abstractmethod
-from typing import List, Optional, Dict, Any
+from datetime import datetime
+from typing import List, Optional, Dict, Any, Iterable, Tuple
 from app import db
 
+
+def encode_cursor(created_at: datetime, obj_id: str) -> str:
+    """Encode a (created_at, id) position as an opaque pagination cursor"""
+    raw = json.dumps([created_at.isoformat(), obj_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """
+    Decode a cursor produced by encode_cursor
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, obj_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return datetime.fromisoformat(created_at), str(obj_id)
+    except (binascii.Error, UnicodeError, TypeError, ValueError):
+        raise ValueError("Invalid cursor")
+
+
+def get_change_marker(model_classes: Iterable[type]) -> List[Tuple[int, Optional[datetime]]]:
+    """
+    Summarise the current state of several tables in one query
+    Args:
+        model_classes (iterable): Models with an ``updated_at`` column
+    Returns:
+        list: (row count, latest updated_at) per model, in the given order
+    """
+    model_classes = list(model_classes)
+    columns = []
+    for model_class in model_classes:
+        columns.append(db.select(db.func.count()).select_from(model_class).scalar_subquery())
+        columns.append(db.select(db.func.max(model_class.updated_at)).scalar_subquery())
+    row = db.session.execute(db.select(*columns)).one()
+    return [(row[index * 2], row[index * 2 + 1]) for index in range(len(model_classes))]
+
 class BaseRepository(ABC):
     """Abstract base repository for CRUD operations"""
     
@@ -59,6 +100,17 @@ class SQLAlchemyRepository(BaseRepository):
         except Exception:
             return None
     
+    def get_many(self, obj_ids: Iterable[str]) -> Dict[str, Any]:
+        """Get objects by IDs in a single query, keyed by ID"""
+        ids = {obj_id for obj_id in obj_ids if obj_id}
+        if not ids:
+            return {}
+        try:
+            objects = self.model_class.query.filter(self.model_class.id.in_(ids)).all()
+            return {obj.id: obj for obj in objects}
+        except Exception:
+            return {}
+    
     def get_all(self, limit: Optional[int] = None, offset: Optional[int] = None) -> List[Any]:
         """Get all objects with optional pagination"""
         try:
@@ -74,6 +126,37 @@ class SQLAlchemyRepository(BaseRepository):
         except Exception:
             return []
     
+    def get_page(self, limit: int, cursor: Optional[str] = None, query=None) -> Tuple[List[Any], Optional[str]]:
+        """
+        Get one page of objects, newest first, using keyset pagination on (created_at, id)
+        Args:
+            limit (int): Page size
+            cursor (str, optional): Cursor returned with the previous page
+            query (optional): Filtered base query, defaults to all objects
+        Returns:
+            Tuple of (objects, cursor for the next page or None)
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        model = self.model_class
+        query = query if query is not None else model.query
+        if cursor:
+            created_at, last_id = decode_cursor(cursor)
+            query = query.filter(db.or_(
+                model.created_at < created_at,
+                db.and_(model.created_at == created_at, model.id < last_id)
+            ))
+        
+        try:
+            items = query.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1).all()
+        except Exception:
+            return [], None
+        
+        if len(items) <= limit:
+            return items, None
+        items = items[:limit]
+        return items, encode_cursor(items[-1].created_at, items[-1].id)
+    
     def update(self, obj_id: str, data: Dict[str, Any]) -> Optional[Any]:
         """Update object with given data"""
         try:
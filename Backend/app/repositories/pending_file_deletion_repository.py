@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Pending File Deletion Repository for NAYA Travel Journal
+"""
+
+from datetime import datetime
+from typing import Iterable, List, Optional
+
+from app import db
+from app.models.base_model import _utcnow
+from app.models.pending_file_deletion import PendingFileDeletion
+from app.repositories.base_repository import SQLAlchemyRepository
+
+class PendingFileDeletionRepository(SQLAlchemyRepository):
+    """Repository for the persisted file deletion backlog"""
+    
+    def __init__(self):
+        super().__init__(PendingFileDeletion)
+    
+    def get_due(self, limit: int, now: Optional[datetime] = None) -> List[PendingFileDeletion]:
+        """
+        Get entries whose next attempt is due, oldest first
+        Args:
+            limit (int): Batch size
+            now (datetime, optional): Reference time; the current time when omitted
+        Returns:
+            List of pending deletions
+        """
+        try:
+            return PendingFileDeletion.query.filter(
+                PendingFileDeletion.next_attempt_at <= (now or _utcnow())
+            ).order_by(PendingFileDeletion.next_attempt_at, PendingFileDeletion.id).limit(limit).all()
+        except Exception:
+            return []
+    
+    def delete_many(self, entry_ids: Iterable[str]) -> int:
+        """
+        Remove finished entries in one statement
+        Args:
+            entry_ids (iterable): Entry IDs
+        Returns:
+            Number of entries removed
+        """
+        ids = {entry_id for entry_id in entry_ids if entry_id}
+        if not ids:
+            return 0
+        try:
+            result = db.session.execute(
+                db.delete(PendingFileDeletion).where(PendingFileDeletion.id.in_(ids))
+                .execution_options(synchronize_session=False)
+            )
+            db.session.commit()
+            return result.rowcount
+        except Exception:
+            db.session.rollback()
+            raise
+    
+    def reschedule(self, entry_id: str, attempts: int, next_attempt_at: datetime, error: str) -> None:
+        """
+        Record a failed attempt
+        Args:
+            entry_id (str): Entry ID
+            attempts (int): Attempts made so far
+            next_attempt_at (datetime): When to try again
+            error (str): Last error message
+        """
+        try:
+            db.session.execute(
+                db.update(PendingFileDeletion).where(PendingFileDeletion.id == entry_id)
+                .values(attempts=attempts, next_attempt_at=next_attempt_at, last_error=error,
+                        updated_at=_utcnow())
+                .execution_options(synchronize_session=False)
+            )
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+    
+    def count_pending(self) -> int:
+        """
+        Count entries in the backlog
+        Returns:
+            Number of pending deletions
+        """
+        try:
+            return PendingFileDeletion.query.count()
+        except Exception:
+            return 0
@@ -3,7 +3,7 @@
 Photo Repository for NAYA Travel Journal
 """
 
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 from app.models.photo import Photo
 from app.repositories.base_repository import SQLAlchemyRepository
 
@@ -47,6 +47,41 @@ class PhotoRepository(SQLAlchemyRepository):
         except Exception:
             return []
     
+    def get_photo_page(self, limit: int, cursor: Optional[str] = None, user_id: Optional[str] = None,
+                       review_id: Optional[str] = None) -> Tuple[List[Photo], Optional[str]]:
+        """
+        Get a page of photos, newest first
+        Args:
+            limit (int): Page size
+            cursor (str, optional): Cursor from the previous page
+            user_id (str, optional): Only photos uploaded by this user
+            review_id (str, optional): Only photos attached to this review
+        Returns:
+            Tuple of (photos, next cursor)
+        """
+        query = Photo.query
+        if user_id:
+            query = query.filter_by(user_id=user_id)
+        if review_id:
+            query = query.filter_by(review_id=review_id)
+        return self.get_page(limit, cursor, query)
+    
+    def get_by_reviews(self, review_ids: Iterable[str]) -> List[Photo]:
+        """
+        Get photos for several reviews in a single query
+        Args:
+            review_ids (iterable): Review IDs
+        Returns:
+            List of photos, most recent first
+        """
+        ids = {review_id for review_id in review_ids if review_id}
+        if not ids:
+            return []
+        try:
+            return Photo.query.filter(Photo.review_id.in_(ids)).order_by(Photo.created_at.desc()).all()
+        except Exception:
+            return []
+    
     def get_by_filename(self, filename: str) -> Optional[Photo]:
         """
         Get photo by filename
@@ -162,6 +197,198 @@ class PhotoRepository(SQLAlchemyRepository):
         except Exception:
             return []
     
+    def get_orphaned_by_user(self, user_id: str) -> List[Photo]:
+        """
+        Get all of a user's photos not associated with any review, newest first
+        Args:
+            user_id (str): Owner ID
+        Returns:
+            List of orphaned photos
+        """
+        try:
+            return Photo.query.filter(
+                Photo.user_id == user_id, Photo.review_id.is_(None)
+            ).order_by(Photo.created_at.desc(), Photo.id.desc()).all()
+        except Exception:
+            return []
+    
+    def get_orphaned_page(self, user_id: str, limit: int,
+                          cursor: Optional[str] = None) -> Tuple[List[Photo], Optional[str]]:
+        """
+        Get a page of a user's photos not associated with any review, newest first
+        Args:
+            user_id (str): Owner ID
+            limit (int): Page size
+            cursor (str, optional): Cursor from the previous page
+        Returns:
+            Tuple of (orphaned photos, next cursor)
+        """
+        query = Photo.query.filter(Photo.user_id == user_id, Photo.review_id.is_(None))
+        return self.get_page(limit, cursor, query)
+    
+    def attach_to_review(self, photo_ids: Iterable[str], review_id: str, owner_id: str) -> int:
+        """
+        Link many orphaned photos to a review in one UPDATE statement
+        Args:
+            photo_ids (iterable): Photo IDs to attach
+            review_id (str): Target review ID
+            owner_id (str): Only photos uploaded by this user are attached
+        Returns:
+            Number of photos attached
+        """
+        from app import db
+        from app.models.base_model import _utcnow
+        
+        ids = {photo_id for photo_id in photo_ids if photo_id}
+        if not ids:
+            return 0
+        try:
+            result = db.session.execute(
+                db.update(Photo)
+                .where(Photo.id.in_(ids), Photo.user_id == owner_id, Photo.review_id.is_(None))
+                .values(review_id=review_id, updated_at=_utcnow())
+                .execution_options(synchronize_session=False)
+            )
+            db.session.commit()
+            return result.rowcount
+        except Exception:
+            db.session.rollback()
+            raise
+    
+    def delete_by_review(self, review_id: str) -> int:
+        """
+        Delete every photo of a review and queue their files, in one transaction
+        Args:
+            review_id (str): Review ID
+        Returns:
+            Number of photos deleted
+        """
+        return self._delete_and_queue_files(Photo.review_id == review_id)
+
+    def delete_with_files(self, photo_ids: Iterable[str]) -> int:
+        """
+        Delete photos and queue their files, in one transaction
+        Args:
+            photo_ids (iterable): Photo IDs
+        Returns:
+            Number of photos deleted
+        """
+        ids = {photo_id for photo_id in photo_ids if photo_id}
+        if not ids:
+            return 0
+        return self._delete_and_queue_files(Photo.id.in_(ids))
+
+    def _delete_and_queue_files(self, criterion) -> int:
+        """
+        Delete the matching photos and add each stored file no other photo still
+        references to the pending file deletion backlog, committing both together
+        """
+        from app import db
+        from app.models.pending_file_deletion import PendingFileDeletion
+
+        try:
+            rows = db.session.execute(
+                db.select(Photo.filename, Photo.file_path, Photo.renditions).where(criterion)
+            ).all()
+            if not rows:
+                return 0
+            result = db.session.execute(
+                db.delete(Photo).where(criterion).execution_options(synchronize_session='fetch')
+            )
+            files = {row.filename: row for row in rows}
+            still_referenced = set(db.session.execute(
+                db.select(Photo.filename).where(Photo.filename.in_(files)).distinct()
+            ).scalars())
+            pending = [
+                {'filename': row.filename, 'file_path': row.file_path, 'renditions': row.renditions}
+                for filename, row in files.items() if filename not in still_referenced
+            ]
+            if pending:
+                db.session.execute(db.insert(PendingFileDeletion), pending)
+            db.session.commit()
+            return result.rowcount
+        except Exception:
+            db.session.rollback()
+            raise
+
+    def set_renditions(self, photo_id: str, renditions: Dict[str, Dict[str, str]]) -> bool:
+        """
+        Record generated renditions on a photo
+        Args:
+            photo_id (str): Photo ID
+            renditions (dict): Rendition name -> {format: filename}
+        Returns:
+            bool: False if the photo no longer exists
+        """
+        from app import db
+        
+        try:
+            result = db.session.execute(
+                db.update(Photo).where(Photo.id == photo_id).values(renditions=renditions)
+                .execution_options(synchronize_session=False)
+            )
+            db.session.commit()
+            return result.rowcount > 0
+        except Exception:
+            db.session.rollback()
+            raise
+    
+    def get_without_renditions(self, limit: int) -> List[Photo]:
+        """
+        Get photos that have no renditions yet, oldest first
+        Args:
+            limit (int): Batch size
+        Returns:
+            List of photos
+        """
+        try:
+            return Photo.query.filter(Photo.renditions.is_(None)).order_by(
+                Photo.created_at, Photo.id
+            ).limit(limit).all()
+        except Exception:
+            return []
+
+    def get_batch_after(self, after_id: Optional[str], limit: int) -> List[Photo]:
+        """
+        Walk every photo in id order, one batch at a time
+        Args:
+            after_id (str, optional): Last id of the previous batch
+            limit (int): Batch size
+        Returns:
+            List of photos
+        """
+        try:
+            query = Photo.query
+            if after_id:
+                query = query.filter(Photo.id > after_id)
+            return query.order_by(Photo.id).limit(limit).all()
+        except Exception:
+            return []
+
+    def set_file_paths(self, file_paths: Dict[str, str]) -> int:
+        """
+        Point every photo sharing a stored file at its new location, in one transaction
+        Args:
+            file_paths (dict): Stored filename -> new file path
+        Returns:
+            Number of photos updated
+        """
+        from app import db
+
+        updated = 0
+        try:
+            for filename, file_path in file_paths.items():
+                result = db.session.execute(
+                    db.update(Photo).where(Photo.filename == filename).values(file_path=file_path)
+                    .execution_options(synchronize_session=False)
+                )
+                updated += result.rowcount
+            db.session.commit()
+            return updated
+        except Exception:
+            db.session.rollback()
+            raise
+
     def filename_exists(self, filename: str) -> bool:
         """
         Check if filename already exists
@@ -175,6 +402,34 @@ class PhotoRepository(SQLAlchemyRepository):
         except Exception:
             return False
     
+    def is_filename_referenced(self, filename: str) -> bool:
+        """
+        Check whether any photo still uses a stored file
+        Args:
+            filename (str): Stored filename
+        Returns:
+            True if referenced; also True when the lookup fails, so files are kept
+        """
+        try:
+            return Photo.query.filter_by(filename=filename).first() is not None
+        except Exception:
+            return True
+    
+    def get_renditions_by_filename(self, filename: str) -> Optional[Dict[str, Dict[str, str]]]:
+        """
+        Get renditions already rendered for a stored file
+        Args:
+            filename (str): Stored filename
+        Returns:
+            dict or None: Renditions of another photo sharing the file, None if there are none yet
+        """
+        try:
+            return Photo.query.with_entities(Photo.renditions).filter(
+                Photo.filename == filename, Photo.renditions.isnot(None)
+            ).limit(1).scalar()
+        except Exception:
+            return None
+    
     def get_photos_without_description(self, limit: Optional[int] = None) -> List[Photo]:
         """
         Get photos without description
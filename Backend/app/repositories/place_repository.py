@@ -4,8 +4,11 @@ Place Repository for NAYA Travel Journal
 """
 
 import math
-from typing import List, Optional
-from app.models.place import Place
+from typing import Dict, Iterable, List, Optional, Tuple
+from app import db
+from app.models import geohash
+from app.models.place import Place, RATING_COUNT_COLUMNS
+from app.repositories import search_index
 from app.repositories.base_repository import SQLAlchemyRepository
 
 class PlaceRepository(SQLAlchemyRepository):
@@ -61,9 +64,28 @@ class PlaceRepository(SQLAlchemyRepository):
         except Exception:
             return []
     
+    def get_place_page(self, limit: int, cursor: Optional[str] = None, city: Optional[str] = None,
+                       country: Optional[str] = None) -> Tuple[List[Place], Optional[str]]:
+        """
+        Get a page of places, newest first
+        Args:
+            limit (int): Page size
+            cursor (str, optional): Cursor from the previous page
+            city (str, optional): Only places in this city
+            country (str, optional): Only places in this country
+        Returns:
+            Tuple of (places, next cursor)
+        """
+        query = Place.query
+        if city:
+            query = query.filter_by(city=city)
+        if country:
+            query = query.filter_by(country=country)
+        return self.get_page(limit, cursor, query)
+    
     def search_places(self, search_term: str, limit: Optional[int] = None) -> List[Place]:
         """
-        Search places by name, city, or country
+        Search places by name, city, country or description, best match first
         Args:
             search_term (str): Search term
             limit (int, optional): Limit results
@@ -71,6 +93,11 @@ class PlaceRepository(SQLAlchemyRepository):
             List of matching places
         """
         try:
+            ranked_ids = search_index.search_ids('places', search_term, limit)
+            if ranked_ids is not None:
+                places = self.get_many(ranked_ids)
+                return [places[place_id] for place_id in ranked_ids if place_id in places]
+            
             search_pattern = f"%{search_term}%"
             query = Place.query.filter(
                 (Place.name.ilike(search_pattern)) |
@@ -89,7 +116,7 @@ class PlaceRepository(SQLAlchemyRepository):
     def get_nearby_places(self, latitude: float, longitude: float, 
                          radius_km: float = 10.0, limit: Optional[int] = None) -> List[Place]:
         """
-        Get places within radius (simple implementation)
+        Get places within radius, nearest first
         Args:
             latitude (float): Center latitude
             longitude (float): Center longitude
@@ -98,25 +125,78 @@ class PlaceRepository(SQLAlchemyRepository):
         Returns:
             List of nearby places
         """
+        return [place for place, _ in self.find_nearest(latitude, longitude, radius_km, limit)]
+    
+    def find_nearest(self, latitude: float, longitude: float, radius_km: float = 10.0,
+                     limit: Optional[int] = None) -> List[Tuple[Place, float]]:
+        """
+        k-nearest-neighbour search over the geohash index
+        Starts from small cells around the point and widens them until `limit`
+        places are known to be the nearest ones within the radius.
+        Args:
+            latitude (float): Center latitude
+            longitude (float): Center longitude
+            radius_km (float): Radius in kilometers
+            limit (int, optional): Maximum number of places
+        Returns:
+            List of (place, distance in km) sorted by distance
+        """
+        if radius_km <= 0:
+            return []
+        
         try:
-            # Simple radius calculation (not precise for large distances)
-            lat_range = radius_km / 111.0  # Rough km to degree conversion
-            cos_lat = math.cos(math.radians(latitude))
-            lon_divisor = 111.0 * max(abs(cos_lat), 0.01)  # Avoid division by zero near poles
-            lon_range = radius_km / lon_divisor
+            widest = geohash.precision_for_radius(radius_km, latitude)
+            if widest == 0:
+                return self._rank_by_distance(
+                    self._get_in_bounding_box(latitude, longitude, radius_km), latitude, longitude, radius_km, limit
+                )
             
-            query = Place.query.filter(
-                Place.latitude.between(latitude - lat_range, latitude + lat_range),
-                Place.longitude.between(longitude - lon_range, longitude + lon_range)
-            )
-            
-            if limit:
-                query = query.limit(limit)
-            
-            return query.all()
+            # Without a limit every match is needed, so go straight to the covering cells
+            start = min(widest + 2, geohash.DEFAULT_PRECISION) if limit else widest
+            for precision in range(start, widest - 1, -1):
+                cells = geohash.neighbourhood(latitude, longitude, precision)
+                candidates = Place.query.filter(db.or_(*[
+                    db.and_(Place.geohash >= cell, Place.geohash < cell + '{') for cell in cells
+                ])).all()
+                
+                # Matches closer than the covered radius cannot be beaten by places outside these cells
+                reliable_km = min(geohash.covered_radius_km(precision, latitude), radius_km)
+                ranked = self._rank_by_distance(candidates, latitude, longitude, radius_km, None)
+                reliable = [match for match in ranked if match[1] <= reliable_km]
+                if precision == widest or len(reliable) >= limit:
+                    return ranked[:limit] if limit else ranked
+            return []
         except Exception:
             return []
     
+    def _get_in_bounding_box(self, latitude: float, longitude: float, radius_km: float) -> List[Place]:
+        """Places inside the lat/lon box enclosing the radius (used when no geohash cell is wide enough)"""
+        lat_range = radius_km / geohash.KM_PER_DEGREE
+        cos_lat = math.cos(math.radians(latitude))
+        lon_range = radius_km / (geohash.KM_PER_DEGREE * max(abs(cos_lat), 0.01))  # Avoid division by zero near poles
+        
+        query = Place.query.filter(
+            Place.latitude.isnot(None),
+            Place.longitude.isnot(None),
+            Place.latitude.between(latitude - lat_range, latitude + lat_range)
+        )
+        if lon_range < 180:
+            query = query.filter(Place.longitude.between(longitude - lon_range, longitude + lon_range))
+        return query.all()
+    
+    def _rank_by_distance(self, places: List[Place], latitude: float, longitude: float,
+                          radius_km: float, limit: Optional[int]) -> List[Tuple[Place, float]]:
+        """Sort places by great-circle distance, dropping those outside the radius"""
+        ranked = []
+        for place in places:
+            if place.latitude is None or place.longitude is None:
+                continue
+            distance = geohash.haversine_km(latitude, longitude, place.latitude, place.longitude)
+            if distance <= radius_km:
+                ranked.append((place, distance))
+        ranked.sort(key=lambda match: match[1])
+        return ranked[:limit] if limit else ranked
+    
     def get_places_with_reviews(self, min_reviews: int = 1, limit: Optional[int] = None) -> List[Place]:
         """
         Get places that have reviews
@@ -209,3 +289,59 @@ class PlaceRepository(SQLAlchemyRepository):
             return Place.query.filter_by(name=name, city=city, country=country).first()
         except Exception:
             return None
+    
+    def get_by_identities(self, identities: Iterable[Tuple[str, str, str]]) -> Dict[Tuple[str, str, str], Place]:
+        """
+        Get places for many name/city/country combinations in a single query
+        Args:
+            identities (iterable): (name, city, country) tuples
+        Returns:
+            dict: Identity tuple -> Place, for the identities that exist
+        """
+        identities = set(identities)
+        if not identities:
+            return {}
+        try:
+            places = Place.query.filter(
+                db.tuple_(Place.name, Place.city, Place.country).in_(list(identities))
+            ).all()
+            return {(place.name, place.city, place.country): place for place in places}
+        except Exception:
+            return {}
+    
+    def recompute_rating_aggregates(self, place_ids: Optional[Iterable[str]] = None) -> int:
+        """
+        Rebuild denormalised rating aggregates from the reviews table
+        Args:
+            place_ids (iterable, optional): Restrict the repair to these places
+        Returns:
+            Number of places updated
+        """
+        from app import db
+        from app.models.review import Review
+        
+        def _review_count(*criteria):
+            return db.select(db.func.count(Review.id)).where(
+                Review.place_id == Place.id, *criteria
+            ).scalar_subquery()
+        
+        values = {
+            'review_count': _review_count(),
+            'rating_sum': db.select(db.func.coalesce(db.func.sum(Review.rating), 0)).where(
+                Review.place_id == Place.id
+            ).scalar_subquery(),
+        }
+        for rating, column in RATING_COUNT_COLUMNS.items():
+            values[column] = _review_count(Review.rating == rating)
+        
+        statement = db.update(Place).values(**values)
+        if place_ids is not None:
+            statement = statement.where(Place.id.in_(list(place_ids)))
+        
+        try:
+            result = db.session.execute(statement.execution_options(synchronize_session=False))
+            db.session.commit()
+            return result.rowcount
+        except Exception:
+            db.session.rollback()
+            raise
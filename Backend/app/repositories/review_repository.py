@@ -3,8 +3,9 @@
 Review Repository for NAYA Travel Journal
 """
 
-from typing import List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 from app.models.review import Review
+from app.repositories import search_index
 from app.repositories.base_repository import SQLAlchemyRepository
 
 class ReviewRepository(SQLAlchemyRepository):
@@ -47,6 +48,25 @@ class ReviewRepository(SQLAlchemyRepository):
         except Exception:
             return []
     
+    def get_review_page(self, limit: int, cursor: Optional[str] = None, user_id: Optional[str] = None,
+                        place_id: Optional[str] = None) -> Tuple[List[Review], Optional[str]]:
+        """
+        Get a page of reviews, newest first
+        Args:
+            limit (int): Page size
+            cursor (str, optional): Cursor from the previous page
+            user_id (str, optional): Only reviews by this user
+            place_id (str, optional): Only reviews for this place
+        Returns:
+            Tuple of (reviews, next cursor)
+        """
+        query = Review.query
+        if user_id:
+            query = query.filter_by(user_id=user_id)
+        if place_id:
+            query = query.filter_by(place_id=place_id)
+        return self.get_page(limit, cursor, query)
+    
     def get_by_rating(self, min_rating: int, max_rating: int = 5, 
                      limit: Optional[int] = None) -> List[Review]:
         """
@@ -99,7 +119,7 @@ class ReviewRepository(SQLAlchemyRepository):
     
     def search_reviews(self, search_term: str, limit: Optional[int] = None) -> List[Review]:
         """
-        Search reviews by title or content
+        Search reviews by title or content, best match first
         Args:
             search_term (str): Search term
             limit (int, optional): Limit results
@@ -107,6 +127,11 @@ class ReviewRepository(SQLAlchemyRepository):
             List of matching reviews
         """
         try:
+            ranked_ids = search_index.search_ids('reviews', search_term, limit)
+            if ranked_ids is not None:
+                reviews = self.get_many(ranked_ids)
+                return [reviews[review_id] for review_id in ranked_ids if review_id in reviews]
+            
             search_pattern = f"%{search_term}%"
             query = Review.query.filter(
                 (Review.title.ilike(search_pattern)) |
@@ -148,6 +173,51 @@ class ReviewRepository(SQLAlchemyRepository):
         except Exception:
             return 0
     
+    def get_statistics_for_places(self, place_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Get review count, average rating and rating distribution for many places
+        Args:
+            place_ids (iterable): Place IDs
+        Returns:
+            Dictionary of statistics keyed by place ID (every requested place is present)
+        """
+        ids = {place_id for place_id in place_ids if place_id}
+        statistics = {
+            place_id: {
+                'review_count': 0,
+                'average_rating': None,
+                'rating_distribution': {i: 0 for i in range(1, 6)}
+            }
+            for place_id in ids
+        }
+        if not ids:
+            return statistics
+
+        try:
+            from app import db
+
+            # A single GROUP BY (place, rating) yields the distribution; count and
+            # average are derived from it instead of issuing extra aggregate queries.
+            rows = db.session.query(
+                Review.place_id,
+                Review.rating,
+                db.func.count(Review.id)
+            ).filter(Review.place_id.in_(ids)).group_by(Review.place_id, Review.rating).all()
+        except Exception:
+            return statistics
+
+        rating_totals = {place_id: 0 for place_id in ids}
+        for place_id, rating, count in rows:
+            place_stats = statistics[place_id]
+            place_stats['review_count'] += count
+            place_stats['rating_distribution'][rating] = count
+            rating_totals[place_id] += rating * count
+
+        for place_id, place_stats in statistics.items():
+            if place_stats['review_count']:
+                place_stats['average_rating'] = rating_totals[place_id] / place_stats['review_count']
+        return statistics
+    
     def get_review_count_for_user(self, user_id: str) -> int:
         """
         Get number of reviews by user
@@ -175,6 +245,29 @@ class ReviewRepository(SQLAlchemyRepository):
         except Exception:
             return False
     
+    def get_reviewed_pairs(self, pairs: Iterable[Tuple[str, str]]) -> set:
+        """
+        Find which (user, place) combinations already have a review, in a single query
+        Args:
+            pairs (iterable): (user_id, place_id) tuples
+        Returns:
+            set: The pairs that have been reviewed
+        """
+        from app import db
+
+        pairs = set(pairs)
+        if not pairs:
+            return set()
+        try:
+            rows = db.session.execute(
+                db.select(Review.user_id, Review.place_id).where(
+                    db.tuple_(Review.user_id, Review.place_id).in_(list(pairs))
+                )
+            ).all()
+            return {(row.user_id, row.place_id) for row in rows}
+        except Exception:
+            return set()
+
     def get_reviews_with_photos(self, limit: Optional[int] = None) -> List[Review]:
         """
         Get reviews that have photos
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Full-text search index for NAYA Travel Journal
+
+SQLite databases use external-content FTS5 tables kept in sync by triggers;
+PostgreSQL databases use a GIN index over a tsvector expression, which the
+database maintains on every write. Repositories fall back to ILIKE scans
+when neither is available.
+"""
+
+import logging
+import re
+from typing import Dict, List, Optional, Tuple
+
+from flask import current_app
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+# Indexed table -> weighted text columns (higher weight ranks matches first)
+SEARCHABLE_TABLES: Dict[str, Tuple[Tuple[str, float], ...]] = {
+    'reviews': (('title', 2.0), ('content', 1.0)),
+    'places': (('name', 3.0), ('city', 2.0), ('country', 2.0), ('description', 1.0)),
+}
+
+_TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+
+def ensure_search_indexes(engine) -> Optional[str]:
+    """
+    Create full-text indexes for the searchable tables if needed
+    Args:
+        engine: SQLAlchemy engine
+    Returns:
+        str or None: Active backend ('fts5' or 'tsvector'), None if unsupported
+    """
+    dialect = engine.dialect.name
+    try:
+        if dialect == 'sqlite':
+            return _ensure_sqlite_fts(engine)
+        if dialect == 'postgresql':
+            return _ensure_postgres_fts(engine)
+    except Exception:
+        logger.warning('Full-text search unavailable on %s; falling back to LIKE scans', dialect, exc_info=True)
+    return None
+
+
+def rebuild_search_indexes(engine) -> None:
+    """Re-index every row (SQLite only; PostgreSQL expression indexes never drift)."""
+    if engine.dialect.name != 'sqlite':
+        return
+    with engine.begin() as connection:
+        for table in SEARCHABLE_TABLES:
+            connection.execute(text(f"INSERT INTO {table}_fts({table}_fts) VALUES('rebuild')"))
+
+
+def search_ids(table: str, search_term: str, limit: Optional[int] = None) -> Optional[List[str]]:
+    """
+    Rank rows of a searchable table against a search term with prefix matching
+    Args:
+        table (str): Table name from SEARCHABLE_TABLES
+        search_term (str): Free text entered by the user
+        limit (int, optional): Maximum number of IDs to return
+    Returns:
+        list or None: Matching IDs, best match first; None when full-text search is unavailable
+    """
+    backend = current_app.extensions.get('naya_full_text')
+    if backend is None:
+        return None
+
+    tokens = _TOKEN_PATTERN.findall(search_term or '')
+    if not tokens:
+        return []
+
+    from app import db
+
+    if backend == 'fts5':
+        statement, params = _sqlite_search(table, tokens)
+    else:
+        statement, params = _postgres_search(table, tokens)
+    if limit:
+        statement += ' LIMIT :limit'
+        params['limit'] = limit
+    return [row[0] for row in db.session.execute(text(statement), params)]
+
+
+def _ensure_sqlite_fts(engine) -> str:
+    with engine.begin() as connection:
+        for table, columns in SEARCHABLE_TABLES.items():
+            names = [name for name, _ in columns]
+            fts_table = f'{table}_fts'
+            connection.execute(text(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts_table} USING fts5("
+                f"{', '.join(names)}, content='{table}', content_rowid='rowid', "
+                f"tokenize='unicode61 remove_diacritics 2')"
+            ))
+
+            # Triggers disappear with their table, so a missing trigger means the
+            # index may be stale and has to be rebuilt from the content table.
+            existing = connection.execute(
+                text("SELECT name FROM sqlite_master WHERE type = 'trigger' AND name = :name"),
+                {'name': f'{fts_table}_ai'}
+            ).first()
+            if existing:
+                continue
+
+            column_list = ', '.join(names)
+            new_values = ', '.join(f'new.{name}' for name in names)
+            old_values = ', '.join(f'old.{name}' for name in names)
+            connection.execute(text(
+                f"CREATE TRIGGER IF NOT EXISTS {fts_table}_ai AFTER INSERT ON {table} BEGIN "
+                f"INSERT INTO {fts_table}(rowid, {column_list}) VALUES (new.rowid, {new_values}); END"
+            ))
+            connection.execute(text(
+                f"CREATE TRIGGER IF NOT EXISTS {fts_table}_ad AFTER DELETE ON {table} BEGIN "
+                f"INSERT INTO {fts_table}({fts_table}, rowid, {column_list}) "
+                f"VALUES ('delete', old.rowid, {old_values}); END"
+            ))
+            connection.execute(text(
+                f"CREATE TRIGGER IF NOT EXISTS {fts_table}_au AFTER UPDATE OF {column_list} ON {table} BEGIN "
+                f"INSERT INTO {fts_table}({fts_table}, rowid, {column_list}) "
+                f"VALUES ('delete', old.rowid, {old_values}); "
+                f"INSERT INTO {fts_table}(rowid, {column_list}) VALUES (new.rowid, {new_values}); END"
+            ))
+            connection.execute(text(f"INSERT INTO {fts_table}({fts_table}) VALUES('rebuild')"))
+    return 'fts5'
+
+
+def _ensure_postgres_fts(engine) -> str:
+    with engine.begin() as connection:
+        for table in SEARCHABLE_TABLES:
+            connection.execute(text(
+                f"CREATE INDEX IF NOT EXISTS ix_{table}_fulltext ON {table} "
+                f"USING GIN ({_tsvector_expression(table)})"
+            ))
+    return 'tsvector'
+
+
+def _sqlite_search(table: str, tokens: List[str]):
+    fts_table = f'{table}_fts'
+    weights = ', '.join(str(weight) for _, weight in SEARCHABLE_TABLES[table])
+    match = ' '.join(f'"{token}"*' for token in tokens)
+    statement = (
+        f"SELECT {table}.id FROM {fts_table} "
+        f"JOIN {table} ON {table}.rowid = {fts_table}.rowid "
+        f"WHERE {fts_table} MATCH :match "
+        f"ORDER BY bm25({fts_table}, {weights})"
+    )
+    return statement, {'match': match}
+
+
+def _postgres_search(table: str, tokens: List[str]):
+    vector = _tsvector_expression(table)
+    query = ' & '.join(f'{token}:*' for token in tokens)
+    statement = (
+        f"SELECT id FROM {table} "
+        f"WHERE {vector} @@ to_tsquery('simple', :query) "
+        f"ORDER BY ts_rank({vector}, to_tsquery('simple', :query)) DESC"
+    )
+    return statement, {'query': query}
+
+
+def _tsvector_expression(table: str) -> str:
+    # Must stay textually identical to the indexed expression for the GIN index to be used
+    columns = SEARCHABLE_TABLES[table]
+    distinct_weights = sorted({weight for _, weight in columns}, reverse=True)
+    parts = []
+    for name, weight in columns:
+        label = 'ABCD'[min(distinct_weights.index(weight), 3)]
+        parts.append(f"setweight(to_tsvector('simple', coalesce({name}, '')), '{label}')")
+    return '(' + ' || '.join(parts) + ')'
@@ -3,35 +3,140 @@
 User Repository for NAYA Travel Journal
 """
 
-from typing import Optional, List
-from app.models.user import User
+from typing import Any, Dict, Optional, List
+from app.models.user import User, normalize_login
 from app.repositories.base_repository import SQLAlchemyRepository
+from app.services.user_snapshots import invalidate_user_snapshots
 
 class UserRepository(SQLAlchemyRepository):
-    """User repository for data access operations"""
+    """
+    User repository for data access operations
+    Writes that can change a user's username, admin or active flag drop the
+    cached authorization snapshot (see app.services.user_snapshots).
+    """
     
     def __init__(self):
         super().__init__(User)
     
+    def update(self, obj_id: str, data: Dict[str, Any]) -> Optional[User]:
+        """Update a user and drop its cached snapshot"""
+        try:
+            return super().update(obj_id, data)
+        finally:
+            invalidate_user_snapshots([obj_id])
+    
+    def delete(self, obj_id: str) -> bool:
+        """Delete a user and drop its cached snapshot"""
+        deleted = super().delete(obj_id)
+        invalidate_user_snapshots([obj_id])
+        return deleted
+    
     def get_by_email(self, email: str) -> Optional[User]:
         """
-        Get user by email address
+        Get user by email address, ignoring case
         Args:
             email (str): User email
         Returns:
             User or None
         """
-        return self.get_by_attribute(email=email)
+        return self.get_by_attribute(email_normalized=normalize_login(email))
     
     def get_by_username(self, username: str) -> Optional[User]:
         """
-        Get user by username
+        Get user by username, ignoring case
         Args:
             username (str): Username
         Returns:
             User or None
         """
-        return self.get_by_attribute(username=username)
+        return self.get_by_attribute(username_normalized=normalize_login(username))
+    
+    def get_by_login(self, login: str) -> Optional[User]:
+        """
+        Get user by email address or username, ignoring case, in a single query
+        Args:
+            login (str): Email or username
+        Returns:
+            User or None
+        """
+        from app import db
+        
+        normalized = normalize_login(login)
+        try:
+            return User.query.filter(db.or_(
+                User.email_normalized == normalized,
+                User.username_normalized == normalized,
+                # Legacy rows left without a normalized value still match exactly
+                User.email == login,
+                User.username == login,
+            )).order_by(db.case((User.email == login, 0), (User.username == login, 0), else_=1)).first()
+        except Exception:
+            return None
+    
+    def update_password_hash(self, user_id: str, password_hash: str) -> bool:
+        """
+        Replace a stored password hash without touching the profile timestamp
+        Args:
+            user_id (str): User ID
+            password_hash (str): New hash
+        Returns:
+            True if updated, False otherwise
+        """
+        from app import db
+        
+        try:
+            result = db.session.execute(
+                # Explicit updated_at keeps the column's onupdate from firing
+                db.update(User).where(User.id == user_id)
+                .values(password_hash=password_hash, updated_at=User.updated_at)
+                .execution_options(synchronize_session=False)
+            )
+            db.session.commit()
+            return result.rowcount > 0
+        except Exception:
+            db.session.rollback()
+            return False
+    
+    def get_user_statistics(self, user_id: str) -> Dict[str, Any]:
+        """
+        Get activity statistics for a user in a single query
+        Args:
+            user_id (str): User ID
+        Returns:
+            dict: reviews_count, photos_count, countries_visited, average_rating_given
+        """
+        from app import db
+        from app.models.photo import Photo
+        from app.models.place import Place
+        from app.models.review import Review
+        
+        statistics = {
+            'reviews_count': 0,
+            'photos_count': 0,
+            'countries_visited': 0,
+            'average_rating_given': None
+        }
+        try:
+            by_user = Review.user_id == user_id
+            row = db.session.execute(db.select(
+                db.select(db.func.count(Review.id)).where(by_user).scalar_subquery(),
+                db.select(db.func.count(Photo.id)).where(Photo.user_id == user_id).scalar_subquery(),
+                db.select(db.func.count(db.distinct(Place.country)))
+                .join(Review, Review.place_id == Place.id)
+                .where(by_user).scalar_subquery(),
+                db.select(db.func.avg(Review.rating)).where(by_user).scalar_subquery(),
+            )).one()
+        except Exception:
+            return statistics
+        
+        reviews_count, photos_count, countries_visited, average_rating = row
+        statistics.update({
+            'reviews_count': reviews_count or 0,
+            'photos_count': photos_count or 0,
+            'countries_visited': countries_visited or 0,
+            'average_rating_given': float(average_rating) if average_rating is not None else None
+        })
+        return statistics
     
     def get_active_users(self, limit: Optional[int] = None) -> List[User]:
         """
@@ -144,6 +249,7 @@ class UserRepository(SQLAlchemyRepository):
             
             user.is_active = False
             user.save()
+            invalidate_user_snapshots([user_id])
             return True
         except Exception:
             return False
@@ -163,6 +269,7 @@ class UserRepository(SQLAlchemyRepository):
             
             user.is_active = True
             user.save()
+            invalidate_user_snapshots([user_id])
             return True
         except Exception:
             return False
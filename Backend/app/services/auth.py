@@ -3,13 +3,19 @@
 Authentication Service for NAYA Travel Journal
 """
 
+import re
 from datetime import timedelta
 from flask import current_app
 from flask_jwt_extended import create_access_token, create_refresh_token
+from sqlalchemy.exc import IntegrityError
 
 from app.models.user import User
+from app.password_hashing import PasswordHashingBusy, get_password_hasher
 from app.repositories.user_repository import UserRepository
 
+# Finds the users column named in a unique violation (SQLite, PostgreSQL and MySQL wording)
+_UNIQUE_COLUMN = re.compile(r'(?:users\.|ix_users_|Key \()(email|username)')
+
 class AuthService:
     """Authentication service for user management"""
     
@@ -32,13 +38,6 @@ class AuthService:
             if field not in user_data or not user_data[field]:
                 raise ValueError(f"Missing required field: {field}")
         
-        # Check if user already exists
-        if self.user_repository.get_by_email(user_data['email']):
-            raise ValueError("Email already registered")
-        
-        if self.user_repository.get_by_username(user_data['username']):
-            raise ValueError("Username already taken")
-        
         # Create user instance
         user = User(**user_data)
         
@@ -53,7 +52,16 @@ class AuthService:
         admin_emails = current_app.config.get('ADMIN_EMAILS', [])
         if user.email and user.email.lower() in admin_emails:
             user.is_admin = True
-        created_user = self.user_repository.create(user)
+        # Duplicates (in any letter case) are rejected by the unique indexes
+        try:
+            created_user = self.user_repository.create(user)
+        except IntegrityError as error:
+            match = _UNIQUE_COLUMN.search(str(error.orig))
+            if not match:
+                raise
+            if match.group(1) == 'email':
+                raise ValueError("Email already registered")
+            raise ValueError("Username already taken")
         
         return {
             'message': 'User registered successfully',
@@ -75,10 +83,7 @@ class AuthService:
             raise ValueError("Login and password are required")
         
         # Find user by email or username
-        user = self.user_repository.get_by_email(login)
-        if not user:
-            user = self.user_repository.get_by_username(login)
-        
+        user = self.user_repository.get_by_login(login)
         if not user:
             raise ValueError("Invalid email or password")
         
@@ -90,6 +95,13 @@ class AuthService:
         if not user.is_active:
             raise ValueError("Account is deactivated")
         
+        # Upgrade hashes made with older parameters while the plain password is at hand
+        if user.password_needs_rehash():
+            try:
+                self.user_repository.update_password_hash(user.id, get_password_hasher().hash(password))
+            except PasswordHashingBusy:
+                pass  # Upgraded at a quieter login
+        
         # Create JWT tokens using configured expirations
         access_token = create_access_token(
             identity=user.id,
@@ -145,7 +157,7 @@ class AuthService:
             raise ValueError("User not found")
         
         # Remove sensitive fields that shouldn't be updated directly
-        sensitive_fields = ['password', 'password_hash', 'id', 'created_at']
+        sensitive_fields = ['password', 'password_hash', 'id', 'created_at', 'email_normalized', 'username_normalized']
         for field in sensitive_fields:
             update_data.pop(field, None)
         
@@ -209,12 +221,10 @@ class AuthService:
         Returns:
             dict: Success message
         """
-        user = self.user_repository.get(user_id)
-        if not user:
+        if not self.user_repository.get(user_id):
             raise ValueError("User not found")
-        
-        user.is_active = False
-        user.save()
+        if not self.user_repository.deactivate_user(user_id):
+            raise ValueError("Failed to deactivate user")
         
         return {'message': 'Account deactivated successfully'}
     
@@ -230,10 +240,13 @@ class AuthService:
         if not user:
             raise ValueError("User not found")
         
+        statistics = self.user_repository.get_user_statistics(user_id)
         return {
             'user_id': user_id,
             'username': user.username,
-            'reviews_count': user.reviews_count,
-            'photos_count': user.photos_count,
+            'reviews_count': statistics['reviews_count'],
+            'photos_count': statistics['photos_count'],
+            'countries_visited': statistics['countries_visited'],
+            'average_rating_given': statistics['average_rating_given'],
             'member_since': user.created_at.isoformat() if user.created_at else None
         }
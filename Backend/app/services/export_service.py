@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Bulk export of reviews, places and photo metadata for NAYA Travel Journal
+
+Exports stream rows from a server-side cursor (``yield_per``), in
+(created_at, id) order, and encode them one by one as NDJSON or CSV. Memory
+use therefore stays flat whatever the table size. Rows carry the same
+fields as the API payloads of the model.
+"""
+
+import csv
+import io
+import json
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, Dict, Iterator, Optional
+
+from flask import current_app
+
+from app import db
+from app.models.photo import Photo
+from app.models.place import Place
+from app.models.review import Review
+from app.models.serializer import serializer_for
+
+EXPORT_MODELS = {'reviews': Review, 'places': Place, 'photos': Photo}
+EXPORT_FORMATS = ('ndjson', 'csv')
+EXPORT_FILTERS = ('since', 'until', 'place_id', 'country', 'user_id')
+
+
+class ExportService:
+    """Service for streaming data exports"""
+
+    def export(self, kind: str, fmt: str = 'ndjson', filters: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+        """
+        Stream an export
+        Arguments are validated before the first row is read, so errors surface
+        before any output has been produced.
+        Args:
+            kind (str): 'reviews', 'places' or 'photos'
+            fmt (str): 'ndjson' or 'csv'
+            filters (dict, optional): since / until (ISO date or datetime, inclusive),
+                place_id, country, user_id
+        Returns:
+            iterator: Encoded chunks of text, one line per row (after the CSV header)
+        Raises:
+            ValueError: If the kind, format or a filter is invalid
+        """
+        model_class = EXPORT_MODELS.get(kind)
+        if model_class is None:
+            raise ValueError(f"Unsupported export type: {kind}. Use one of: {', '.join(EXPORT_MODELS)}")
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported format: {fmt}. Use one of: {', '.join(EXPORT_FORMATS)}")
+        statement = self._build_query(model_class, filters or {})
+        serialize = serializer_for(model_class)
+        encode = self._encode_ndjson if fmt == 'ndjson' else self._csv_encoder(serialize.fields)
+        return self._stream(statement, serialize, encode, fmt == 'csv' and serialize.fields)
+
+    def _stream(self, statement, serialize, encode, header) -> Iterator[str]:
+        if header:
+            yield self._csv_line(header)
+        batch_size = current_app.config.get('EXPORT_BATCH_SIZE', 1000)
+        result = db.session.execute(statement.execution_options(yield_per=batch_size))
+        try:
+            for obj in result.scalars():
+                yield encode(serialize(obj))
+        finally:
+            result.close()
+
+    def _build_query(self, model_class, filters: Dict[str, Any]):
+        statement = db.select(model_class)
+        since = self._parse_bound(filters.get('since'), 'since')
+        until = self._parse_bound(filters.get('until'), 'until', end_of_day=True)
+        if since is not None:
+            statement = statement.where(model_class.created_at >= since)
+        if until is not None:
+            statement = statement.where(model_class.created_at < until)
+
+        place_id = filters.get('place_id')
+        country = filters.get('country')
+        user_id = filters.get('user_id')
+        if model_class is Review:
+            if place_id:
+                statement = statement.where(Review.place_id == place_id)
+            if user_id:
+                statement = statement.where(Review.user_id == user_id)
+            if country:
+                statement = statement.join(Place, Place.id == Review.place_id).where(Place.country == country)
+        elif model_class is Place:
+            if place_id:
+                statement = statement.where(Place.id == place_id)
+            if country:
+                statement = statement.where(Place.country == country)
+            if user_id:
+                # Places the user has reviewed
+                statement = statement.where(db.exists().where(
+                    Review.place_id == Place.id, Review.user_id == user_id
+                ))
+        else:
+            if user_id:
+                statement = statement.where(Photo.user_id == user_id)
+            if place_id or country:
+                statement = statement.join(Review, Review.id == Photo.review_id)
+                if place_id:
+                    statement = statement.where(Review.place_id == place_id)
+                if country:
+                    statement = statement.join(Place, Place.id == Review.place_id).where(Place.country == country)
+        return statement.order_by(model_class.created_at, model_class.id)
+
+    def _parse_bound(self, value: Optional[str], name: str, end_of_day: bool = False) -> Optional[datetime]:
+        """Parse an ISO date or datetime filter; a bare 'until' date covers that whole day"""
+        if not value:
+            return None
+        try:
+            if len(value) == 10:
+                day = date.fromisoformat(value)
+                parsed = datetime.combine(day + timedelta(days=1) if end_of_day else day, time.min)
+            else:
+                parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+                if end_of_day:
+                    parsed += timedelta(microseconds=1)
+        except ValueError:
+            raise ValueError(f"{name} must be an ISO date (YYYY-MM-DD) or datetime")
+        if parsed.tzinfo is None:
+            return parsed.replace(tzinfo=timezone.utc)
+        # Stored timestamps are UTC and some backends drop the offset when binding
+        return parsed.astimezone(timezone.utc)
+
+    def _encode_ndjson(self, row: Dict[str, Any]) -> str:
+        return current_app.json.dumps(row) + '\n'
+
+    def _csv_encoder(self, fields):
+        def _encode(row: Dict[str, Any]) -> str:
+            return self._csv_line([self._csv_value(row[field]) for field in fields])
+        return _encode
+
+    def _csv_value(self, value: Any) -> Any:
+        if isinstance(value, (dict, list)):
+            return json.dumps(value, separators=(',', ':'))
+        return value
+
+    def _csv_line(self, values) -> str:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerow(values)
+        return buffer.getvalue()
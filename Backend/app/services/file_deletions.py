@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Background file deletion for NAYA Travel Journal
+
+Deleting photos only removes their rows; the stored files are queued in the
+pending_file_deletions table in the same transaction. A single background
+worker drains the queue after each deletion (inline when testing or when
+FILE_DELETIONS_SYNC is set), so request latency does not depend on how many
+files a review had. Files that cannot be removed are retried with
+exponential backoff; ``flask process-file-deletions`` drains whatever is due
+(for example from cron, or after a restart left entries behind).
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Dict, Optional
+
+from flask import current_app
+
+from app.models.base_model import _utcnow
+
+logger = logging.getLogger(__name__)
+
+WORKER_KEY = 'naya_file_deletion_worker'
+
+
+class _DeletionWorker:
+    """Single background thread draining the queue; wake-ups while a run is queued coalesce"""
+
+    def __init__(self, app):
+        self.app = app
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='naya-file-deletions')
+        self._lock = threading.Lock()
+        self._queued = False
+
+    def wake(self) -> None:
+        with self._lock:
+            if self._queued:
+                return
+            self._queued = True
+        self._executor.submit(self._run)
+
+    def _run(self) -> None:
+        with self._lock:
+            self._queued = False
+        with self.app.app_context():
+            try:
+                process_pending_file_deletions()
+            except Exception:
+                logger.exception('File deletion run failed; entries stay queued')
+
+
+def schedule_file_deletions() -> None:
+    """Drain the pending file deletion queue, in the background unless testing or FILE_DELETIONS_SYNC"""
+    app = current_app._get_current_object()
+    if app.config.get('TESTING') or app.config.get('FILE_DELETIONS_SYNC'):
+        process_pending_file_deletions()
+        return
+    worker = app.extensions.get(WORKER_KEY)
+    if worker is None:
+        worker = app.extensions.setdefault(WORKER_KEY, _DeletionWorker(app))
+    worker.wake()
+
+
+def process_pending_file_deletions(limit: Optional[int] = None) -> Dict[str, int]:
+    """
+    Remove the files of every due queue entry
+    Args:
+        limit (int, optional): Stop after this many entries
+    Returns:
+        dict: Counts of removed files, blobs kept because a photo uses them again, and failures
+    """
+    from app.repositories.pending_file_deletion_repository import PendingFileDeletionRepository
+    from app.services.photo_service import PhotoService
+
+    repository = PendingFileDeletionRepository()
+    service = PhotoService()
+    config = current_app.config
+    batch_size = config.get('FILE_DELETIONS_BATCH_SIZE', 100)
+    retry_base = config.get('FILE_DELETIONS_RETRY_BASE', 30)
+    retry_max = config.get('FILE_DELETIONS_RETRY_MAX', 3600)
+    counts = {'removed': 0, 'kept': 0, 'failed': 0}
+    processed = 0
+    while limit is None or processed < limit:
+        # Failed entries are rescheduled into the future, so each batch is fresh
+        entries = repository.get_due(batch_size if limit is None else min(batch_size, limit - processed))
+        if not entries:
+            break
+        done = []
+        for entry in entries:
+            processed += 1
+            try:
+                removed = service.delete_queued_file(entry.filename, entry.file_path, entry.renditions)
+            except OSError as error:
+                attempts = entry.attempts + 1
+                delay = min(retry_base * 2 ** (attempts - 1), retry_max)
+                logger.warning('Could not delete %s (attempt %d), retrying in %ds: %s',
+                               entry.filename, attempts, delay, error)
+                repository.reschedule(entry.id, attempts, _utcnow() + timedelta(seconds=delay), str(error))
+                counts['failed'] += 1
+                continue
+            counts['removed' if removed else 'kept'] += 1
+            done.append(entry.id)
+        repository.delete_many(done)
+    return counts
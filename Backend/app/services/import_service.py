@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Bulk import of places and reviews for NAYA Travel Journal
+
+Records are streamed from NDJSON (one JSON object per line) or CSV (header
+row, one record per row) and validated with the same rules as
+PlaceService.create_place / ReviewService.create_review. Every chunk of
+IMPORT_CHUNK_SIZE valid records resolves its users and places in a few
+batched queries and is inserted in one transaction. Invalid rows are
+skipped and reported with their row number; if a chunk cannot be stored,
+it is retried row by row in savepoints and only the failing rows are
+reported, each with the database error.
+"""
+
+import csv
+import io
+import json
+import logging
+import uuid
+from itertools import islice
+from typing import Any, Callable, Dict, IO, Iterable, Iterator, List, Optional, Tuple
+
+from flask import current_app
+from sqlalchemy import inspect
+
+from app import db
+from app.models.place import Place
+from app.models.review import Review
+from app.repositories.place_repository import PlaceRepository
+from app.repositories.review_repository import ReviewRepository
+from app.repositories.user_repository import UserRepository
+from app.services.place_service import PlaceService
+from app.services.place_stats_cache import invalidate_place_statistics
+from app.services.review_service import ReviewService
+
+logger = logging.getLogger(__name__)
+
+IMPORT_KINDS = ('places', 'reviews')
+IMPORT_FORMATS = ('ndjson', 'csv')
+# Identifiers are always generated by the database layer
+_REVIEW_COLUMNS = frozenset(column.name for column in Review.__table__.columns) - {'id'}
+
+# A parsed row: (row number, record) or (row number, error raised while parsing)
+Row = Tuple[int, Any]
+
+
+def read_records(stream: IO[bytes], fmt: str) -> Iterator[Row]:
+    """
+    Parse an upload lazily
+    Args:
+        stream: Binary stream of UTF-8 text
+        fmt (str): 'ndjson' or 'csv'
+    Yields:
+        tuple: (row number, dict), or (row number, ValueError) for unparsable rows
+    Raises:
+        ValueError: If the format is unknown
+    """
+    if fmt not in IMPORT_FORMATS:
+        raise ValueError(f"Unsupported format: {fmt}. Use one of: {', '.join(IMPORT_FORMATS)}")
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    if fmt == 'csv':
+        yield from _read_csv(text)
+    else:
+        yield from _read_ndjson(text)
+
+
+def _read_ndjson(text: IO[str]) -> Iterator[Row]:
+    for line_number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as error:
+            yield line_number, ValueError(f"Invalid JSON: {error}")
+            continue
+        if not isinstance(record, dict):
+            yield line_number, ValueError("Each line must be a JSON object")
+            continue
+        yield line_number, record
+
+
+def _read_csv(text: IO[str]) -> Iterator[Row]:
+    reader = csv.DictReader(text)
+    for record in reader:
+        # Empty cells mean "not provided", as an absent JSON key would
+        yield reader.line_num, {key: value for key, value in record.items()
+                                if key and value not in (None, '')}
+
+
+class ImportService:
+    """Service for bulk place and review imports"""
+
+    def __init__(self):
+        self.place_service = PlaceService()
+        self.review_service = ReviewService()
+        self.place_repository = PlaceRepository()
+        self.review_repository = ReviewRepository()
+        self.user_repository = UserRepository()
+
+    def import_records(self, kind: str, rows: Iterable[Row], default_user_id: Optional[str] = None,
+                       chunk_size: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Validate and insert records chunk by chunk
+        Args:
+            kind (str): 'places' or 'reviews'
+            rows (iterable): Parsed rows, see read_records
+            default_user_id (str, optional): Author of reviews that carry no user_id
+            chunk_size (int, optional): Records per transaction; IMPORT_CHUNK_SIZE when omitted
+        Returns:
+            dict: Report with processed/created/failed counts and per-row errors
+        Raises:
+            ValueError: If the kind is unknown
+        """
+        if kind not in IMPORT_KINDS:
+            raise ValueError(f"Unsupported import type: {kind}. Use one of: {', '.join(IMPORT_KINDS)}")
+        chunk_size = chunk_size or current_app.config.get('IMPORT_CHUNK_SIZE', 500)
+        report = _ImportReport(current_app.config.get('IMPORT_MAX_REPORTED_ERRORS', 1000))
+        rows = iter(rows)
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+            if kind == 'places':
+                self._import_place_chunk(chunk, report)
+            else:
+                self._import_review_chunk(chunk, report, default_user_id)
+        return report.as_dict()
+
+    def _import_place_chunk(self, chunk: List[Row], report: '_ImportReport') -> None:
+        valid: List[Tuple[int, Dict[str, Any]]] = []
+        for row_number, record in chunk:
+            try:
+                if isinstance(record, Exception):
+                    raise record
+                valid.append((row_number, self.place_service.validate_place_data(record)))
+            except ValueError as error:
+                report.fail(row_number, str(error))
+
+        existing = self.place_repository.get_by_identities(
+            (fields['name'], fields['city'], fields['country']) for _, fields in valid
+        )
+        seen = set(existing)
+        places = []
+        for row_number, fields in valid:
+            identity = (fields['name'], fields['city'], fields['country'])
+            if identity in seen:
+                report.fail(row_number, "A place with this name already exists in this location")
+                continue
+            seen.add(identity)
+            places.append((row_number, fields))
+        self._store_rows(places, lambda items: [Place(**fields) for fields in items], report)
+
+    def _import_review_chunk(self, chunk: List[Row], report: '_ImportReport',
+                             default_user_id: Optional[str]) -> None:
+        valid = []
+        for row_number, record in chunk:
+            try:
+                if isinstance(record, Exception):
+                    raise record
+                if default_user_id and not record.get('user_id'):
+                    record = dict(record, user_id=default_user_id)
+                valid.append((row_number, *self.review_service.validate_review_data(record)))
+            except ValueError as error:
+                report.fail(row_number, str(error))
+
+        # Resolve users and places for the whole chunk at once
+        users = self.user_repository.get_many(payload['user_id'] for _, payload, _, _ in valid)
+        places = self.place_repository.get_many(place_id for _, _, place_id, _ in valid if place_id)
+        places_by_identity = self.place_repository.get_by_identities(
+            (fields['name'], fields['city'], fields['country'])
+            for _, _, place_id, fields in valid if not place_id
+        )
+
+        # New places get their id up front so several rows can refer to the same one
+        new_places: Dict[Tuple[str, str, str], Tuple[str, Dict[str, Any]]] = {}
+        resolved = []
+        for row_number, payload, place_id, place_fields in valid:
+            try:
+                if payload['user_id'] not in users:
+                    raise ValueError("User not found")
+                new_fields = None
+                if place_id:
+                    place = places.get(place_id)
+                    if place is None:
+                        raise ValueError("Place not found")
+                else:
+                    identity = (place_fields['name'], place_fields['city'], place_fields['country'])
+                    place = places_by_identity.get(identity)
+                    if place is not None:
+                        place_id = place.id
+                    else:
+                        if identity not in new_places:
+                            new_places[identity] = (str(uuid.uuid4()),
+                                                    self.review_service.build_place_fields(**place_fields))
+                        place_id, new_fields = new_places[identity]
+            except ValueError as error:
+                report.fail(row_number, str(error))
+                continue
+            resolved.append((row_number, payload, place_id, place, new_fields))
+
+        reviewed = self.review_repository.get_reviewed_pairs(
+            (payload['user_id'], place_id) for _, payload, place_id, _, _ in resolved
+        )
+        accepted = []
+        for row_number, payload, place_id, place, new_fields in resolved:
+            pair = (payload['user_id'], place_id)
+            if pair in reviewed:
+                report.fail(row_number, "User has already reviewed this place")
+                continue
+            reviewed.add(pair)
+            accepted.append((row_number, (payload, place_id, place, new_fields)))
+
+        stored = self._store_rows(accepted, self._review_stager(), report)
+        if stored:
+            invalidate_place_statistics({place_id for _, place_id, _, _ in stored})
+
+    def _review_stager(self) -> Callable[[List[Any]], List[Any]]:
+        """
+        Build the objects for a batch of accepted reviews, aggregates included
+        Places created by the import are rebuilt if an earlier attempt rolled them back.
+        """
+        created: Dict[str, Place] = {}
+
+        def _stage(items: List[Any]) -> List[Any]:
+            objects: List[Any] = []
+            ratings_by_place: Dict[str, Tuple[Place, List[int]]] = {}
+            for payload, place_id, place, new_fields in items:
+                if place is None:
+                    # Reuse a new place staged in this batch or stored by an earlier row,
+                    # rebuild it if the attempt that added it was rolled back
+                    place = created.get(place_id)
+                    if place is None or not (place_id in ratings_by_place or inspect(place).persistent):
+                        place = created[place_id] = Place(id=place_id, **new_fields)
+                        objects.append(place)
+                review = Review(place_id=place_id,
+                                **{key: value for key, value in payload.items() if key in _REVIEW_COLUMNS})
+                objects.append(review)
+                ratings_by_place.setdefault(place_id, (place, []))[1].append(review.rating)
+            # Aggregates are written in the same transaction as the reviews
+            for place, ratings in ratings_by_place.values():
+                place.record_ratings_added(ratings)
+            return objects
+        return _stage
+
+    def _store_rows(self, rows: List[Tuple[int, Any]], stage: Callable[[List[Any]], List[Any]],
+                    report: '_ImportReport') -> List[Any]:
+        """
+        Insert one chunk in a single transaction
+        If that fails, each row is retried in its own savepoint so only the
+        offending rows are rejected, each with its own error.
+        Args:
+            rows (list): (row number, item) pairs
+            stage (callable): Builds the objects to insert for a list of items
+            report: Import report to update
+        Returns:
+            list: Items that were stored
+        """
+        if not rows:
+            return []
+        try:
+            db.session.add_all(stage([item for _, item in rows]))
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            logger.warning('Bulk import chunk failed, retrying row by row', exc_info=True)
+        else:
+            report.created += len(rows)
+            return [item for _, item in rows]
+
+        stored = []
+        for row_number, item in rows:
+            try:
+                with db.session.begin_nested():
+                    db.session.add_all(stage([item]))
+            except Exception as error:
+                report.fail(row_number, f"Could not be stored: {getattr(error, 'orig', None) or error}")
+                continue
+            stored.append((row_number, item))
+        try:
+            db.session.commit()
+        except Exception as error:
+            db.session.rollback()
+            logger.warning('Bulk import chunk failed', exc_info=True)
+            for row_number, _ in stored:
+                report.fail(row_number, f"Could not be stored: {getattr(error, 'orig', None) or error}")
+            return []
+        report.created += len(stored)
+        return [item for _, item in stored]
+
+
+class _ImportReport:
+    """Running counts and per-row errors of an import"""
+
+    def __init__(self, max_errors: int):
+        self.max_errors = max_errors
+        self.created = 0
+        self.failed = 0
+        self.errors: List[Dict[str, Any]] = []
+
+    def fail(self, row_number: int, message: str) -> None:
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({'row': row_number, 'error': message})
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'processed': self.created + self.failed,
+            'created': self.created,
+            'failed': self.failed,
+            'errors': sorted(self.errors, key=lambda error: error['row']),
+            'errors_truncated': self.failed > len(self.errors),
+        }
@@ -3,9 +3,11 @@
 Photo Service for NAYA Travel Journal
 """
 
+import hashlib
 import os
 import uuid
-from typing import List, Optional, Dict, Any
+from typing import Iterator, List, Optional, Dict, Any, Tuple
+from urllib.parse import quote
 
 from flask import current_app, url_for
 from werkzeug.routing import BuildError
@@ -13,9 +15,21 @@ from werkzeug.datastructures import FileStorage
 from werkzeug.utils import secure_filename
 
 from app.models.photo import Photo
+from app.models.review import Review
+from app.models.serializer import serializer_for
+from app.models.user import PUBLIC_FIELDS, User
 from app.repositories.photo_repository import PhotoRepository
 from app.repositories.user_repository import UserRepository
 from app.repositories.review_repository import ReviewRepository
+from app.services.photo_storage import (
+    blob_lock, locate_stored_file, prune_empty_shards, sharded_name, upload_root
+)
+from app.services.file_deletions import schedule_file_deletions
+from app.services.renditions import rendition_filenames, schedule_renditions
+from app.services.user_snapshots import load_user_snapshot
+
+_FILENAME_PLACEHOLDER = '__naya_filename__'
+_UPLOAD_CHUNK_SIZE = 1024 * 1024
 
 class PhotoService:
     """Service for photo business logic"""
@@ -59,9 +73,6 @@ class PhotoService:
                 allowed = ", ".join(sorted(self._allowed_extensions()))
                 raise ValueError(f"Unsupported file type. Allowed types: {allowed}")
             
-            stored_filename = self._build_unique_filename(original_name)
-            storage_path, relative_path = self._resolve_storage_paths(stored_filename)
-            self._save_file(file_storage, storage_path)
         else:
             raise ValueError("A photo file must be provided")
         
@@ -85,17 +96,42 @@ class PhotoService:
             if review_obj.user_id != user_id and not user.is_admin:
                 raise PermissionError("You can only add photos to your own reviews")
         
-        # Create photo
-        photo = Photo(
-            filename=stored_filename,
-            original_name=original_name,
-            file_path=relative_path,
-            description=description,
-            user_id=user_id,
-            review_id=review_id
-        )
+        # Store the upload under its content hash; identical uploads share one blob
+        temp_path, digest = self._stream_to_temp_file(file_storage)
+        try:
+            stored_filename = self._build_content_filename(digest, original_name)
+            storage_path, relative_path = self._resolve_storage_paths(stored_filename)
+            existing_renditions = self.photo_repository.get_renditions_by_filename(stored_filename)
+            
+            photo = Photo(
+                filename=stored_filename,
+                original_name=original_name,
+                file_path=relative_path,
+                description=description,
+                user_id=user_id,
+                review_id=review_id,
+                renditions=existing_renditions
+            )
+            created_photo = self.photo_repository.create(photo)
+            # Published after the row exists, so a concurrent delete of the last other
+            # reference cannot remove the blob out from under this photo
+            try:
+                renditions_intact = self._publish_blob(temp_path, storage_path, existing_renditions)
+            except Exception:
+                # Do not leave a row pointing at a blob that was never stored
+                self.photo_repository.delete(created_photo.id)
+                raise
+            temp_path = None
+        finally:
+            if temp_path:
+                self._remove_quietly(temp_path)
         
-        created_photo = self.photo_repository.create(photo)
+        if existing_renditions is not None and not renditions_intact:
+            # The shared renditions were deleted with their last other photo before this row was visible
+            self.photo_repository.update(created_photo.id, {'renditions': None})
+            existing_renditions = None
+        if existing_renditions is None:
+            schedule_renditions(created_photo.id, storage_path, stored_filename)
         return self._build_photo_response(created_photo, user=user, review=review_obj)
     
     def get_photo_by_id(self, photo_id: str) -> Optional[Dict[str, Any]]:
@@ -129,7 +165,7 @@ class PhotoService:
         if not photo:
             raise ValueError("Photo not found")
 
-        requester = self.user_repository.get(user_id)
+        requester = load_user_snapshot(user_id)
         if not requester:
             raise ValueError("User not found")
         
@@ -161,15 +197,16 @@ class PhotoService:
         return self._build_photo_response(updated_photo)
 
     def delete_photos_for_review(self, review_id: str) -> int:
-        """Force delete every photo associated with a review."""
-        photos = self.photo_repository.get_by_review(review_id)
-        removed = 0
-        for photo in photos:
-            file_path = photo.file_path
-            if not self.photo_repository.delete(photo.id):
-                raise ValueError("Failed to delete associated photo")
-            self._delete_file(file_path)
-            removed += 1
+        """
+        Force delete every photo associated with a review.
+        Rows go in one statement; their files are removed by the background deletion queue.
+        """
+        try:
+            removed = self.photo_repository.delete_by_review(review_id)
+        except Exception:
+            raise ValueError("Failed to delete associated photos")
+        if removed:
+            schedule_file_deletions()
         return removed
     
     def delete_photo(self, photo_id: str, user_id: str) -> bool:
@@ -188,7 +225,7 @@ class PhotoService:
         if not photo:
             return False
 
-        requester = self.user_repository.get(user_id)
+        requester = load_user_snapshot(user_id)
         if not requester:
             raise ValueError("User not found")
         
@@ -196,9 +233,9 @@ class PhotoService:
         if photo.user_id != user_id and not requester.is_admin:
             raise PermissionError("You can only delete your own photos")
         
-        removed = self.photo_repository.delete(photo_id)
+        removed = self.photo_repository.delete_with_files([photo_id]) > 0
         if removed:
-            self._delete_file(photo.file_path)
+            schedule_file_deletions()
         return removed
     
     def get_photos_by_user(self, user_id: str, limit: int = 20) -> List[Dict[str, Any]]:
@@ -216,20 +253,65 @@ class PhotoService:
             raise ValueError("User not found")
         
         photos = self.photo_repository.get_by_user(user_id, limit)
-        result = []
-        
-        for photo in photos:
-            result.append(self._build_photo_response(photo, user=user))
-        
-        return result
+        return self._build_photo_responses(photos, users={user.id: user})
 
-    def _build_unique_filename(self, original_name: str) -> str:
-        """Build a unique filename preserving the extension."""
+    def migrate_storage_layout(self, batch_size: int = 500,
+                               after_id: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Move flat-layout files into the sharded layout and rewrite Photo.file_path
+        Safe to interrupt and re-run: files already moved are only re-pointed, and
+        photos already in the sharded layout are skipped.
+        Args:
+            batch_size (int): Photos examined per batch (one transaction each)
+            after_id (str, optional): Resume after this photo id
+        Yields:
+            dict: Per batch, {last_id, moved, updated, missing}
+        """
+        upload_folder = current_app.config.get('UPLOAD_FOLDER', 'uploads')
+        storage_dir = upload_root()
+        while True:
+            photos = self.photo_repository.get_batch_after(after_id, batch_size)
+            if not photos:
+                return
+            after_id = photos[-1].id
+            file_paths: Dict[str, str] = {}
+            moved = missing = 0
+            for photo in photos:
+                target_name = sharded_name(photo.filename)
+                target_path = os.path.join(upload_folder, target_name)
+                if photo.file_path == target_path or photo.filename in file_paths:
+                    continue
+                with blob_lock():
+                    source = os.path.join(storage_dir, photo.filename)
+                    destination = os.path.join(storage_dir, target_name)
+                    if os.path.isfile(source):
+                        os.makedirs(os.path.dirname(destination), exist_ok=True)
+                        for name in [photo.filename] + list(rendition_filenames(photo.renditions)):
+                            self._move_stored_file(os.path.join(storage_dir, name),
+                                                   os.path.join(os.path.dirname(destination), name))
+                        moved += 1
+                    elif not os.path.isfile(destination):
+                        missing += 1
+                        continue
+                file_paths[photo.filename] = target_path
+            updated = self.photo_repository.set_file_paths(file_paths) if file_paths else 0
+            yield {'last_id': after_id, 'moved': moved, 'updated': updated, 'missing': missing}
+
+    def _move_stored_file(self, source: str, destination: str) -> None:
+        """Move one file, dropping the source if identical content is already at the destination."""
+        if not os.path.exists(source):
+            return
+        if os.path.exists(destination):
+            self._remove_quietly(source)
+        else:
+            os.replace(source, destination)
+
+    def _build_content_filename(self, digest: str, original_name: str) -> str:
+        """Build the content-addressed filename for a blob, preserving the extension."""
         extension = ''
         if '.' in original_name:
             extension = original_name.rsplit('.', 1)[1].lower()
-        unique_id = uuid.uuid4().hex
-        return f"{unique_id}.{extension}" if extension else unique_id
+        return f"{digest}.{extension}" if extension else digest
 
     def _allowed_extensions(self):
         config_extensions = current_app.config.get('ALLOWED_EXTENSIONS')
@@ -245,26 +327,85 @@ class PhotoService:
         return extension in self._allowed_extensions()
 
     def _resolve_storage_paths(self, filename: str):
-        """Compute absolute storage path and relative DB path."""
+        """
+        Compute absolute storage path and relative DB path.
+        New files go to the sharded layout; a blob already stored flat (not yet
+        migrated) keeps its location so identical content is not stored twice.
+        """
         upload_folder = current_app.config.get('UPLOAD_FOLDER', 'uploads')
-        if os.path.isabs(upload_folder):
-            storage_dir = upload_folder
-            relative_path = os.path.join(upload_folder, filename)
-        else:
-            storage_dir = os.path.join(current_app.root_path, upload_folder)
-            relative_path = os.path.join(upload_folder, filename)
-        os.makedirs(storage_dir, exist_ok=True)
-        absolute_path = os.path.join(storage_dir, filename)
+        storage_dir = upload_root()
+        stored_name = filename if os.path.isfile(os.path.join(storage_dir, filename)) else sharded_name(filename)
+        absolute_path = os.path.join(storage_dir, stored_name)
+        relative_path = os.path.join(upload_folder, stored_name)
         return absolute_path, relative_path
 
-    def _save_file(self, file_storage: FileStorage, destination: str) -> None:
-        """Persist the uploaded file on disk."""
-        file_storage.save(destination)
+    def _stream_to_temp_file(self, file_storage: FileStorage) -> Tuple[str, str]:
+        """Copy the upload into a temporary file in the upload folder, hashing it on the way."""
+        storage_dir = upload_root()
+        os.makedirs(storage_dir, exist_ok=True)
+        temp_path = os.path.join(storage_dir, f".upload-{uuid.uuid4().hex}.tmp")
+        hasher = hashlib.sha256()
+        try:
+            with open(temp_path, 'wb') as destination:
+                while True:
+                    chunk = file_storage.stream.read(_UPLOAD_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    hasher.update(chunk)
+                    destination.write(chunk)
+        except Exception:
+            self._remove_quietly(temp_path)
+            raise
+        return temp_path, hasher.hexdigest()
 
-    def _delete_file(self, file_path: Optional[str]) -> None:
-        """Remove a file from disk if it exists."""
-        if not file_path:
-            return
+    def _publish_blob(self, temp_path: str, destination: str,
+                      renditions: Optional[Dict[str, Dict[str, str]]] = None) -> bool:
+        """
+        Move an uploaded blob into place, or drop it if identical content is already stored.
+        Args:
+            temp_path (str): Uploaded temporary file
+            destination (str): Absolute storage path of the blob
+            renditions (dict, optional): Renditions inherited from another photo of the same blob
+        Returns:
+            bool: Whether every inherited rendition file is still on disk
+        """
+        with blob_lock():
+            if os.path.exists(destination):
+                self._remove_quietly(temp_path)
+            else:
+                # Created under the lock: deletions prune empty shard directories
+                os.makedirs(os.path.dirname(destination), exist_ok=True)
+                os.replace(temp_path, destination)
+            directory = os.path.dirname(destination)
+            return all(os.path.isfile(os.path.join(directory, name)) for name in rendition_filenames(renditions))
+
+    def _remove_quietly(self, path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def delete_queued_file(self, filename: str, file_path: str,
+                           renditions: Optional[Dict[str, Dict[str, str]]] = None) -> bool:
+        """
+        Remove a queued blob and its renditions from disk unless a photo references it again.
+        Args:
+            filename (str): Stored filename
+            file_path (str): File path recorded on the deleted photo
+            renditions (dict, optional): Renditions recorded on the deleted photo
+        Returns:
+            bool: True if the files were removed, False if the blob is still in use
+        Raises:
+            OSError: If a file exists but cannot be removed
+        """
+        with blob_lock():
+            if self.photo_repository.is_filename_referenced(filename):
+                return False
+            self._remove_blob(file_path, renditions)
+            return True
+
+    def _remove_blob(self, file_path: str, renditions: Optional[Dict[str, Dict[str, str]]]) -> None:
+        """Remove a file, and any renditions stored next to it, from disk if they exist."""
         upload_folder = current_app.config.get('UPLOAD_FOLDER', 'uploads')
         if os.path.isabs(file_path):
             absolute_path = file_path
@@ -273,40 +414,99 @@ class PhotoService:
                 absolute_path = os.path.join(upload_folder, os.path.basename(file_path))
             else:
                 absolute_path = os.path.join(current_app.root_path, file_path)
-        if os.path.exists(absolute_path):
+        if not os.path.exists(absolute_path):
+            # The layout migration may have moved the file since the row was read
+            stored_name = locate_stored_file(os.path.basename(file_path))
+            if stored_name:
+                absolute_path = os.path.join(upload_root(), stored_name)
+        directory = os.path.dirname(absolute_path)
+        for path in [absolute_path] + [os.path.join(directory, name) for name in rendition_filenames(renditions)]:
             try:
-                os.remove(absolute_path)
-            except OSError:
+                os.remove(path)
+            except FileNotFoundError:
                 pass
+        prune_empty_shards(directory)
 
-    def _build_photo_response(self, photo: Photo, user=None, review=None) -> Dict[str, Any]:
+    def _build_photo_response(self, photo: Photo, user=None, review=None, include_review: bool = True) -> Dict[str, Any]:
         """Build a serialisable representation for a photo instance."""
-        data = photo.to_dict()
+        users = {user.id: user} if user is not None else None
+        reviews = {review.id: review} if review is not None else None
+        return self._build_photo_responses([photo], users=users, reviews=reviews, include_review=include_review)[0]
 
-        if user is None:
-            user = self.user_repository.get(photo.user_id)
-        data['user'] = user.to_public_dict() if user else None
+    def _build_photo_responses(
+        self,
+        photos: List[Photo],
+        users: Optional[Dict[str, Any]] = None,
+        reviews: Optional[Dict[str, Any]] = None,
+        include_review: bool = True,
+    ) -> List[Dict[str, Any]]:
+        """
+        Build serialisable representations for many photos at once.
+        Missing users and reviews are prefetched with one IN query each.
+        """
+        if not photos:
+            return []
 
-        if photo.review_id:
-            if review is None:
-                review = self.review_repository.get(photo.review_id)
-            data['review'] = review.to_dict() if review else None
-        else:
-            data['review'] = None
+        users = dict(users or {})
+        users.update(self.user_repository.get_many(
+            photo.user_id for photo in photos if photo.user_id not in users
+        ))
+        reviews = dict(reviews or {})
+        if include_review:
+            reviews.update(self.review_repository.get_many(
+                photo.review_id for photo in photos if photo.review_id and photo.review_id not in reviews
+            ))
 
-        try:
-            data['file_url'] = url_for('v1.photos.serve_photo_file', filename=photo.filename, _external=True)
-        except BuildError:
-            try:
-                data['file_url'] = url_for('photos.serve_photo_file', filename=photo.filename, _external=True)
-            except RuntimeError:
+        serialize_photo = serializer_for(Photo)
+        serialize_user = serializer_for(User, PUBLIC_FIELDS)
+        serialize_review = serializer_for(Review)
+        url_template = self._file_url_template()
+        user_payloads: Dict[str, Optional[Dict[str, Any]]] = {}
+        review_payloads: Dict[str, Optional[Dict[str, Any]]] = {}
+        result = []
+        for photo in photos:
+            data = serialize_photo(photo)
+
+            if photo.user_id not in user_payloads:
+                user = users.get(photo.user_id)
+                user_payloads[photo.user_id] = serialize_user(user) if user else None
+            data['user'] = user_payloads[photo.user_id]
+
+            if include_review:
+                if photo.review_id:
+                    if photo.review_id not in review_payloads:
+                        review = reviews.get(photo.review_id)
+                        review_payloads[photo.review_id] = serialize_review(review) if review else None
+                    data['review'] = review_payloads[photo.review_id]
+                else:
+                    data['review'] = None
+
+            if url_template:
+                data['file_url'] = url_template.replace(_FILENAME_PLACEHOLDER, quote(photo.filename))
+                data['renditions'] = {
+                    size_name: {
+                        format_name: url_template.replace(_FILENAME_PLACEHOLDER, quote(name))
+                        for format_name, name in files.items()
+                    }
+                    for size_name, files in (photo.renditions or {}).items()
+                } or None
+            else:
                 data['file_url'] = None
+                data['renditions'] = None
+            data['caption'] = data.get('description')
+            result.append(data)
+        return result
+
+    def _file_url_template(self) -> Optional[str]:
+        """Return the public file URL with a filename placeholder, or None outside a request."""
+        for endpoint in ('v1.photos.serve_photo_file', 'photos.serve_photo_file'):
+            try:
+                return url_for(endpoint, filename=_FILENAME_PLACEHOLDER, _external=True)
             except BuildError:
-                data['file_url'] = None
-        except RuntimeError:
-            data['file_url'] = None
-        data['caption'] = data.get('description')
-        return data
+                continue
+            except RuntimeError:
+                return None
+        return None
     
     def get_photos_by_review(self, review_id: str, limit: int = 20) -> List[Dict[str, Any]]:
         """
@@ -323,7 +523,63 @@ class PhotoService:
             raise ValueError("Review not found")
         
         photos = self.photo_repository.get_by_review(review_id, limit)
-        return [self._build_photo_response(photo, review=review) for photo in photos]
+        return self._build_photo_responses(photos, reviews={review.id: review})
+    
+    def get_photos_page(self, limit: int, cursor: Optional[str] = None, user_id: Optional[str] = None,
+                        review_id: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Get a page of photos, newest first, with user and review info
+        Args:
+            limit (int): Page size
+            cursor (str, optional): Cursor returned with the previous page
+            user_id (str, optional): Only photos uploaded by this user
+            review_id (str, optional): Only photos attached to this review
+        Returns:
+            Tuple of (photos, cursor for the next page or None)
+        Raises:
+            ValueError: If the user, review or cursor is invalid
+        """
+        users = None
+        reviews = None
+        if user_id:
+            user = self.user_repository.get(user_id)
+            if not user:
+                raise ValueError("User not found")
+            users = {user.id: user}
+        if review_id:
+            review = self.review_repository.get(review_id)
+            if not review:
+                raise ValueError("Review not found")
+            reviews = {review.id: review}
+        
+        photos, next_cursor = self.photo_repository.get_photo_page(
+            limit, cursor, user_id=user_id, review_id=review_id
+        )
+        return self._build_photo_responses(photos, users=users, reviews=reviews), next_cursor
+    
+    def get_photos_for_reviews(self, review_ids: List[str], users: Optional[Dict[str, Any]] = None,
+                               limit: int = 20) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Get photos for several reviews at once, without the review payload
+        Args:
+            review_ids (list): Review IDs
+            users (dict, optional): Already loaded users keyed by ID
+            limit (int): Maximum number of photos per review
+        Returns:
+            dict: Photo lists keyed by review ID
+        """
+        photos_per_review: Dict[str, int] = {}
+        selected = []
+        for photo in self.photo_repository.get_by_reviews(review_ids):
+            seen = photos_per_review.get(photo.review_id, 0)
+            if seen < limit:
+                photos_per_review[photo.review_id] = seen + 1
+                selected.append(photo)
+
+        grouped: Dict[str, List[Dict[str, Any]]] = {}
+        for photo, data in zip(selected, self._build_photo_responses(selected, users=users, include_review=False)):
+            grouped.setdefault(photo.review_id, []).append(data)
+        return grouped
     
     def get_recent_photos(self, limit: int = 20) -> List[Dict[str, Any]]:
         """
@@ -334,7 +590,7 @@ class PhotoService:
             list: Recent photos with user and review info
         """
         photos = self.photo_repository.get_recent_photos(limit)
-        return [self._build_photo_response(photo) for photo in photos]
+        return self._build_photo_responses(photos)
     
     def get_orphaned_photos(self, user_id: str) -> List[Dict[str, Any]]:
         """
@@ -344,8 +600,59 @@ class PhotoService:
         Returns:
             list: Orphaned photos owned by user
         """
-        # Get all orphaned photos and filter by user
-        all_orphaned = self.photo_repository.get_orphaned_photos()
-        photos = [photo for photo in all_orphaned if photo.user_id == user_id]
+        photos, _ = self.get_orphaned_photos_page(user_id, limit=None)
+        return photos
+    
+    def get_orphaned_photos_page(self, user_id: str, limit: Optional[int] = None,
+                                 cursor: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Get a page of the user's photos not associated with any review
+        Args:
+            user_id (str): User ID from JWT
+            limit (int, optional): Page size (all orphaned photos when omitted)
+            cursor (str, optional): Cursor returned with the previous page
+        Returns:
+            Tuple of (orphaned photos, cursor for the next page or None)
+        """
+        if limit is None:
+            photos, next_cursor = self.photo_repository.get_orphaned_by_user(user_id), None
+        else:
+            photos, next_cursor = self.photo_repository.get_orphaned_page(user_id, limit, cursor)
         user = self.user_repository.get(user_id)
-        return [self._build_photo_response(photo, user=user) for photo in photos]
+        return self._build_photo_responses(photos, users={user.id: user} if user else None), next_cursor
+    
+    def attach_photos_to_review(self, review_id: str, photo_ids: List[str], user_id: str) -> Dict[str, Any]:
+        """
+        Attach several orphaned photos to a review at once
+        Args:
+            review_id (str): Review ID
+            photo_ids (list): IDs of orphaned photos owned by the review author
+            user_id (str): User ID from JWT
+        Returns:
+            dict: Number of photos requested and attached
+        Raises:
+            ValueError: If the review or user is not found, or the photo IDs are missing or malformed
+            PermissionError: If the user does not own the review
+        """
+        if not isinstance(photo_ids, list) or not photo_ids:
+            raise ValueError("photo_ids must be a non-empty list")
+        if not all(isinstance(photo_id, str) and photo_id for photo_id in photo_ids):
+            raise ValueError("photo_ids must contain only non-empty strings")
+        
+        review = self.review_repository.get(review_id)
+        if not review:
+            raise ValueError("Review not found")
+        
+        requester = load_user_snapshot(user_id)
+        if not requester:
+            raise ValueError("User not found")
+        
+        if review.user_id != user_id and not requester.is_admin:
+            raise PermissionError("You can only link photos to your own reviews")
+        
+        attached = self.photo_repository.attach_to_review(photo_ids, review_id, owner_id=review.user_id)
+        return {
+            'review_id': review_id,
+            'requested': len(set(photo_ids)),
+            'attached': attached
+        }
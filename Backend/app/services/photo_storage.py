@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Upload directory layout for NAYA Travel Journal
+
+New files are fanned out into two levels of sub-directories named after the
+first characters of the stored filename (``ab/cd/abcd….jpg``). Stored names
+are content hashes (or random hex for older uploads), so the directories
+fill evenly, and renditions (``abcd…_thumb.webp``) land next to their
+original. Files written before sharding live directly in UPLOAD_FOLDER until
+``flask migrate-upload-layout`` moves them; lookups try both places.
+
+Publishing a blob and deleting its last reference both run under
+blob_lock(). It combines a lock in this process with an exclusive flock on
+a lock file in the upload folder, so web workers and the
+``flask process-file-deletions`` drain exclude one another as well.
+"""
+
+import os
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - exercised only on platforms without flock
+    fcntl = None
+
+from flask import current_app
+from werkzeug.security import safe_join
+
+_SHARD_WIDTH = 2
+_SHARD_DEPTH = 2
+_LOCK_FILENAME = '.blob.lock'
+_thread_lock = threading.Lock()
+
+
+def upload_root() -> str:
+    """Absolute path of the upload folder"""
+    upload_folder = current_app.config.get('UPLOAD_FOLDER', 'uploads')
+    if os.path.isabs(upload_folder):
+        return upload_folder
+    return os.path.join(current_app.root_path, upload_folder)
+
+
+def sharded_name(filename: str) -> str:
+    """
+    Path of a stored file relative to the upload folder in the sharded layout
+    Args:
+        filename (str): Stored filename
+    Returns:
+        str: e.g. 'ab/cd/abcdef.jpg'; names too short to shard stay flat
+    """
+    prefix_length = _SHARD_WIDTH * _SHARD_DEPTH
+    prefix = filename[:prefix_length].lower()
+    if len(filename) <= prefix_length or not prefix.isalnum():
+        return filename
+    shards = [prefix[i:i + _SHARD_WIDTH] for i in range(0, prefix_length, _SHARD_WIDTH)]
+    return '/'.join(shards + [filename])
+
+
+def locate_stored_file(filename: str) -> Optional[str]:
+    """
+    Find a stored file in either layout
+    Args:
+        filename (str): Stored filename (or a path relative to the upload folder)
+    Returns:
+        str or None: Path relative to the upload folder, None if the file does not exist
+    """
+    root = upload_root()
+    for candidate in (sharded_name(filename), filename):
+        path = safe_join(root, candidate)
+        if path is not None and os.path.isfile(path):
+            return candidate
+    return None
+
+
+def prune_empty_shards(directory: str) -> None:
+    """Remove shard directories left empty by a deletion, up to the upload folder"""
+    root = os.path.normpath(upload_root())
+    directory = os.path.normpath(directory)
+    while directory != root and directory.startswith(root + os.sep):
+        try:
+            os.rmdir(directory)
+        except OSError:
+            # Not empty (or already gone)
+            return
+        directory = os.path.dirname(directory)
+
+
+@contextmanager
+def blob_lock() -> Iterator[None]:
+    """
+    Serialise blob publication against last-reference deletion across threads and processes
+    Without fcntl (non-POSIX platforms) only threads of this process are excluded.
+    """
+    with _thread_lock:
+        if fcntl is None:
+            yield
+            return
+        root = upload_root()
+        os.makedirs(root, exist_ok=True)
+        with open(os.path.join(root, _LOCK_FILENAME), 'a') as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
@@ -3,10 +3,13 @@
 Place Service for NAYA Travel Journal - Version simplifiée
 """
 
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
+from app.models import geohash
 from app.models.place import Place
+from app.models.serializer import serializer_for
 from app.repositories.place_repository import PlaceRepository
 from app.repositories.review_repository import ReviewRepository
+from app.services.place_stats_cache import get_place_stats_cache, invalidate_place_statistics
 
 class PlaceService:
     """Service for place business logic"""
@@ -25,6 +28,32 @@ class PlaceService:
         Raises:
             ValueError: If validation fails
         """
+        place_fields = self.validate_place_data(place_data)
+        
+        # Check for duplicate places (same name, city, country)
+        if self.place_repository.place_exists(
+            place_fields['name'], 
+            place_fields['city'], 
+            place_fields['country']
+        ):
+            raise ValueError("A place with this name already exists in this location")
+        
+        # Create place
+        place = Place(**place_fields)
+        
+        created_place = self.place_repository.create(place)
+        return created_place.to_dict()
+    
+    def validate_place_data(self, place_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Validate place fields (shared by single and bulk creation)
+        Args:
+            place_data (dict): Place data
+        Returns:
+            dict: Place model fields
+        Raises:
+            ValueError: If validation fails
+        """
         # Validate required fields
         required_fields = ['name', 'city', 'country']
         for field in required_fields:
@@ -38,26 +67,14 @@ class PlaceService:
             if not self._validate_coordinates(lat, lon):
                 raise ValueError("Invalid coordinates")
         
-        # Check for duplicate places (same name, city, country)
-        if self.place_repository.place_exists(
-            place_data['name'], 
-            place_data['city'], 
-            place_data['country']
-        ):
-            raise ValueError("A place with this name already exists in this location")
-        
-        # Create place
-        place = Place(
-            name=place_data['name'],
-            description=place_data.get('description', ''),
-            city=place_data['city'],
-            country=place_data['country'],
-            latitude=place_data.get('latitude'),
-            longitude=place_data.get('longitude')
-        )
-        
-        created_place = self.place_repository.create(place)
-        return created_place.to_dict()
+        return {
+            'name': place_data['name'],
+            'description': place_data.get('description', ''),
+            'city': place_data['city'],
+            'country': place_data['country'],
+            'latitude': place_data.get('latitude'),
+            'longitude': place_data.get('longitude'),
+        }
     
     def get_place_by_id(self, place_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -105,6 +122,7 @@ class PlaceService:
         update_dict = {k: v for k, v in place_data.items() if k in allowed_fields}
         
         self.place_repository.update(place_id, update_dict)
+        invalidate_place_statistics([place_id])
         updated_place = self.place_repository.get(place_id)
         
         if not updated_place:
@@ -124,7 +142,9 @@ class PlaceService:
         if not place:
             return False
         
-        return self.place_repository.delete(place_id)
+        deleted = self.place_repository.delete(place_id)
+        invalidate_place_statistics([place_id])
+        return deleted
     
     def search_places(self, search_term: str = '', city: str = '', country: str = '', limit: int = 20) -> List[Dict[str, Any]]:
         """
@@ -147,17 +167,26 @@ class PlaceService:
             # Get all places, ordered by creation date
             places = self.place_repository.get_all(limit)
         
-        result = []
-        for place in places:
-            place_data = place.to_dict()
-            
-            # Add basic statistics
-            place_data['review_count'] = self.review_repository.get_review_count_for_place(place.id)
-            place_data['average_rating'] = self.review_repository.get_average_rating_for_place(place.id)
-            
-            result.append(place_data)
-        
-        return result
+        return self._build_place_cards(places)
+    
+    def get_places_page(self, limit: int, cursor: Optional[str] = None, city: str = '',
+                        country: str = '') -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Get a page of places, newest first
+        Args:
+            limit (int): Page size
+            cursor (str, optional): Cursor returned with the previous page
+            city (str): Filter by city
+            country (str): Filter by country
+        Returns:
+            Tuple of (places with statistics, cursor for the next page or None)
+        Raises:
+            ValueError: If the cursor is invalid
+        """
+        places, next_cursor = self.place_repository.get_place_page(
+            limit, cursor, city=city or None, country=country or None
+        )
+        return self._build_place_cards(places), next_cursor
     
     def get_nearby_places(self, latitude: float, longitude: float, radius: float = 10.0, limit: int = 20) -> List[Dict[str, Any]]:
         """
@@ -168,27 +197,16 @@ class PlaceService:
             radius (float): Search radius in km
             limit (int): Maximum number of results
         Returns:
-            list: Nearby places with distance
+            list: Nearby places with distance, nearest first
         """
         if not self._validate_coordinates(latitude, longitude):
             raise ValueError("Invalid coordinates")
         
-        places = self.place_repository.get_nearby_places(latitude, longitude, radius, limit)
-        result = []
+        matches = self.place_repository.find_nearest(float(latitude), float(longitude), radius, limit)
+        result = self._build_place_cards([place for place, _ in matches])
         
-        for place in places:
-            place_data = place.to_dict()
-            
-            # Add statistics
-            place_data['review_count'] = self.review_repository.get_review_count_for_place(place.id)
-            place_data['average_rating'] = self.review_repository.get_average_rating_for_place(place.id)
-            
-            # Calculate distance
-            if place.latitude and place.longitude:
-                distance = self._calculate_distance(latitude, longitude, place.latitude, place.longitude)
-                place_data['distance_km'] = round(distance, 2)
-            
-            result.append(place_data)
+        for (_, distance), place_data in zip(matches, result):
+            place_data['distance_km'] = round(distance, 2)
         
         return result
     
@@ -201,27 +219,22 @@ class PlaceService:
             list: Popular places with statistics
         """
         places = self.place_repository.get_popular_destinations(limit)
-        result = []
-        
-        for place in places:
-            place_data = place.to_dict()
-            
-            # Add statistics
-            place_data['review_count'] = self.review_repository.get_review_count_for_place(place.id)
-            place_data['average_rating'] = self.review_repository.get_average_rating_for_place(place.id)
-            
-            result.append(place_data)
-        
-        return result
+        return self._build_place_cards(places)
     
     def get_place_statistics(self, place_id: str) -> Dict[str, Any]:
         """
-        Get detailed statistics for a place
+        Get detailed statistics for a place (served from the statistics cache)
         Args:
             place_id (str): Place ID
         Returns:
             dict: Place statistics
+        Raises:
+            ValueError: If place not found
         """
+        return get_place_stats_cache().get_or_load(place_id, lambda: self._load_place_statistics(place_id))
+    
+    def _load_place_statistics(self, place_id: str) -> Dict[str, Any]:
+        """Build place statistics from the aggregate columns"""
         place = self.place_repository.get(place_id)
         if not place:
             raise ValueError("Place not found")
@@ -229,13 +242,36 @@ class PlaceService:
         stats = {
             'place_id': place_id,
             'place_name': place.name,
-            'total_reviews': self.review_repository.get_review_count_for_place(place_id),
-            'average_rating': self.review_repository.get_average_rating_for_place(place_id),
-            'rating_distribution': self.review_repository.get_rating_distribution_for_place(place_id)
+            'total_reviews': place.review_count,
+            'average_rating': place.average_rating,
+            'rating_distribution': place.rating_distribution
         }
         
         return stats
     
+    def _build_place_cards(self, places: List[Place]) -> List[Dict[str, Any]]:
+        """Serialise places with review count and average rating from their aggregate columns."""
+        serialize_place = serializer_for(Place)
+        result = []
+        for place in places:
+            place_data = serialize_place(place)
+            place_data['review_count'] = place.review_count
+            place_data['average_rating'] = place.average_rating
+            result.append(place_data)
+        return result
+    
+    def recompute_rating_aggregates(self, place_ids: Optional[List[str]] = None) -> int:
+        """
+        Repair denormalised rating aggregates from the reviews table
+        Args:
+            place_ids (list, optional): Restrict the repair to these places
+        Returns:
+            int: Number of places recomputed
+        """
+        updated = self.place_repository.recompute_rating_aggregates(place_ids)
+        invalidate_place_statistics(place_ids)
+        return updated
+    
     def _validate_coordinates(self, latitude: float, longitude: float) -> bool:
         """
         Validate geographic coordinates
@@ -261,18 +297,4 @@ class PlaceService:
         Returns:
             float: Distance in kilometers
         """
-        import math
-        
-        # Convert to radians
-        lat1, lon1, lat2, lon2 = map(math.radians, [lat1, lon1, lat2, lon2])
-        
-        # Haversine formula
-        dlat = lat2 - lat1
-        dlon = lon2 - lon1
-        a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon/2)**2
-        c = 2 * math.asin(math.sqrt(a))
-        
-        # Earth's radius in kilometers
-        r = 6371
-        
-        return r * c
\ No newline at end of file
+        return geohash.haversine_km(lat1, lon1, lat2, lon2)
\ No newline at end of file
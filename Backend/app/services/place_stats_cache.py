@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Place statistics cache for NAYA Travel Journal
+
+Statistics are cached per place id in the application cache and invalidated
+whenever a review or place write changes them. Entries also expire after
+PLACE_STATS_CACHE_TTL seconds.
+"""
+
+from typing import Iterable, Optional
+
+from flask import current_app
+
+from app.cache import CacheNamespace, get_cache
+
+NAMESPACE = 'place_statistics'
+
+
+def get_place_stats_cache() -> CacheNamespace:
+    """Return the place statistics namespace of the current application's cache"""
+    return get_cache().namespace(NAMESPACE, ttl=current_app.config.get('PLACE_STATS_CACHE_TTL', 60))
+
+
+def invalidate_place_statistics(place_ids: Optional[Iterable[str]] = None) -> None:
+    """
+    Drop cached statistics
+    Args:
+        place_ids (iterable, optional): Places to drop; every place when omitted
+    """
+    cache = get_place_stats_cache()
+    if place_ids is None:
+        cache.clear()
+    else:
+        cache.delete(place_ids)
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Photo renditions for NAYA Travel Journal
+
+Uploads are downscaled into bounded-size renditions (thumb, medium, large by
+default), each written as WebP with a JPEG fallback next to the original.
+Generation runs on a small thread pool after the upload has been stored, so
+the upload request does not wait for it. Testing setups (or
+PHOTO_RENDITIONS_SYNC) run it inline instead. Rendering needs the optional
+Pillow package; without it photos simply keep serving the original.
+"""
+
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+from flask import current_app
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # pragma: no cover - exercised only without Pillow
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+EXECUTOR_KEY = 'naya_rendition_executor'
+# Longest edge in pixels per rendition
+DEFAULT_RENDITION_SIZES = {'thumb': 320, 'medium': 800, 'large': 1600}
+_FORMATS = (('webp', 'WEBP', {'quality': 80, 'method': 4}),
+            ('jpeg', 'JPEG', {'quality': 82, 'optimize': True, 'progressive': True}))
+_EXTENSIONS = {'webp': 'webp', 'jpeg': 'jpg'}
+
+
+def renditions_available() -> bool:
+    """Whether Pillow is installed"""
+    return Image is not None
+
+
+def rendition_filename(filename: str, size_name: str, format_name: str) -> str:
+    """Name of a rendition file stored next to the original"""
+    stem = filename.rsplit('.', 1)[0]
+    return f'{stem}_{size_name}.{_EXTENSIONS[format_name]}'
+
+
+def generate_renditions(source_path: str, filename: str,
+                        sizes: Optional[Dict[str, int]] = None) -> Dict[str, Dict[str, str]]:
+    """
+    Render downscaled copies of an image
+    Args:
+        source_path (str): Absolute path of the original
+        filename (str): Stored filename of the original (renditions derive their names from it)
+        sizes (dict, optional): Rendition name -> longest edge in pixels
+    Returns:
+        dict: Rendition name -> {format: filename}, e.g. {'thumb': {'webp': ..., 'jpeg': ...}}
+    Raises:
+        OSError: If the original cannot be read as an image
+    """
+    sizes = sizes or DEFAULT_RENDITION_SIZES
+    directory = os.path.dirname(source_path)
+    result: Dict[str, Dict[str, str]] = {}
+    with Image.open(source_path) as original:
+        # Respect camera orientation; animated images use their first frame
+        image = ImageOps.exif_transpose(original)
+        image = image.convert('RGBA' if image.mode in ('RGBA', 'LA', 'P') else 'RGB')
+        for size_name, edge in sorted(sizes.items(), key=lambda item: -item[1]):
+            resized = image.copy()
+            resized.thumbnail((edge, edge), Image.LANCZOS)
+            files = {}
+            for format_name, pil_format, options in _FORMATS:
+                output = resized
+                if pil_format == 'JPEG' and resized.mode == 'RGBA':
+                    # JPEG has no alpha channel: composite onto white
+                    flattened = Image.new('RGB', resized.size, (255, 255, 255))
+                    flattened.paste(resized, mask=resized.getchannel('A'))
+                    output = flattened
+                name = rendition_filename(filename, size_name, format_name)
+                output.save(os.path.join(directory, name), pil_format, **options)
+                files[format_name] = name
+            result[size_name] = files
+    return result
+
+
+def rendition_filenames(renditions: Optional[Dict[str, Dict[str, str]]]):
+    """Every file name referenced by a photo's renditions"""
+    for files in (renditions or {}).values():
+        yield from files.values()
+
+
+def schedule_renditions(photo_id: str, source_path: str, filename: str) -> None:
+    """
+    Generate renditions for a stored upload and record them on the photo
+    Runs inline when testing or when PHOTO_RENDITIONS_SYNC is set, otherwise on
+    the application's rendition thread pool.
+    """
+    app = current_app._get_current_object()
+    if not renditions_available() or not app.config.get('PHOTO_RENDITIONS_ENABLED', True):
+        return
+    if app.config.get('TESTING') or app.config.get('PHOTO_RENDITIONS_SYNC'):
+        # Same session as the caller, so the caller's photo sees the renditions
+        _render_and_record(app, photo_id, source_path, filename)
+        return
+    executor = app.extensions.get(EXECUTOR_KEY)
+    if executor is None:
+        executor = app.extensions.setdefault(EXECUTOR_KEY, ThreadPoolExecutor(
+            max_workers=app.config.get('PHOTO_RENDITION_WORKERS', 2),
+            thread_name_prefix='naya-renditions',
+        ))
+    executor.submit(_render_in_worker, app, photo_id, source_path, filename)
+
+
+def _render_in_worker(app, photo_id: str, source_path: str, filename: str) -> None:
+    with app.app_context():
+        _render_and_record(app, photo_id, source_path, filename)
+
+
+def _render_and_record(app, photo_id: str, source_path: str, filename: str) -> None:
+    from app.repositories.photo_repository import PhotoRepository
+
+    try:
+        renditions = generate_renditions(source_path, filename, app.config.get('PHOTO_RENDITION_SIZES'))
+    except Exception:
+        logger.warning('Could not render %s; the original will be served', filename, exc_info=True)
+        renditions = {}
+    try:
+        recorded = PhotoRepository().set_renditions(photo_id, renditions)
+    except Exception:
+        logger.exception('Could not record renditions for photo %s', photo_id)
+        recorded = False
+    if not recorded and not PhotoRepository().is_filename_referenced(filename):
+        # The photo was deleted while rendering and no other photo shares the file
+        directory = os.path.dirname(source_path)
+        for name in rendition_filenames(renditions):
+            try:
+                os.remove(os.path.join(directory, name))
+            except OSError:
+                pass
@@ -4,14 +4,19 @@ Review Service for NAYA Travel Journal
 """
 
 from datetime import datetime, date
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 
 from app.models.place import Place
 from app.models.review import Review
+from app.models.serializer import serializer_for
+from app.models.user import PUBLIC_FIELDS, User
 from app.repositories.review_repository import ReviewRepository
 from app.repositories.place_repository import PlaceRepository
 from app.repositories.user_repository import UserRepository
 from app.services.photo_service import PhotoService
+from app.services.place_service import PlaceService
+from app.services.place_stats_cache import invalidate_place_statistics
+from app.services.user_snapshots import load_user_snapshot
 
 class ReviewService:
     """Service for review business logic"""
@@ -21,6 +26,7 @@ class ReviewService:
         self.place_repository = PlaceRepository()
         self.user_repository = UserRepository()
         self.photo_service = PhotoService()
+        self.place_service = PlaceService()
     
     def create_review(self, review_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -32,6 +38,56 @@ class ReviewService:
         Raises:
             ValueError: If validation fails
         """
+        review_payload, place_id, place_fields = self.validate_review_data(review_data)
+        
+        # Resolve place identifier if not provided directly
+        if not place_id:
+            place = self._get_or_create_place(**place_fields)
+            place_id = place.id
+        review_payload['place_id'] = place_id
+
+        # Validate user exists
+        user = self.user_repository.get(review_payload['user_id'])
+        if not user:
+            raise ValueError("User not found")
+        
+        # Validate place exists
+        place = self.place_repository.get(place_id)
+        if not place:
+            raise ValueError("Place not found")
+        
+        # Check if user already reviewed this place
+        if self.review_repository.user_has_reviewed_place(
+            review_payload['user_id'], 
+            place_id
+        ):
+            raise ValueError("User has already reviewed this place")
+        
+        # Create review; place aggregates are committed in the same transaction
+        review = Review(**review_payload)
+        place.record_rating_change(added=review.rating)
+        created_review = self.review_repository.create(review)
+        invalidate_place_statistics([place_id])
+        
+        return {
+            'message': 'Review created successfully',
+            'review': created_review.to_dict()
+        }
+    
+    def validate_review_data(
+        self, review_data: Dict[str, Any]
+    ) -> Tuple[Dict[str, Any], Optional[str], Optional[Dict[str, Any]]]:
+        """
+        Validate review fields (shared by single and bulk creation)
+        Args:
+            review_data (dict): Review data, with either place_id or place details
+        Returns:
+            tuple: (review fields without place_id, place_id or None,
+                    place details for get-or-create when no place_id was given)
+        Raises:
+            ValueError: If validation fails
+        """
+        review_data = dict(review_data)
         # Extract and sanitise optional place payload
         place_payload = review_data.pop('place', {}) or {}
         place_id = (review_data.get('place_id') or place_payload.get('id') or '').strip() if review_data.get('place_id') or place_payload.get('id') else None
@@ -62,25 +118,23 @@ class ReviewService:
             if field not in review_data or not review_data[field]:
                 raise ValueError(f"Missing required field: {field}")
         
-        # Resolve place identifier if not provided directly
+        place_fields = None
         if not place_id:
             if not all([place_name, place_city, place_country]):
                 raise ValueError("Place information is required (name, city and country)")
-            place = self._get_or_create_place(
-                name=place_name,
-                city=place_city,
-                country=place_country,
-                description=place_description,
-                latitude=place_latitude,
-                longitude=place_longitude,
-            )
-            place_id = place.id
+            place_fields = {
+                'name': place_name,
+                'city': place_city,
+                'country': place_country,
+                'description': place_description,
+                'latitude': place_latitude,
+                'longitude': place_longitude,
+            }
         
         # Remove unused keys so the Review model receives only valid fields
         review_payload = {
-            key: value for key, value in review_data.items()
+            key: value for key, value in review_data.items() if key not in ('place_id', 'place')
         }
-        review_payload['place_id'] = place_id
 
         # Validate rating
         rating = review_payload['rating']
@@ -90,23 +144,6 @@ class ReviewService:
             raise ValueError("Rating must be an integer between 1 and 5")
         review_payload['rating'] = rating
 
-        # Validate user exists
-        user = self.user_repository.get(review_payload['user_id'])
-        if not user:
-            raise ValueError("User not found")
-        
-        # Validate place exists
-        place = self.place_repository.get(place_id)
-        if not place:
-            raise ValueError("Place not found")
-        
-        # Check if user already reviewed this place
-        if self.review_repository.user_has_reviewed_place(
-            review_payload['user_id'], 
-            place_id
-        ):
-            raise ValueError("User has already reviewed this place")
-        
         # Validate content length
         review_payload['title'] = review_payload['title'].strip()
         review_payload['content'] = review_payload['content'].strip()
@@ -120,14 +157,7 @@ class ReviewService:
         if visit_date_raw:
             review_payload['visit_date'] = self._parse_visit_date(visit_date_raw)
         
-        # Create review
-        review = Review(**review_payload)
-        created_review = self.review_repository.create(review)
-        
-        return {
-            'message': 'Review created successfully',
-            'review': created_review.to_dict()
-        }
+        return review_payload, place_id, place_fields
     
     def get_review(self, review_id: str) -> Dict[str, Any]:
         """
@@ -143,16 +173,7 @@ class ReviewService:
         if not review:
             raise ValueError("Review not found")
         
-        # Get related data
-        place = self.place_repository.get(review.place_id)
-        user = self.user_repository.get(review.user_id)
-        
-        review_data = review.to_dict()
-        review_data['place'] = place.to_dict() if place else None
-        review_data['user'] = user.to_public_dict() if user else None
-        review_data['photos'] = self._get_photos_for_review(review.id)
-        
-        return review_data
+        return self._build_review_cards([review])[0]
     
     def update_review(self, review_id: str, update_data: Dict[str, Any], user_id: str) -> Dict[str, Any]:
         """
@@ -170,7 +191,7 @@ class ReviewService:
         if not review:
             raise ValueError("Review not found")
 
-        requester = self.user_repository.get(user_id)
+        requester = load_user_snapshot(user_id)
         if not requester:
             raise ValueError("User not found")
         
@@ -216,10 +237,17 @@ class ReviewService:
             else:
                 update_data['visit_date'] = None
         
+        if 'rating' in update_data and update_data['rating'] != review.rating:
+            place = self.place_repository.get(review.place_id)
+            if place:
+                place.record_rating_change(added=update_data['rating'], removed=review.rating)
+        
         # Update review
         updated_review = self.review_repository.update(review_id, update_data)
         if not updated_review:
             raise ValueError("Failed to update review")
+        if 'rating' in update_data:
+            invalidate_place_statistics([updated_review.place_id])
         
         return {
             'message': 'Review updated successfully',
@@ -241,7 +269,7 @@ class ReviewService:
         if not review:
             raise ValueError("Review not found")
 
-        requester = self.user_repository.get(user_id)
+        requester = load_user_snapshot(user_id)
         if not requester:
             raise ValueError("User not found")
 
@@ -252,10 +280,16 @@ class ReviewService:
         # Delete associated photos before removing the review itself
         self.photo_service.delete_photos_for_review(review_id)
 
+        place_id = review.place_id
+        place = self.place_repository.get(place_id)
+        if place:
+            place.record_rating_change(removed=review.rating)
+        
         # Delete review
         success = self.review_repository.delete(review_id)
         if not success:
             raise ValueError("Failed to delete review")
+        invalidate_place_statistics([place_id])
         
         return {'message': 'Review deleted successfully'}
     
@@ -274,18 +308,7 @@ class ReviewService:
             raise ValueError("Place not found")
         
         reviews = self.review_repository.get_by_place(place_id, limit)
-        result = []
-        
-        for review in reviews:
-            review_data = review.to_dict()
-            # Add user info (public only)
-            user = self.user_repository.get(review.user_id)
-            review_data['user'] = user.to_public_dict() if user else None
-            review_data['place'] = place.to_dict() if place else None
-            review_data['photos'] = self._get_photos_for_review(review.id)
-            result.append(review_data)
-        
-        return result
+        return self._build_review_cards(reviews, places={place.id: place})
     
     def get_reviews_by_user(self, user_id: str, limit: Optional[int] = 20) -> List[Dict[str, Any]]:
         """
@@ -302,17 +325,40 @@ class ReviewService:
             raise ValueError("User not found")
         
         reviews = self.review_repository.get_by_user(user_id, limit)
-        result = []
-        
-        for review in reviews:
-            review_data = review.to_dict()
-            # Add place info
-            place = self.place_repository.get(review.place_id)
-            review_data['place'] = place.to_dict() if place else None
-            review_data['photos'] = self._get_photos_for_review(review.id)
-            result.append(review_data)
-        
-        return result
+        return self._build_review_cards(reviews, include_user=False, users={user.id: user})
+    
+    def get_reviews_page(self, limit: int, cursor: Optional[str] = None, user_id: Optional[str] = None,
+                         place_id: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Get a page of reviews, newest first, with user, place and photo data
+        Args:
+            limit (int): Page size
+            cursor (str, optional): Cursor returned with the previous page
+            user_id (str, optional): Only reviews by this user
+            place_id (str, optional): Only reviews for this place
+        Returns:
+            Tuple of (reviews, cursor for the next page or None)
+        Raises:
+            ValueError: If the user, place or cursor is invalid
+        """
+        users = None
+        places = None
+        if user_id:
+            user = self.user_repository.get(user_id)
+            if not user:
+                raise ValueError("User not found")
+            users = {user.id: user}
+        if place_id:
+            place = self.place_repository.get(place_id)
+            if not place:
+                raise ValueError("Place not found")
+            places = {place.id: place}
+        
+        reviews, next_cursor = self.review_repository.get_review_page(
+            limit, cursor, user_id=user_id, place_id=place_id
+        )
+        cards = self._build_review_cards(reviews, include_user=not user_id, users=users, places=places)
+        return cards, next_cursor
     
     def get_recent_reviews(self, limit: int = 10) -> List[Dict[str, Any]]:
         """
@@ -323,20 +369,7 @@ class ReviewService:
             List of recent reviews with user and place data
         """
         reviews = self.review_repository.get_recent_reviews(limit)
-        result = []
-        
-        for review in reviews:
-            review_data = review.to_dict()
-            # Add user and place info
-            user = self.user_repository.get(review.user_id)
-            place = self.place_repository.get(review.place_id)
-            
-            review_data['user'] = user.to_public_dict() if user else None
-            review_data['place'] = place.to_dict() if place else None
-            review_data['photos'] = self._get_photos_for_review(review.id)
-            result.append(review_data)
-        
-        return result
+        return self._build_review_cards(reviews)
     
     def get_top_rated_reviews(self, limit: int = 10) -> List[Dict[str, Any]]:
         """
@@ -347,20 +380,7 @@ class ReviewService:
             List of top rated reviews
         """
         reviews = self.review_repository.get_top_rated_reviews(limit)
-        result = []
-        
-        for review in reviews:
-            review_data = review.to_dict()
-            # Add user and place info
-            user = self.user_repository.get(review.user_id)
-            place = self.place_repository.get(review.place_id)
-            
-            review_data['user'] = user.to_public_dict() if user else None
-            review_data['place'] = place.to_dict() if place else None
-            review_data['photos'] = self._get_photos_for_review(review.id)
-            result.append(review_data)
-        
-        return result
+        return self._build_review_cards(reviews)
     
     def search_reviews(self, search_term: str, limit: Optional[int] = 20) -> List[Dict[str, Any]]:
         """
@@ -375,20 +395,7 @@ class ReviewService:
             return []
         
         reviews = self.review_repository.search_reviews(search_term.strip(), limit)
-        result = []
-        
-        for review in reviews:
-            review_data = review.to_dict()
-            # Add user and place info
-            user = self.user_repository.get(review.user_id)
-            place = self.place_repository.get(review.place_id)
-            
-            review_data['user'] = user.to_public_dict() if user else None
-            review_data['place'] = place.to_dict() if place else None
-            review_data['photos'] = self._get_photos_for_review(review.id)
-            result.append(review_data)
-        
-        return result
+        return self._build_review_cards(reviews)
     
     def get_review_statistics(self, place_id: str) -> Dict[str, Any]:
         """
@@ -398,20 +405,7 @@ class ReviewService:
         Returns:
             dict: Review statistics
         """
-        # Validate place exists
-        place = self.place_repository.get(place_id)
-        if not place:
-            raise ValueError("Place not found")
-        
-        stats = {
-            'place_id': place_id,
-            'place_name': place.name,
-            'total_reviews': self.review_repository.get_review_count_for_place(place_id),
-            'average_rating': self.review_repository.get_average_rating_for_place(place_id),
-            'rating_distribution': self.review_repository.get_rating_distribution_for_place(place_id)
-        }
-        
-        return stats
+        return self.place_service.get_place_statistics(place_id)
     
     def get_review_by_id(self, review_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -425,17 +419,7 @@ class ReviewService:
         if not review:
             return None
         
-        review_data = review.to_dict()
-        
-        # Add user and place info
-        user = self.user_repository.get(review.user_id)
-        place = self.place_repository.get(review.place_id)
-        
-        review_data['user'] = user.to_public_dict() if user else None
-        review_data['place'] = place.to_dict() if place else None
-        review_data['photos'] = self._get_photos_for_review(review.id)
-        
-        return review_data
+        return self._build_review_cards([review])[0]
     
     def get_place_statistics(self, place_id: str) -> Dict[str, Any]:
         """
@@ -447,17 +431,51 @@ class ReviewService:
         """
         return self.get_review_statistics(place_id)
 
-    def _get_photos_for_review(self, review_id: str) -> List[Dict[str, Any]]:
-        """Return photos associated with a review without redundant review payload."""
-        photos = self.photo_service.get_photos_by_review(review_id)
-        sanitized: List[Dict[str, Any]] = []
-        for photo in photos:
-            if not isinstance(photo, dict):
-                continue
-            photo_copy = dict(photo)
-            photo_copy.pop('review', None)
-            sanitized.append(photo_copy)
-        return sanitized
+    def _build_review_cards(
+        self,
+        reviews: List[Review],
+        include_user: bool = True,
+        users: Optional[Dict[str, Any]] = None,
+        places: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Serialise reviews with their author, place and photos.
+        Related rows are loaded with one IN query per table instead of per review.
+        """
+        if not reviews:
+            return []
+
+        users = dict(users or {})
+        places = dict(places or {})
+        if include_user:
+            users.update(self.user_repository.get_many(
+                review.user_id for review in reviews if review.user_id not in users
+            ))
+        places.update(self.place_repository.get_many(
+            review.place_id for review in reviews if review.place_id not in places
+        ))
+        photos = self.photo_service.get_photos_for_reviews([review.id for review in reviews], users=users)
+
+        serialize_review = serializer_for(Review)
+        serialize_user = serializer_for(User, PUBLIC_FIELDS)
+        serialize_place = serializer_for(Place)
+        user_payloads: Dict[str, Optional[Dict[str, Any]]] = {}
+        place_payloads: Dict[str, Optional[Dict[str, Any]]] = {}
+        result = []
+        for review in reviews:
+            review_data = serialize_review(review)
+            if include_user:
+                if review.user_id not in user_payloads:
+                    user = users.get(review.user_id)
+                    user_payloads[review.user_id] = serialize_user(user) if user else None
+                review_data['user'] = user_payloads[review.user_id]
+            if review.place_id not in place_payloads:
+                place = places.get(review.place_id)
+                place_payloads[review.place_id] = serialize_place(place) if place else None
+            review_data['place'] = place_payloads[review.place_id]
+            review_data['photos'] = photos.get(review.id, [])
+            result.append(review_data)
+        return result
 
     def _get_or_create_place(
         self,
@@ -473,6 +491,19 @@ class ReviewService:
         if existing:
             return existing
 
+        place = Place(**self.build_place_fields(name, city, country, description, latitude, longitude))
+        return self.place_repository.create(place)
+
+    def build_place_fields(
+        self,
+        name: str,
+        city: str,
+        country: str,
+        description: Optional[str] = None,
+        latitude: Optional[Any] = None,
+        longitude: Optional[Any] = None,
+    ) -> Dict[str, Any]:
+        """Model fields for a place created from review details."""
         place_kwargs: Dict[str, Any] = {
             'name': name,
             'city': city,
@@ -490,9 +521,7 @@ class ReviewService:
                 place_kwargs['longitude'] = float(longitude)
             except (TypeError, ValueError):
                 raise ValueError("Longitude must be a valid number")
-
-        place = Place(**place_kwargs)
-        return self.place_repository.create(place)
+        return place_kwargs
 
     def _parse_visit_date(self, value: Any) -> date:
         """Parse visit date from various input formats."""
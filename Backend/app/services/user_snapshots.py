@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Requesting-user lookups for NAYA Travel Journal
+
+Permission checks only need a user's id and admin/active flags, not the full
+row. load_user_snapshot returns those fields as a small immutable snapshot.
+It looks each user up at most once per request (memoised on flask.g), and
+across requests it goes through the application cache for
+USER_SNAPSHOT_CACHE_TTL seconds (0 disables the shared cache). Profile,
+admin and deactivation changes invalidate the cached snapshot.
+"""
+
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+from flask import current_app, g
+
+from app.cache import CacheNamespace, get_cache
+
+NAMESPACE = 'user_snapshots'
+_REQUEST_KEY = '_naya_user_snapshots'
+
+
+@dataclass(frozen=True)
+class UserSnapshot:
+    """The fields of a user that authorization decisions depend on"""
+    id: str
+    username: str
+    is_admin: bool
+    is_active: bool
+
+    @classmethod
+    def from_user(cls, user) -> 'UserSnapshot':
+        return cls(id=user.id, username=user.username,
+                   is_admin=bool(user.is_admin), is_active=bool(user.is_active))
+
+
+def get_user_snapshot_cache() -> CacheNamespace:
+    """Return the user snapshot namespace of the current application's cache"""
+    return get_cache().namespace(NAMESPACE, ttl=current_app.config.get('USER_SNAPSHOT_CACHE_TTL', 30))
+
+
+def load_user_snapshot(user_id: Optional[str]) -> Optional[UserSnapshot]:
+    """
+    Get the authorization fields of a user
+    Args:
+        user_id (str): User ID, usually the JWT identity
+    Returns:
+        UserSnapshot or None if the user does not exist
+    """
+    if not user_id:
+        return None
+    loaded = g.setdefault(_REQUEST_KEY, {})
+    if user_id in loaded:
+        return loaded[user_id]
+
+    use_shared_cache = current_app.config.get('USER_SNAPSHOT_CACHE_TTL', 30) > 0
+    snapshot = get_user_snapshot_cache().get(user_id) if use_shared_cache else None
+    if snapshot is None:
+        from app.repositories.user_repository import UserRepository
+
+        user = UserRepository().get(user_id)
+        snapshot = UserSnapshot.from_user(user) if user else None
+        # Unknown ids are not cached across requests
+        if snapshot is not None and use_shared_cache:
+            get_user_snapshot_cache().set(user_id, snapshot)
+    loaded[user_id] = snapshot
+    return snapshot
+
+
+def invalidate_user_snapshots(user_ids: Iterable[str]) -> None:
+    """
+    Drop cached snapshots after a user's profile, admin or active flag changed
+    Args:
+        user_ids (iterable): Users to drop
+    """
+    user_ids = [user_id for user_id in user_ids if user_id]
+    loaded = g.get(_REQUEST_KEY)
+    if loaded:
+        for user_id in user_ids:
+            loaded.pop(user_id, None)
+    get_user_snapshot_cache().delete(user_ids)
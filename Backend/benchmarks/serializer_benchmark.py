@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Serializer micro-benchmark for NAYA Travel Journal
+
+Compares the compiled per-model serializers against the previous
+``__dict__`` walk on in-memory rows. Run from the Backend directory:
+
+    python benchmarks/serializer_benchmark.py [rows]
+"""
+
+import sys
+import os
+import timeit
+from datetime import date, datetime, timezone
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models import Place, Review, User
+from app.models.serializer import serializer_for
+from app.models.user import PUBLIC_FIELDS
+
+
+def _legacy_to_dict(obj):
+    """BaseModel.to_dict as it was before compiled serializers"""
+    dict_repr = {}
+    for key, value in obj.__dict__.items():
+        if key.startswith('_'):
+            continue
+        if isinstance(value, (datetime, date)):
+            dict_repr[key] = value.isoformat()
+        else:
+            dict_repr[key] = value
+    return dict_repr
+
+
+def _legacy_user_to_dict(user):
+    user_dict = _legacy_to_dict(user)
+    user_dict.pop('password_hash', None)
+    user_dict['is_admin'] = bool(user_dict.get('is_admin'))
+    return user_dict
+
+
+def _build_rows(count):
+    now = datetime.now(timezone.utc)
+    users = [User(id=f'user-{index}', email=f'user{index}@example.com', username=f'user{index}',
+                  password_hash='x' * 60, first_name='Ada', last_name='Lovelace', bio='Traveller',
+                  location='Paris', is_active=True, is_verified=False, is_admin=False,
+                  created_at=now, updated_at=now)
+             for index in range(count)]
+    places = [Place(id=f'place-{index}', name='Old Town', description='Cobbled streets', city='Lyon',
+                    country='France', latitude=45.76, longitude=4.84, review_count=3, rating_sum=12,
+                    created_at=now, updated_at=now)
+              for index in range(count)]
+    reviews = [Review(id=f'review-{index}', title='Great stay', content='Lovely place to visit.',
+                      rating=4, summary='Recommended', visit_date=date(2024, 5, 1),
+                      user_id=f'user-{index}', place_id=f'place-{index}',
+                      created_at=now, updated_at=now)
+               for index in range(count)]
+    return users, places, reviews
+
+
+def _report(label, legacy, compiled, rows, repeat):
+    legacy_us = min(timeit.repeat(legacy, number=1, repeat=repeat)) / rows * 1e6
+    compiled_us = min(timeit.repeat(compiled, number=1, repeat=repeat)) / rows * 1e6
+    print(f"{label:<14} legacy {legacy_us:6.2f} us/row   compiled {compiled_us:6.2f} us/row   "
+          f"x{legacy_us / compiled_us:.1f}")
+
+
+def main():
+    """Time per-row serialisation of users, places and reviews"""
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    repeat = 5
+    users, places, reviews = _build_rows(rows)
+
+    serialize_user = serializer_for(User)
+    serialize_public_user = serializer_for(User, PUBLIC_FIELDS)
+    serialize_place = serializer_for(Place)
+    serialize_review = serializer_for(Review)
+
+    print(f"⏱️  Serialising {rows} rows per model (best of {repeat})")
+    _report('User', lambda: [_legacy_user_to_dict(u) for u in users],
+            lambda: [serialize_user(u) for u in users], rows, repeat)
+    _report('User public', lambda: [{
+                'id': u.id, 'username': u.username, 'first_name': u.first_name,
+                'last_name': u.last_name, 'bio': u.bio, 'location': u.location,
+                'created_at': u.created_at.isoformat() if u.created_at else None,
+            } for u in users],
+            lambda: [serialize_public_user(u) for u in users], rows, repeat)
+    _report('Place', lambda: [_legacy_to_dict(p) for p in places],
+            lambda: [serialize_place(p) for p in places], rows, repeat)
+    _report('Review', lambda: [_legacy_to_dict(r) for r in reviews],
+            lambda: [serialize_review(r) for r in reviews], rows, repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -32,13 +32,50 @@ class Config:
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB
     UPLOAD_FOLDER = os.getenv('UPLOAD_FOLDER', 'uploads')
     ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
+    # Downscaled renditions (longest edge in px), rendered on a background pool when Pillow is installed
+    PHOTO_RENDITIONS_ENABLED = os.getenv('PHOTO_RENDITIONS_ENABLED', 'true').lower() == 'true'
+    PHOTO_RENDITION_SIZES = {'thumb': 320, 'medium': 800, 'large': 1600}
+    PHOTO_RENDITION_WORKERS = int(os.getenv('PHOTO_RENDITION_WORKERS', '2'))
+    # Photo file delivery: 'direct' (Flask streams, with range support), 'x-sendfile'
+    # (Apache/lighttpd) or 'x-accel-redirect' (nginx internal location at the prefix below)
+    PHOTO_DELIVERY = os.getenv('PHOTO_DELIVERY', 'direct')
+    PHOTO_ACCEL_REDIRECT_PREFIX = os.getenv('PHOTO_ACCEL_REDIRECT_PREFIX', '/protected-uploads/')
+    PHOTO_CACHE_MAX_AGE = 365 * 24 * 3600
+    # Deleted photos' files are removed by a background worker; failures retry with
+    # exponential backoff from FILE_DELETIONS_RETRY_BASE up to FILE_DELETIONS_RETRY_MAX seconds
+    FILE_DELETIONS_SYNC = os.getenv('FILE_DELETIONS_SYNC', 'false').lower() == 'true'
+    FILE_DELETIONS_BATCH_SIZE = 100
+    FILE_DELETIONS_RETRY_BASE = 30
+    FILE_DELETIONS_RETRY_MAX = 3600
     
     # External APIs
     GOOGLE_MAPS_API_KEY = os.getenv('GOOGLE_MAPS_API_KEY', '')
     
     # Other settings
     RATELIMIT_STORAGE_URL = os.getenv('REDIS_URL', 'memory://')
+    # Application cache: 'memory' (per process), 'redis' (shared, needs redis-py) or 'null'
+    CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'memory')
+    CACHE_URL = os.getenv('CACHE_URL', os.getenv('REDIS_URL', ''))
+    CACHE_KEY_PREFIX = os.getenv('CACHE_KEY_PREFIX', 'naya')
+    CACHE_DEFAULT_TTL = int(os.getenv('CACHE_DEFAULT_TTL', '300'))
+    CACHE_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', '10000'))
     CORS_ORIGINS = os.getenv('CORS_ORIGINS', 'http://localhost:3000,http://127.0.0.1:3000').split(',')
+    # JSON encoding: 'auto' (orjson when installed), 'orjson' or 'stdlib'
+    JSON_BACKEND = os.getenv('JSON_BACKEND', 'auto')
+    # Seconds a cached place statistics entry may be served before reloading
+    PLACE_STATS_CACHE_TTL = int(os.getenv('PLACE_STATS_CACHE_TTL', '60'))
+    # Seconds a user's id/admin/active snapshot may be reused across requests (0 = per request only)
+    USER_SNAPSHOT_CACHE_TTL = int(os.getenv('USER_SNAPSHOT_CACHE_TTL', '30'))
+    # Password hashing: Werkzeug method string, concurrent hashes, and how many more
+    # may wait before requests are refused with 503
+    PASSWORD_HASH_METHOD = os.getenv('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', '2'))
+    PASSWORD_HASH_QUEUE_SIZE = int(os.getenv('PASSWORD_HASH_QUEUE_SIZE', '16'))
+    # Bulk imports: records per transaction, and how many row errors a report lists
+    IMPORT_CHUNK_SIZE = int(os.getenv('IMPORT_CHUNK_SIZE', '500'))
+    IMPORT_MAX_REPORTED_ERRORS = 1000
+    # Rows fetched per round trip by streaming exports
+    EXPORT_BATCH_SIZE = 1000
     DEFAULT_PAGE_SIZE = 20
     MAX_PAGE_SIZE = 100
     ADMIN_EMAILS = [email.strip().lower() for email in os.getenv('ADMIN_EMAILS', '').split(',') if email.strip()]
@@ -68,6 +105,9 @@ class TestingConfig(Config):
     
     # In-memory database for tests
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    CACHE_BACKEND = 'memory'
+    # Cheap hashes keep the suite fast; never use outside tests
+    PASSWORD_HASH_METHOD = 'pbkdf2:sha256:1000'
     
     # Disable CSRF for testing
     WTF_CSRF_ENABLED = False
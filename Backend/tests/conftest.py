@@ -3,7 +3,10 @@
 Shared pytest fixtures for API-level tests.
 """
 
+from contextlib import contextmanager
+
 import pytest
+from sqlalchemy import event
 
 from app import create_app, db
 
@@ -43,6 +46,30 @@ def api_client(api_app):
         yield client
 
 
+@pytest.fixture
+def count_queries(api_app):
+    """
+    Record SQL statements executed against the API app database.
+    Use as ``with count_queries() as statements:``; the list fills while the block runs.
+    """
+    @contextmanager
+    def _count_queries():
+        statements = []
+
+        def _record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        with api_app.app_context():
+            engine = db.engine
+        event.listen(engine, 'before_cursor_execute', _record)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, 'before_cursor_execute', _record)
+
+    return _count_queries
+
+
 @pytest.fixture
 def user_factory(api_client):
     """
@@ -58,3 +58,41 @@ def test_placeholder_endpoints(client):
         payload = response.get_json()
         assert payload.get('success') is True
         assert 'count' in payload
+
+
+def test_json_provider_encodes_api_types(app):
+    """The configured provider writes ISO dates, UUID strings and integer keys."""
+    import uuid
+    from datetime import date, datetime, timezone
+
+    from app.json_provider import OrjsonProvider, StdlibJSONProvider, create_json_provider, orjson
+
+    payload = {
+        'when': datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc),
+        'day': date(2024, 5, 1),
+        'id': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+        'distribution': {5: 2, 1: 0},
+    }
+    expected = {
+        'when': '2024-05-01T12:30:00+00:00',
+        'day': '2024-05-01',
+        'id': '12345678-1234-5678-1234-567812345678',
+        'distribution': {'1': 0, '5': 2},
+    }
+
+    providers = [StdlibJSONProvider(app)]
+    if orjson is not None:
+        providers.append(OrjsonProvider(app))
+        assert isinstance(create_json_provider(app), OrjsonProvider)
+    for provider in providers:
+        assert provider.loads(provider.dumps(payload)) == expected
+        with app.test_request_context():
+            response = provider.response(payload)
+        assert response.mimetype == 'application/json'
+        assert provider.loads(response.get_data()) == expected
+
+    app.config['JSON_BACKEND'] = 'stdlib'
+    assert isinstance(create_json_provider(app), StdlibJSONProvider)
+    app.config['JSON_BACKEND'] = 'bogus'
+    with pytest.raises(ValueError):
+        create_json_provider(app)
@@ -196,3 +196,168 @@ def test_default_admin_provisioning(monkeypatch):
         assert admin.is_admin is True
         assert admin.check_password('Bootstrap123')
         db.drop_all()
+
+
+def test_user_stats_are_computed_in_sql(api_client, user_factory, count_queries):
+    """Dashboard stats come from aggregate queries, not loaded relationships."""
+    traveller = user_factory(email='nomad@example.com', username='nomad')
+    headers = traveller['headers']
+    for name, country, rating in (('Alhambra', 'Spain', 5), ('Sagrada', 'Spain', 4), ('Louvre', 'France', 3)):
+        place = api_client.post('/api/v1/places', json={
+            'name': name, 'city': 'Somewhere', 'country': country
+        }, headers=headers).get_json()['data']
+        created = api_client.post('/api/v1/reviews', json={
+            'title': f'{name} visit', 'content': 'A long enough review body.',
+            'rating': rating, 'place_id': place['id']
+        }, headers=headers)
+        assert created.status_code == 201
+
+    with count_queries() as statements:
+        response = api_client.get('/api/v1/auth/stats', headers=headers)
+
+    assert response.status_code == 200
+    stats = response.get_json()
+    assert stats['reviews_count'] == 3
+    assert stats['photos_count'] == 0
+    assert stats['countries_visited'] == 2
+    assert stats['average_rating_given'] == 4.0
+    # Change marker for the ETag, user lookup, statistics
+    assert len(statements) == 3
+
+
+def test_login_rehashes_outdated_password_hashes(api_app, api_client, user_factory):
+    """A successful login upgrades a hash made with other parameters."""
+    from app.password_hashing import EXTENSION_KEY, PasswordHasher
+
+    user_factory(email='rehash@example.com', username='rehash', password='Password123!')
+    with api_app.app_context():
+        user = User.query.filter_by(username='rehash').one()
+        assert user.password_hash.startswith('pbkdf2:sha256:1000$')
+        updated_at = user.updated_at
+
+    api_app.extensions[EXTENSION_KEY] = PasswordHasher(method='pbkdf2:sha256:2000')
+    for _ in range(2):
+        response = api_client.post('/api/v1/auth/login', json={'login': 'rehash', 'password': 'Password123!'})
+        assert response.status_code == 200
+    with api_app.app_context():
+        user = User.query.filter_by(username='rehash').one()
+        assert user.password_hash.startswith('pbkdf2:sha256:2000$')
+        # Not a profile edit
+        assert user.updated_at == updated_at
+    assert api_client.post('/api/v1/auth/login', json={'login': 'rehash', 'password': 'wrong-one'}).status_code == 401
+
+
+def test_password_hashing_overflow_is_refused_fast(api_app, api_client, user_factory, monkeypatch):
+    """When the hashing pool and its queue are full, logins get an immediate 503."""
+    import threading
+
+    from app import password_hashing
+
+    admin = user_factory(email='admin@example.com', username='hashadmin')
+    user_factory(email='burst@example.com', username='burst', password='Password123!')
+    hasher = password_hashing.PasswordHasher(method='pbkdf2:sha256:1000', workers=1, max_queue=0)
+    api_app.extensions[password_hashing.EXTENSION_KEY] = hasher
+
+    release = threading.Event()
+    original_check = password_hashing.check_password_hash
+
+    def _slow_check(password_hash, password):
+        release.wait(5)
+        return original_check(password_hash, password)
+    monkeypatch.setattr(password_hashing, 'check_password_hash', _slow_check)
+
+    results = []
+    blocked = threading.Thread(target=lambda: results.append(api_app.test_client().post(
+        '/api/v1/auth/login', json={'login': 'burst', 'password': 'Password123!'}
+    ).status_code))
+    blocked.start()
+    for _ in range(500):
+        if hasher.metrics()['running']:
+            break
+        threading.Event().wait(0.01)
+
+    refused = api_client.post('/api/v1/auth/login', json={'login': 'burst', 'password': 'Password123!'})
+    assert refused.status_code == 503
+    assert refused.headers['Retry-After'] == '1'
+
+    release.set()
+    blocked.join(5)
+    assert results == [200]
+
+    metrics = api_client.get('/api/v1/admin/metrics', headers=admin['headers']).get_json()['metrics']
+    hashing = metrics['password_hashing']
+    assert hashing['rejected'] == 1 and hashing['operations'] == 1
+    assert hashing['queue_depth'] == 0 and hashing['running'] == 0
+    assert hashing['avg_ms'] is not None
+
+
+def test_requester_snapshot_is_cached_until_invalidated(api_app, api_client, user_factory, count_queries):
+    """Permission checks reuse a cached user snapshot until the user changes."""
+    from app.services.user_snapshots import invalidate_user_snapshots, load_user_snapshot
+
+    member = user_factory(email='member@example.com', username='member')
+    assert api_client.get('/api/v1/admin/metrics', headers=member['headers']).status_code == 403
+
+    with count_queries() as statements:
+        assert api_client.get('/api/v1/admin/metrics', headers=member['headers']).status_code == 403
+    assert [sql for sql in statements if 'FROM users' in sql] == []
+
+    # Promotions that bypass the services are only seen once the snapshot is dropped
+    with api_app.app_context():
+        db.session.get(User, member['user']['id']).is_admin = True
+        db.session.commit()
+    assert api_client.get('/api/v1/admin/metrics', headers=member['headers']).status_code == 403
+    with api_app.app_context():
+        invalidate_user_snapshots([member['user']['id']])
+    assert api_client.get('/api/v1/admin/metrics', headers=member['headers']).status_code == 200
+
+    assert api_client.put('/api/v1/auth/deactivate', headers=member['headers']).status_code == 200
+    with api_app.test_request_context():
+        snapshot = load_user_snapshot(member['user']['id'])
+        assert snapshot.is_admin is True and snapshot.is_active is False
+
+    # Repository writes invalidate on their own, whichever caller makes them
+    from app.repositories.user_repository import UserRepository
+    with api_app.test_request_context():
+        assert UserRepository().activate_user(member['user']['id'])
+    with api_app.test_request_context():
+        assert load_user_snapshot(member['user']['id']).is_active is True
+
+
+def test_login_and_registration_ignore_case(api_client, user_factory, count_queries):
+    """Logins match case-insensitively in one query; case variants cannot register."""
+    user_factory(email='Mixed.Case@example.com', username='MixedCase')
+
+    with count_queries() as statements:
+        for login in ('mixed.case@EXAMPLE.com', 'mixedcase'):
+            response = api_client.post('/api/v1/auth/login', json={'login': login, 'password': 'Password123!'})
+            assert response.status_code == 200
+            assert response.get_json()['user']['username'] == 'MixedCase'
+    assert len([sql for sql in statements if 'FROM users' in sql]) == 2
+
+    taken_email = api_client.post('/api/v1/auth/register', json={
+        'username': 'other', 'email': 'MIXED.CASE@example.com', 'password': 'Password123!'
+    })
+    assert taken_email.status_code == 400
+    assert taken_email.get_json()['error'] == 'Email already registered'
+    taken_username = api_client.post('/api/v1/auth/register', json={
+        'username': 'mixedCASE', 'email': 'other@example.com', 'password': 'Password123!'
+    })
+    assert taken_username.status_code == 400
+    assert taken_username.get_json()['error'] == 'Username already taken'
+
+
+def test_profile_update_cannot_set_normalized_columns(api_client, user_factory):
+    """The lower-cased lookup columns only follow email and username."""
+    alice = user_factory(email='alice@example.com', username='Alice')
+    response = api_client.put('/api/v1/auth/profile', json={
+        'email_normalized': 'someone@else.com', 'username_normalized': 'someoneelse', 'bio': 'Hello'
+    }, headers=alice['headers'])
+    assert response.status_code == 200
+
+    login = api_client.post('/api/v1/auth/login', json={'login': 'ALICE', 'password': alice['password']})
+    assert login.status_code == 200
+    duplicate = api_client.post('/api/v1/auth/register', json={
+        'username': 'alice', 'email': 'ALICE@example.com', 'password': 'Password123!'
+    })
+    assert duplicate.status_code == 400
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Tests for streaming data exports.
+"""
+
+import csv
+import io
+import json
+
+from click.testing import CliRunner
+
+from app import db
+from app.models import Review
+
+
+def _seed(api_app, api_client, user_factory):
+    admin = user_factory(email='admin@example.com', username='exportadmin')
+    author = user_factory(email='writer@example.com', username='writer')
+    places = {}
+    for name, country in (('Fjord', 'Norway'), ('Souk', 'Morocco')):
+        places[name] = api_client.post('/api/v1/places', json={'name': name, 'city': 'City', 'country': country},
+                                       headers=admin['headers']).get_json()['data']
+    for user in (admin, author):
+        for place in places.values():
+            resp = api_client.post('/api/v1/reviews', headers=user['headers'], json={
+                'title': f"{user['user']['username']} at {place['name']}",
+                'content': 'A long enough review body for validation.',
+                'summary': 'Summary', 'rating': 4, 'place_id': place['id'],
+            })
+            assert resp.status_code == 201, resp.get_json()
+    with api_app.app_context():
+        # Backdate one review to exercise the date filters
+        review = Review.query.filter_by(title="writer at Fjord").one()
+        review.created_at = review.created_at.replace(year=2020, month=1, day=15, hour=9, minute=0,
+                                                      second=0, microsecond=0)
+        db.session.commit()
+    return admin, author, places
+
+
+def test_admin_export_streams_filtered_rows(api_app, api_client, user_factory):
+    """Exports stream NDJSON/CSV in creation order and honour every filter."""
+    admin, author, places = _seed(api_app, api_client, user_factory)
+
+    resp = api_client.get('/api/v1/admin/export/reviews', headers=admin['headers'])
+    assert resp.status_code == 200
+    assert resp.is_streamed
+    assert resp.mimetype == 'application/x-ndjson'
+    assert 'attachment; filename="naya-reviews-' in resp.headers['Content-Disposition']
+    rows = [json.loads(line) for line in resp.get_data(as_text=True).splitlines()]
+    assert len(rows) == 4
+    assert rows[0]['title'] == 'writer at Fjord'
+
+    def _titles(**query):
+        body = api_client.get('/api/v1/admin/export/reviews', headers=admin['headers'], query_string=query)
+        return sorted(json.loads(line)['title'] for line in body.get_data(as_text=True).splitlines())
+
+    assert _titles(country='Morocco') == ['exportadmin at Souk', 'writer at Souk']
+    assert _titles(user_id=author['user']['id'], place_id=places['Souk']['id']) == ['writer at Souk']
+    assert _titles(until='2020-01-15') == ['writer at Fjord']
+    assert len(_titles(since='2020-01-16')) == 3
+    # Offsets are converted to UTC before comparing (the review is at 09:00Z)
+    assert 'writer at Fjord' in _titles(since='2020-01-15T10:00+02:00')
+    assert 'writer at Fjord' not in _titles(since='2020-01-15T12:00+02:00')
+    assert _titles(until='2020-01-15T10:30+01:00') == ['writer at Fjord']
+
+    csv_resp = api_client.get('/api/v1/admin/export/places', headers=admin['headers'],
+                              query_string={'format': 'csv', 'user_id': author['user']['id']})
+    assert csv_resp.mimetype == 'text/csv'
+    records = list(csv.DictReader(io.StringIO(csv_resp.get_data(as_text=True))))
+    assert [record['name'] for record in records] == ['Fjord', 'Souk']
+    assert records[0]['review_count'] == '2'
+
+    photos = api_client.get('/api/v1/admin/export/photos', headers=admin['headers'],
+                            query_string={'country': 'Norway'})
+    assert photos.status_code == 200 and photos.get_data() == b''
+
+    bad_date = api_client.get('/api/v1/admin/export/reviews', headers=admin['headers'],
+                              query_string={'since': 'yesterday'})
+    assert bad_date.status_code == 400
+    assert api_client.get('/api/v1/admin/export/users', headers=admin['headers']).status_code == 404
+    assert api_client.get('/api/v1/admin/export/reviews', headers=author['headers']).status_code == 403
+
+
+def test_export_cli_writes_file(api_app, api_client, user_factory, tmp_path):
+    """The CLI streams an export to a file."""
+    _seed(api_app, api_client, user_factory)
+    target = tmp_path / 'reviews.csv'
+
+    result = CliRunner().invoke(api_app.cli, ['export-data', 'reviews', '--format', 'csv',
+                                              '--country', 'Norway', '--output', str(target)])
+    assert result.exit_code == 0, result.output
+    records = list(csv.DictReader(target.open(encoding='utf-8')))
+    assert sorted(record['title'] for record in records) == ['exportadmin at Fjord', 'writer at Fjord']
+
+    invalid = CliRunner().invoke(api_app.cli, ['export-data', 'reviews', '--until', '15/01/2020'])
+    assert invalid.exit_code != 0
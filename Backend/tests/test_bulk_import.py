@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Tests for bulk place and review imports.
+"""
+
+import io
+import json
+
+from click.testing import CliRunner
+
+from app import db
+from app.models import Place, Review
+
+
+def _ndjson(*records):
+    return '\n'.join(record if isinstance(record, str) else json.dumps(record) for record in records)
+
+
+def test_place_import_reports_invalid_and_duplicate_rows(api_app, api_client, user_factory):
+    """Valid places are inserted; bad JSON, missing fields and duplicates are reported by row."""
+    admin = user_factory(email='admin@example.com', username='importadmin')
+    regular = user_factory(email='partner@example.com', username='partner')
+    existing = {'name': 'Old Harbour', 'city': 'Porto', 'country': 'Portugal'}
+    assert api_client.post('/api/v1/places', json=existing, headers=admin['headers']).status_code == 201
+
+    body = _ndjson(
+        {'name': 'Blue Lagoon', 'city': 'Grindavik', 'country': 'Iceland', 'latitude': 63.88, 'longitude': -22.45},
+        '{not json',
+        {'name': 'Nameless', 'city': 'Nowhere'},
+        existing,
+        {'name': 'Blue Lagoon', 'city': 'Grindavik', 'country': 'Iceland'},
+        '',
+        {'name': 'Sky Garden', 'city': 'London', 'country': 'UK', 'latitude': 123, 'longitude': 0},
+        {'name': 'Sky Garden', 'city': 'London', 'country': 'UK'},
+    )
+    denied = api_client.post('/api/v1/admin/import/places', data=body, headers=regular['headers'],
+                             content_type='application/x-ndjson')
+    assert denied.status_code == 403
+
+    resp = api_client.post('/api/v1/admin/import/places', data=body, headers=admin['headers'],
+                           content_type='application/x-ndjson')
+    assert resp.status_code == 200, resp.get_json()
+    report = resp.get_json()['report']
+    assert (report['processed'], report['created'], report['failed']) == (7, 2, 5)
+    assert [error['row'] for error in report['errors']] == [2, 3, 4, 5, 7]
+    assert report['errors'][0]['error'].startswith('Invalid JSON')
+    assert report['errors'][1]['error'] == 'Missing required field: country'
+    assert report['errors'][2]['error'] == 'A place with this name already exists in this location'
+    assert report['errors'][4]['error'] == 'Invalid coordinates'
+
+    with api_app.app_context():
+        lagoon = Place.query.filter_by(name='Blue Lagoon').one()
+        assert lagoon.geohash
+        assert Place.query.count() == 3
+
+
+def test_review_import_resolves_places_in_batches(api_app, api_client, user_factory, count_queries):
+    """CSV reviews resolve users and places per chunk, create missing places and keep aggregates exact."""
+    admin = user_factory(email='admin@example.com', username='importadmin')
+    author = user_factory(email='author@example.com', username='author')
+    place = api_client.post('/api/v1/places', json={'name': 'Old Harbour', 'city': 'Porto', 'country': 'Portugal'},
+                            headers=admin['headers']).get_json()['data']
+    author_id = author['user']['id']
+
+    rows = ['user_id,place_id,place_name,place_city,place_country,title,content,rating,visit_date']
+    content = 'Plenty to see and do all day long.'
+    rows.append(f',{place["id"]},,,,Admin visit,{content},4,2024-05-01')
+    rows.append(f'{author_id},{place["id"]},,,,Lovely harbour,{content},5,')
+    rows.append(f'{author_id},{place["id"]},,,,Second visit,{content},3,')
+    rows.append(f'{author_id},,Night Market,Taipei,Taiwan,Great food,{content},5,')
+    rows.append(f',,Night Market,Taipei,Taiwan,Busy stalls,{content},2,')
+    rows.append(f'{author_id},,Night Market,Taipei,,No country,{content},5,')
+    rows.append(f'{author_id},,Canal Walk,Amsterdam,Netherlands,Bad rating,{content},9,')
+    rows.append(f'ghost,,Canal Walk,Amsterdam,Netherlands,Nobody,{content},4,')
+    rows.append(f'{author_id},,Canal Walk,Amsterdam,Netherlands,Bad date,{content},4,05/01/2024')
+    csv_body = '\n'.join(rows) + '\n'
+
+    with count_queries() as statements:
+        resp = api_client.post('/api/v1/admin/import/reviews', headers=admin['headers'],
+                               data={'file': (io.BytesIO(csv_body.encode()), 'reviews.csv', 'text/csv')})
+    assert resp.status_code == 200, resp.get_json()
+    report = resp.get_json()['report']
+    assert (report['created'], report['failed']) == (4, 5)
+    assert {error['row']: error['error'] for error in report['errors']} == {
+        4: 'User has already reviewed this place',
+        7: 'Place information is required (name, city and country)',
+        8: 'Rating must be an integer between 1 and 5',
+        9: 'User not found',
+        10: 'Visit date must follow ISO format (YYYY-MM-DD)',
+    }
+    # One chunk: a handful of lookups and a single insert per table, not one per row
+    assert len([sql for sql in statements if sql.startswith('INSERT INTO reviews')]) == 1
+    assert len([sql for sql in statements if sql.startswith('SELECT')]) < 10
+
+    with api_app.app_context():
+        harbour = db.session.get(Place, place['id'])
+        market = Place.query.filter_by(name='Night Market').one()
+        assert (harbour.review_count, harbour.rating_sum) == (2, 9)
+        assert (market.review_count, market.rating_sum, market.rating_2_count) == (2, 7, 1)
+        assert Review.query.filter_by(user_id=admin['user']['id']).count() == 2
+
+    stats = api_client.get(f"/api/v1/places/{market.id}").get_json()
+    assert stats['place']['review_count'] == 2
+
+
+def test_import_cli_reads_files(api_app, user_factory, tmp_path):
+    """The CLI imports a file and prints the row errors."""
+    user_factory(email='admin@example.com', username='importadmin')
+    source = tmp_path / 'places.csv'
+    source.write_text('name,city,country,description\nMusée,Paris,France,Art\n,Lyon,France,\n', encoding='utf-8')
+
+    result = CliRunner().invoke(api_app.cli, ['import-data', 'places', str(source)])
+    assert result.exit_code == 0, result.output
+    assert 'Row 3: Missing required field: name' in result.output
+    assert json.loads(result.output.strip().splitlines()[-1]) == {'processed': 2, 'created': 1, 'failed': 1}
+
+
+def test_failed_chunk_is_retried_row_by_row(api_app, api_client, user_factory):
+    """A row the database rejects fails alone, with its own error; the rest of the chunk is stored."""
+    from sqlalchemy import text
+
+    admin = user_factory(email='admin@example.com', username='importadmin')
+    author = user_factory(email='author@example.com', username='author')
+    place = api_client.post('/api/v1/places', json={'name': 'Old Harbour', 'city': 'Porto', 'country': 'Portugal'},
+                            headers=admin['headers']).get_json()['data']
+    with api_app.app_context():
+        # Stands in for a constraint the validators do not know about
+        db.session.execute(text(
+            "CREATE TRIGGER reject_cursed BEFORE INSERT ON reviews WHEN NEW.title = 'Cursed' "
+            "BEGIN SELECT RAISE(ABORT, 'cursed review'); END"
+        ))
+        db.session.commit()
+
+    content = 'Plenty to see and do all day long.'
+    new_place = {'place_name': 'Night Market', 'place_city': 'Taipei', 'place_country': 'Taiwan'}
+    body = _ndjson(
+        # The row that would create the new place fails; the next one must create it instead
+        dict(new_place, user_id=author['user']['id'], title='Cursed', content=content, rating=1),
+        dict(new_place, title='Great food', content=content, rating=5),
+        {'place_id': place['id'], 'title': 'Cursed', 'content': content, 'rating': 2,
+         'user_id': author['user']['id']},
+        {'place_id': place['id'], 'title': 'Lovely harbour', 'content': content, 'rating': 4},
+    )
+    resp = api_client.post('/api/v1/admin/import/reviews', data=body, headers=admin['headers'],
+                           content_type='application/x-ndjson')
+    assert resp.status_code == 200, resp.get_json()
+    report = resp.get_json()['report']
+    assert (report['created'], report['failed']) == (2, 2)
+    assert [error['row'] for error in report['errors']] == [1, 3]
+    assert all('cursed review' in error['error'] for error in report['errors'])
+
+    with api_app.app_context():
+        market = Place.query.filter_by(name='Night Market').one()
+        harbour = db.session.get(Place, place['id'])
+        assert (market.review_count, market.rating_sum, market.rating_1_count) == (1, 5, 0)
+        assert (harbour.review_count, harbour.rating_sum, harbour.rating_2_count) == (1, 4, 0)
+        assert Review.query.count() == 2
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Tests for the application cache backends and namespaces.
+"""
+
+import pytest
+
+from app.cache import Cache, MemoryCache, NullCache, RedisCache, create_cache
+
+
+class _FakeRedis:
+    """Minimal in-memory stand-in for the redis-py commands the cache uses."""
+
+    def __init__(self):
+        self.data = {}
+
+    def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value if isinstance(value, bytes) else str(value).encode()
+        return True
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+
+@pytest.fixture(params=['memory', 'redis'])
+def cache(request):
+    if request.param == 'memory':
+        return Cache(MemoryCache(max_entries=100))
+    return Cache(RedisCache(client=_FakeRedis()))
+
+
+def test_namespace_get_set_delete_and_clear(cache):
+    places = cache.namespace('places', ttl=30)
+    users = cache.namespace('users')
+
+    places.set('p1', {'name': 'Louvre', 'distribution': {5: 1}})
+    places.set('p2', {'name': 'Orsay'})
+    users.set('p1', 'not a place')
+
+    assert places.get('p1') == {'name': 'Louvre', 'distribution': {5: 1}}
+    assert places.get_many(['p1', 'p2', 'p3']) == {'p1': {'name': 'Louvre', 'distribution': {5: 1}},
+                                                   'p2': {'name': 'Orsay'}}
+    assert users.get('p1') == 'not a place'
+
+    places.delete(['p1'])
+    assert places.get('p1') is None
+    assert places.get('p2') == {'name': 'Orsay'}
+
+    places.clear()
+    assert places.get_many(['p1', 'p2']) == {}
+    assert users.get('p1') == 'not a place'
+
+    metrics = cache.metrics()['namespaces']['places']
+    assert metrics['hits'] == 4 and metrics['invalidations'] == 2
+
+
+def test_load_racing_an_invalidation_is_not_stored(cache):
+    stats = cache.namespace('stats')
+
+    def _stale_loader():
+        # A write lands while the old value is being computed
+        stats.delete(['p1'])
+        return 'stale'
+
+    assert stats.get_or_load('p1', _stale_loader) == 'stale'
+    assert stats.get_or_load('p1', lambda: 'fresh') == 'fresh'
+    assert stats.get_or_load('p1', lambda: 'unused') == 'fresh'
+
+
+def test_memory_backend_is_bounded_and_expires(monkeypatch):
+    backend = MemoryCache(max_entries=2)
+    backend.set('a', 1)
+    backend.set('b', 2)
+    backend.get_many(['a'])
+    backend.set('c', 3)
+    assert backend.get_many(['a', 'c'])[0] == 1
+    assert backend.size() == 2
+
+    clock = [100.0]
+    monkeypatch.setattr('app.cache.time.monotonic', lambda: clock[0])
+    backend.set('short', 'value', ttl=5)
+    clock[0] += 6
+    assert backend.get_tokens(['short']) == [None]
+
+
+def test_backend_selection_from_config():
+    assert isinstance(create_cache({'CACHE_BACKEND': 'memory'}).backend, MemoryCache)
+    assert isinstance(create_cache({'CACHE_BACKEND': 'null'}).backend, NullCache)
+    with pytest.raises(ValueError):
+        create_cache({'CACHE_BACKEND': 'redis', 'CACHE_URL': ''})
+    with pytest.raises(ValueError):
+        create_cache({'CACHE_BACKEND': 'memcached'})
+
+    disabled = create_cache({'CACHE_BACKEND': 'null'}).namespace('any')
+    disabled.set('key', 'value')
+    assert disabled.get_or_load('key', lambda: 'loaded') == 'loaded'
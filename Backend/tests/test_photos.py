@@ -9,6 +9,7 @@ import os
 import pytest
 
 from app import create_app, db
+from app.models.photo import Photo
 
 
 @pytest.fixture
@@ -33,6 +34,12 @@ def client(app):
     return app.test_client()
 
 
+def _gif_stream():
+    return io.BytesIO(b'GIF89a\x01\x00\x01\x00\x80\x00\x00\xff\xff\xff'
+                      b'\x00\x00\x00!\xf9\x04\x00\x00\x00\x00\x00,\x00'
+                      b'\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02\x02D\x01\x00;')
+
+
 def _auth_headers(client):
     """Register and login a demo user, returning auth headers."""
     register_payload = {
@@ -69,8 +76,11 @@ def test_photo_upload_without_additional_metadata(client, app, tmp_path):
 
     photo_info = payload['data']
     assert photo_info['file_url']
-    saved_path = os.path.join(app.config['UPLOAD_FOLDER'], photo_info['filename'])
+    saved_path = photo_info['file_path']
     assert os.path.exists(saved_path)
+    # Stored in the sharded layout: <upload>/ab/cd/<filename>
+    filename = photo_info['filename']
+    assert saved_path == os.path.join(app.config['UPLOAD_FOLDER'], filename[:2], filename[2:4], filename)
 
     # Photo should be retrievable via the public file endpoint.
     file_resp = client.get(f"/api/v1/photos/files/{photo_info['filename']}")
@@ -111,3 +121,333 @@ def test_admin_can_delete_foreign_photo(client, app, tmp_path):
     # Photo should no longer exist
     get_resp = client.get(f'/api/v1/photos/{photo_id}')
     assert get_resp.status_code == 404
+
+
+def test_photo_listing_query_count_is_constant(api_client, user_factory, count_queries):
+    """Listing photos prefetches uploaders and reviews instead of querying per photo."""
+    uploaders = [user_factory(email=f'lens{index}@example.com', username=f'lens{index}') for index in range(3)]
+    upload = api_client.post(
+        '/api/v1/photos',
+        data={'photo_file': (_gif_stream(), 'first.gif')},
+        headers=uploaders[0]['headers']
+    )
+    assert upload.status_code == 201
+
+    with count_queries() as statements:
+        api_client.get('/api/v1/photos', query_string={'limit': 100})
+        single = len(statements)
+
+        for uploader in uploaders:
+            for index in range(2):
+                resp = api_client.post(
+                    '/api/v1/photos',
+                    data={'photo_file': (_gif_stream(), f'shot{index}.gif')},
+                    headers=uploader['headers']
+                )
+                assert resp.status_code == 201
+        del statements[:]
+
+        listing = api_client.get('/api/v1/photos', query_string={'limit': 100})
+        assert len(statements) == single
+
+    payload = listing.get_json()
+    assert payload['count'] == 7
+    for photo in payload['photos']:
+        assert photo['user']['username'].startswith('lens')
+        assert photo['file_url'].endswith(f"/api/v1/photos/files/{photo['filename']}")
+
+
+def test_orphaned_photos_are_paged_and_attached_in_bulk(api_client, user_factory):
+    """Orphaned photos page per owner and link to a review in a single request."""
+    owner = user_factory(email='orphans@example.com', username='orphans')
+    stranger = user_factory(email='stranger@example.com', username='stranger')
+
+    uploaded = []
+    for index in range(3):
+        resp = api_client.post(
+            '/api/v1/photos',
+            data={'photo_file': (_gif_stream(), f'loose{index}.gif')},
+            headers=owner['headers']
+        )
+        assert resp.status_code == 201
+        uploaded.append(resp.get_json()['data']['id'])
+    foreign = api_client.post(
+        '/api/v1/photos',
+        data={'photo_file': (_gif_stream(), 'foreign.gif')},
+        headers=stranger['headers']
+    ).get_json()['data']['id']
+
+    first = api_client.get('/api/v1/photos/orphaned', query_string={'limit': 2}, headers=owner['headers'])
+    first_page = first.get_json()
+    assert first_page['count'] == 2 and first_page['next_cursor']
+    second_page = api_client.get(
+        '/api/v1/photos/orphaned',
+        query_string={'limit': 2, 'cursor': first_page['next_cursor']},
+        headers=owner['headers']
+    ).get_json()
+    assert second_page['next_cursor'] is None
+    paged_ids = [photo['id'] for photo in first_page['photos'] + second_page['photos']]
+    assert sorted(paged_ids) == sorted(uploaded)
+
+    place = api_client.post('/api/v1/places', json={
+        'name': 'Attach Place', 'city': 'Lyon', 'country': 'France',
+        'latitude': 45.76, 'longitude': 4.84,
+    }, headers=owner['headers']).get_json()['data']
+    review = api_client.post('/api/v1/reviews', json={
+        'title': 'Attach test', 'content': 'Photos were uploaded before the review existed.',
+        'rating': 4, 'summary': 'Linked later.', 'place_id': place['id'],
+    }, headers=owner['headers']).get_json()['data']['review']
+
+    denied = api_client.post('/api/v1/photos/attach', json={
+        'review_id': review['id'], 'photo_ids': [foreign]
+    }, headers=stranger['headers'])
+    assert denied.status_code == 403
+
+    for malformed in ([{'a': 1}], [uploaded[0], ''], [None], [7]):
+        rejected = api_client.post('/api/v1/photos/attach', json={
+            'review_id': review['id'], 'photo_ids': malformed
+        }, headers=owner['headers'])
+        assert rejected.status_code == 400
+
+    attached = api_client.post('/api/v1/photos/attach', json={
+        'review_id': review['id'], 'photo_ids': uploaded + [foreign]
+    }, headers=owner['headers'])
+    assert attached.status_code == 200
+    assert attached.get_json()['data']['attached'] == 3
+
+    remaining = api_client.get('/api/v1/photos/orphaned', headers=owner['headers']).get_json()
+    assert remaining['count'] == 0
+    review_photos = api_client.get('/api/v1/photos', query_string={'review_id': review['id']}).get_json()
+    assert sorted(photo['id'] for photo in review_photos['photos']) == sorted(uploaded)
+    stranger_orphans = api_client.get('/api/v1/photos/orphaned', headers=stranger['headers']).get_json()
+    assert [photo['id'] for photo in stranger_orphans['photos']] == [foreign]
+
+
+def test_upload_generates_bounded_renditions(api_app, api_client, user_factory):
+    """Uploads get WebP and JPEG renditions next to the original; deleting removes them."""
+    Image = pytest.importorskip('PIL.Image')
+    owner = user_factory(email='renditions@example.com', username='renditions')
+
+    buffer = io.BytesIO()
+    Image.new('RGB', (2400, 1200), (30, 120, 200)).save(buffer, 'JPEG')
+    buffer.seek(0)
+    resp = api_client.post('/api/v1/photos', data={'photo_file': (buffer, 'wide.jpg')},
+                           headers=owner['headers'])
+    assert resp.status_code == 201
+    photo = resp.get_json()['data']
+
+    assert set(photo['renditions']) == {'thumb', 'medium', 'large'}
+    upload_dir = api_app.config['UPLOAD_FOLDER']
+    expected_edges = {'thumb': 320, 'medium': 800, 'large': 1600}
+    for size_name, urls in photo['renditions'].items():
+        assert set(urls) == {'webp', 'jpeg'}
+        for url in urls.values():
+            path = os.path.join(os.path.dirname(photo['file_path']), url.rsplit('/', 1)[1])
+            with Image.open(path) as rendition:
+                assert max(rendition.size) == expected_edges[size_name]
+        served = api_client.get(urls['webp'].split('localhost', 1)[1])
+        assert served.status_code == 200
+        served.close()
+
+    listed = api_client.get('/api/v1/photos', query_string={'user_id': owner['user']['id']}).get_json()
+    assert listed['photos'][0]['renditions'] == photo['renditions']
+
+    api_client.delete(f"/api/v1/photos/{photo['id']}", headers=owner['headers'])
+    assert os.listdir(upload_dir) == ['.blob.lock']
+
+
+def test_identical_uploads_share_one_blob(api_app, api_client, user_factory):
+    """Re-uploading the same bytes reuses the stored file until its last photo is deleted."""
+    import hashlib
+
+    first_user = user_factory(email='blob1@example.com', username='blobone')
+    second_user = user_factory(email='blob2@example.com', username='blobtwo')
+    upload_dir = api_app.config['UPLOAD_FOLDER']
+    content = _gif_stream().getvalue()
+
+    photos = []
+    for user, name in ((first_user, 'retry.gif'), (first_user, 'retry-again.GIF'), (second_user, 'copy.gif')):
+        resp = api_client.post('/api/v1/photos', data={'photo_file': (io.BytesIO(content), name)},
+                               headers=user['headers'])
+        assert resp.status_code == 201
+        photos.append(resp.get_json()['data'])
+
+    expected_name = f"{hashlib.sha256(content).hexdigest()}.gif"
+    assert {photo['filename'] for photo in photos} == {expected_name}
+    assert {photo['file_path'] for photo in photos} == {
+        os.path.join(upload_dir, expected_name[:2], expected_name[2:4], expected_name)
+    }
+    blob_dir = os.path.dirname(photos[0]['file_path'])
+    assert [name for name in os.listdir(blob_dir) if name.endswith('.gif')] == [expected_name]
+    assert not [name for name in os.listdir(upload_dir) if name.endswith('.tmp')]
+
+    api_client.delete(f"/api/v1/photos/{photos[0]['id']}", headers=first_user['headers'])
+    api_client.delete(f"/api/v1/photos/{photos[2]['id']}", headers=second_user['headers'])
+    assert os.path.exists(os.path.join(blob_dir, expected_name))
+    assert api_client.get(photos[1]['file_url'].split('localhost', 1)[1]).status_code == 200
+
+    api_client.delete(f"/api/v1/photos/{photos[1]['id']}", headers=first_user['headers'])
+    assert os.listdir(upload_dir) == ['.blob.lock']
+
+
+def test_photo_files_are_immutable_ranged_and_offloadable(api_app, api_client, user_factory):
+    """Photo files cache forever, honour Range requests and can be handed to the web server."""
+    user = user_factory(email='files@example.com', username='fileserver')
+    content = _gif_stream().getvalue()
+    resp = api_client.post('/api/v1/photos', data={'photo_file': (io.BytesIO(content), 'range.gif')},
+                           headers=user['headers'])
+    filename = resp.get_json()['data']['filename']
+    url = f'/api/v1/photos/files/{filename}'
+
+    full = api_client.get(url)
+    assert full.status_code == 200
+    assert full.data == content
+    assert full.headers['Cache-Control'] == 'public, max-age=31536000, immutable'
+
+    partial = api_client.get(url, headers={'Range': 'bytes=0-5'})
+    assert partial.status_code == 206
+    assert partial.data == content[:6]
+    assert partial.headers['Content-Range'] == f'bytes 0-5/{len(content)}'
+
+    revalidated = api_client.get(url, headers={'If-None-Match': full.headers['ETag']})
+    assert revalidated.status_code == 304
+
+    assert api_client.get('/api/v1/photos/files/missing.gif').status_code == 404
+    assert api_client.get('/api/v1/photos/files/..%2Fconfig.py').status_code == 404
+
+    api_app.config.update(PHOTO_DELIVERY='x-accel-redirect', PHOTO_ACCEL_REDIRECT_PREFIX='/internal-uploads/')
+    accel = api_client.get(url)
+    assert accel.status_code == 200
+    assert accel.data == b''
+    assert accel.headers['X-Accel-Redirect'] == f'/internal-uploads/{filename[:2]}/{filename[2:4]}/{filename}'
+    assert accel.headers['Content-Type'] == 'image/gif'
+    assert accel.headers['Cache-Control'] == 'public, max-age=31536000, immutable'
+
+    api_app.config.update(PHOTO_DELIVERY='x-sendfile')
+    sendfile = api_client.get(url)
+    assert sendfile.status_code == 200
+    assert sendfile.headers['X-Sendfile'] == resp.get_json()['data']['file_path']
+
+
+def test_flat_uploads_are_served_and_migrated_to_sharded_layout(api_app, api_client, user_factory):
+    """Files stored before sharding keep working and the migration moves them with their renditions."""
+    import shutil
+
+    from click.testing import CliRunner
+
+    from app.models import Photo
+
+    user = user_factory(email='layout@example.com', username='layout')
+    resp = api_client.post('/api/v1/photos', data={'photo_file': (_gif_stream(), 'legacy.gif')},
+                           headers=user['headers'])
+    photo = resp.get_json()['data']
+    upload_dir = api_app.config['UPLOAD_FOLDER']
+    filename = photo['filename']
+    rendition_names = [name for files in (photo['renditions'] or {}).values() for name in
+                       (url.rsplit('/', 1)[1] for url in files.values())]
+
+    # Simulate a pre-sharding upload: file and renditions flat in the upload folder
+    sharded_dir = os.path.dirname(photo['file_path'])
+    for name in [filename] + rendition_names:
+        shutil.move(os.path.join(sharded_dir, name), os.path.join(upload_dir, name))
+    shutil.rmtree(os.path.join(upload_dir, filename[:2]))
+    with api_app.app_context():
+        from app import db
+        db.session.execute(db.update(Photo).values(file_path=os.path.join(upload_dir, filename)))
+        db.session.commit()
+
+    assert api_client.get(f'/api/v1/photos/files/{filename}').status_code == 200
+
+    runner = CliRunner()
+    result = runner.invoke(api_app.cli, ['migrate-upload-layout', '--batch-size', '1'])
+    assert result.exit_code == 0, result.output
+    assert 'Moved 1 file(s), updated 1 photo(s), 0 file(s) missing' in result.output
+    assert sorted(os.listdir(upload_dir)) == ['.blob.lock', filename[:2]]
+    assert sorted(os.listdir(sharded_dir)) == sorted([filename] + rendition_names)
+    with api_app.app_context():
+        assert Photo.query.one().file_path == os.path.join(sharded_dir, filename)
+
+    # Re-running is a no-op
+    rerun = runner.invoke(api_app.cli, ['migrate-upload-layout'])
+    assert 'Moved 0 file(s), updated 0 photo(s)' in rerun.output
+    assert api_client.get(f'/api/v1/photos/files/{filename}').status_code == 200
+
+    api_client.delete(f"/api/v1/photos/{photo['id']}", headers=user['headers'])
+    assert os.listdir(upload_dir) == ['.blob.lock']
+
+
+def test_blob_deletion_waits_for_other_process_lock(api_app, api_client, user_factory):
+    """The last-reference check and unlink are excluded by the upload folder's flock."""
+    import fcntl
+    import threading
+
+    from app.services.photo_service import PhotoService
+
+    uploader = user_factory(email='locked@example.com', username='locked')
+    photo = api_client.post('/api/v1/photos', data={'photo_file': (_gif_stream(), 'locked.gif')},
+                            headers=uploader['headers']).get_json()['data']
+    with api_app.app_context():
+        db.session.execute(db.delete(Photo).where(Photo.id == photo['id']))
+        db.session.commit()
+
+    finished = threading.Event()
+
+    def _drain():
+        with api_app.app_context():
+            PhotoService().delete_queued_file(photo['filename'], photo['file_path'])
+        finished.set()
+
+    # A separate open file description stands in for another worker process
+    with open(os.path.join(api_app.config['UPLOAD_FOLDER'], '.blob.lock'), 'a') as lock_file:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        drain = threading.Thread(target=_drain)
+        drain.start()
+        assert not finished.wait(0.3)
+        assert os.path.exists(photo['file_path'])
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+    drain.join(5)
+    assert finished.is_set()
+    assert not os.path.exists(photo['file_path'])
+
+
+def test_failed_blob_publish_removes_the_photo_row(api_app, api_client, user_factory, monkeypatch):
+    """A blob that cannot be stored does not leave a committed row behind."""
+    import errno
+
+    from app.services.photo_service import PhotoService
+
+    def _disk_full(self, temp_path, destination, renditions=None):
+        raise OSError(errno.ENOSPC, 'No space left on device')
+    monkeypatch.setattr(PhotoService, '_publish_blob', _disk_full)
+
+    uploader = user_factory(email='full@example.com', username='fulldisk')
+    resp = api_client.post('/api/v1/photos', data={'photo_file': (_gif_stream(), 'full.gif')},
+                           headers=uploader['headers'])
+    assert resp.status_code == 500
+    with api_app.app_context():
+        assert Photo.query.count() == 0
+    assert not [name for name in os.listdir(api_app.config['UPLOAD_FOLDER']) if name.endswith('.tmp')]
+
+
+def test_inherited_renditions_are_regenerated_when_missing(api_app, api_client, user_factory):
+    """A re-upload does not inherit rendition files that a concurrent deletion already removed."""
+    Image = pytest.importorskip('PIL.Image')
+    owner = user_factory(email='inherit@example.com', username='inherit')
+    buffer = io.BytesIO()
+    Image.new('RGB', (900, 600), (200, 40, 40)).save(buffer, 'JPEG')
+    content = buffer.getvalue()
+
+    first = api_client.post('/api/v1/photos', data={'photo_file': (io.BytesIO(content), 'red.jpg')},
+                            headers=owner['headers']).get_json()['data']
+    directory = os.path.dirname(first['file_path'])
+    rendition_paths = [os.path.join(directory, url.rsplit('/', 1)[1])
+                       for urls in first['renditions'].values() for url in urls.values()]
+    # As left by the drain removing the blob between the renditions lookup and the publish
+    for path in rendition_paths + [first['file_path']]:
+        os.remove(path)
+
+    second = api_client.post('/api/v1/photos', data={'photo_file': (io.BytesIO(content), 'red-again.jpg')},
+                             headers=owner['headers'])
+    assert second.status_code == 201
+    assert set(second.get_json()['data']['renditions']) == set(first['renditions'])
+    assert all(os.path.isfile(path) for path in rendition_paths)
@@ -3,6 +3,10 @@
 Integration tests for places endpoints.
 """
 
+import math
+
+from app import db
+
 
 def _create_place(client, headers, **overrides):
     payload = {
@@ -131,3 +135,141 @@ def test_place_validation_and_reviews_listing(api_client, user_factory):
 
     missing_place_reviews = api_client.get('/api/v1/places/bad-id/reviews')
     assert missing_place_reviews.status_code == 404
+
+
+def test_place_listing_statistics_come_from_aggregates(api_client, user_factory, count_queries):
+    """Place cards read review stats from the place row instead of querying reviews."""
+    reviewers = [user_factory(email=f'critic{index}@example.com', username=f'critic{index}') for index in range(3)]
+    first, _ = _create_place(api_client, reviewers[0]['headers'], name='Louvre', city='Paris', country='France')
+    second, _ = _create_place(api_client, reviewers[0]['headers'], name='Orsay', city='Paris', country='France')
+    _create_place(api_client, reviewers[0]['headers'], name='Pompidou', city='Paris', country='France')
+    for reviewer, rating in zip(reviewers, (5, 4, 2)):
+        _create_review(api_client, reviewer['headers'], place_id=first['id'], rating=rating)
+    _create_review(api_client, reviewers[0]['headers'], place_id=second['id'], rating=3)
+
+    with count_queries() as statements:
+        resp = api_client.get('/api/v1/places', query_string={'city': 'Paris'})
+
+    assert resp.status_code == 200
+    # One change-marker query for the ETag, one for the page
+    assert len(statements) == 2
+    places = {place['name']: place for place in resp.get_json()['places']}
+    assert places['Louvre']['review_count'] == 3
+    assert places['Louvre']['average_rating'] == 11 / 3
+    assert places['Orsay']['review_count'] == 1
+    assert places['Orsay']['average_rating'] == 3.0
+    assert places['Pompidou']['review_count'] == 0
+    assert places['Pompidou']['average_rating'] is None
+
+
+def test_recompute_aggregates_command_repairs_drift(api_app, api_client, user_factory):
+    """The repair command rebuilds place aggregates from the reviews table."""
+    from app.models.place import Place
+
+    author = user_factory(email='fixer@example.com', username='fixer')
+    place, _ = _create_place(api_client, author['headers'], name='Drifted Place')
+    _create_review(api_client, author['headers'], place_id=place['id'], rating=4)
+
+    with api_app.app_context():
+        drifted = db.session.get(Place, place['id'])
+        drifted.review_count = 7
+        drifted.rating_sum = 2
+        drifted.rating_4_count = 0
+        db.session.commit()
+
+    result = api_app.test_cli_runner().invoke(args=['recompute-aggregates'])
+    assert result.exit_code == 0, result.output
+    assert 'Recomputed rating aggregates for 1 place(s)' in result.output
+
+    stats = api_client.get(f"/api/v1/reviews/statistics/{place['id']}").get_json()['data']
+    assert stats['total_reviews'] == 1
+    assert stats['average_rating'] == 4.0
+    assert stats['rating_distribution']['4'] == 1
+
+
+def test_nearby_places_are_nearest_first(api_client, user_factory):
+    """Nearby search returns the closest places within the radius, sorted by distance."""
+    author = user_factory(email='walker@example.com', username='walker')
+    origin_lat, origin_lon = 45.7640, 4.8357
+    offsets = [
+        ('Far', 0.08),      # ~8.9 km north
+        ('Near', 0.005),    # ~0.6 km north
+        ('Middle', 0.03),   # ~3.3 km north
+        ('Outside', 0.2),   # ~22 km north
+    ]
+    for name, offset in offsets:
+        _create_place(api_client, author['headers'], name=name, city='Lyon', country='France',
+                      latitude=origin_lat + offset, longitude=origin_lon)
+    # A place across the date line must not break cell expansion
+    _create_place(api_client, author['headers'], name='Elsewhere', city='Suva', country='Fiji',
+                  latitude=-18.14, longitude=178.44)
+
+    resp = api_client.get('/api/v1/places/nearby', query_string={
+        'lat': origin_lat, 'lon': origin_lon, 'radius': 10, 'limit': 2
+    })
+    assert resp.status_code == 200
+    places = resp.get_json()['places']
+    assert [place['name'] for place in places] == ['Near', 'Middle']
+    assert places[0]['distance_km'] < places[1]['distance_km']
+
+    everything = api_client.get('/api/v1/places/nearby', query_string={
+        'lat': origin_lat, 'lon': origin_lon, 'radius': 10
+    }).get_json()['places']
+    assert [place['name'] for place in everything] == ['Near', 'Middle', 'Far']
+
+    worldwide = api_client.get('/api/v1/places/nearby', query_string={
+        'lat': origin_lat, 'lon': origin_lon, 'radius': 20000, 'limit': 10
+    }).get_json()['places']
+    assert [place['name'] for place in worldwide][-1] == 'Elsewhere'
+    assert len(worldwide) == 5
+
+
+def test_place_reads_answer_conditional_requests(api_client, user_factory, count_queries):
+    """Unchanged listings return 304 from the change marker alone; writes change the ETag."""
+    user = user_factory(email='etag@example.com', username='etag')
+    place, _ = _create_place(api_client, user['headers'], name='Bastille', city='Paris', country='France')
+
+    first = api_client.get('/api/v1/places')
+    etag = first.headers['ETag']
+    assert first.status_code == 200 and etag
+    # Dates cannot see deletes or same-second writes, so only the ETag validates
+    assert 'Last-Modified' not in first.headers
+
+    with count_queries() as statements:
+        cached = api_client.get('/api/v1/places', headers={'If-None-Match': etag})
+    assert cached.status_code == 304
+    assert cached.get_data() == b''
+    assert cached.headers['ETag'] == etag
+    assert len(statements) == 1
+
+    by_date = api_client.get('/api/v1/places', headers={'If-Modified-Since': 'Fri, 01 Jan 2100 00:00:00 GMT'})
+    assert by_date.status_code == 200
+
+    detail = api_client.get(f"/api/v1/places/{place['id']}")
+    assert detail.headers['ETag'] != etag
+
+    _create_place(api_client, user['headers'], name='Marais', city='Paris', country='France')
+    refreshed = api_client.get('/api/v1/places', headers={'If-None-Match': etag})
+    assert refreshed.status_code == 200
+    assert refreshed.get_json()['count'] == 2
+    assert refreshed.headers['ETag'] != etag
+
+    missing = api_client.get('/api/v1/places/unknown', headers={'If-None-Match': etag})
+    assert missing.status_code == 404
+    assert 'ETag' not in missing.headers
+
+
+def test_nearby_search_keeps_places_at_the_edge_of_the_radius(api_client, user_factory):
+    """The bounding box uses the same earth model as the distance check."""
+    from app.models import geohash
+
+    user = user_factory(email='edge@example.com', username='edgecase')
+    # Too wide for any geohash cell, so the bounding box is used; due north, 99.95% of the radius away
+    radius_km = 6000
+    latitude = radius_km * 0.9995 / (math.pi * geohash.EARTH_RADIUS_KM / 180)
+    _create_place(api_client, user['headers'], name='Edge', latitude=latitude, longitude=0.0)
+
+    nearby = api_client.get('/api/v1/places/nearby', query_string={
+        'lat': 0.0, 'lon': 0.0, 'radius': radius_km
+    }).get_json()['places']
+    assert [place['name'] for place in nearby] == ['Edge']
@@ -3,8 +3,12 @@
 Integration tests for the reviews API.
 """
 
+import io
+
 import pytest
 
+from app import db
+
 
 def _create_place(client, headers, **overrides):
     payload = {
@@ -35,6 +39,19 @@ def _create_review(client, headers, place_id, **overrides):
     return response.get_json()['data']
 
 
+def _upload_photo(client, headers, review_id):
+    image_stream = io.BytesIO(b'GIF89a\x01\x00\x01\x00\x80\x00\x00\xff\xff\xff'
+                              b'\x00\x00\x00!\xf9\x04\x00\x00\x00\x00\x00,\x00'
+                              b'\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02\x02D\x01\x00;')
+    response = client.post(
+        '/api/v1/photos',
+        data={'photo_file': (image_stream, 'card.gif'), 'review_id': review_id},
+        headers=headers
+    )
+    assert response.status_code == 201, response.get_json()
+    return response.get_json()['data']
+
+
 def test_review_lifecycle_and_statistics(api_client, user_factory):
     """Full lifecycle: create, update, search, stats, delete."""
     author = user_factory(email='writer@example.com', username='writer')
@@ -200,3 +217,240 @@ def test_review_creation_requires_place_context(api_client, user_factory):
     )
     assert duplicate_review.status_code == 400
     assert 'already reviewed' in duplicate_review.get_json()['error']
+
+
+def test_review_listing_query_count_is_constant(api_client, user_factory, count_queries):
+    """Listing reviews hydrates authors, places and photos in a fixed number of queries."""
+    def _seed(count, offset):
+        for index in range(offset, offset + count):
+            author = user_factory(email=f'card{index}@example.com', username=f'card{index}')
+            place = _create_place(api_client, author['headers'], name=f'Card Place {index}')
+            review = _create_review(api_client, author['headers'], place_id=place['id'])
+            _upload_photo(api_client, author['headers'], review['review']['id'])
+
+    _seed(1, 0)
+    with count_queries() as single:
+        response = api_client.get('/api/v1/reviews')
+    assert response.get_json()['count'] == 1
+
+    _seed(4, 1)
+    with count_queries() as many:
+        response = api_client.get('/api/v1/reviews')
+    payload = response.get_json()
+    assert payload['count'] == 5
+    assert len(many) == len(single)
+
+    card = payload['reviews'][0]
+    assert card['user']['username'].startswith('card')
+    assert card['place']['name'].startswith('Card Place')
+    assert len(card['photos']) == 1
+    assert 'review' not in card['photos'][0]
+    assert card['photos'][0]['user']['id'] == card['user']['id']
+
+
+def test_place_aggregates_follow_review_writes(api_client, user_factory):
+    """Creating, re-rating and deleting reviews keeps place aggregates in sync."""
+    first = user_factory(email='tally1@example.com', username='tally1')
+    second = user_factory(email='tally2@example.com', username='tally2')
+    place = _create_place(api_client, first['headers'], name='Counting House')
+
+    def _stats():
+        response = api_client.get(f"/api/v1/reviews/statistics/{place['id']}")
+        assert response.status_code == 200
+        data = response.get_json()['data']
+        data['rating_distribution'] = {int(k): v for k, v in data['rating_distribution'].items()}
+        return data
+
+    kept = _create_review(api_client, first['headers'], place_id=place['id'], rating=5)
+    removed = _create_review(api_client, second['headers'], place_id=place['id'], rating=2)
+    stats = _stats()
+    assert stats['total_reviews'] == 2
+    assert stats['average_rating'] == 3.5
+    assert stats['rating_distribution'] == {1: 0, 2: 1, 3: 0, 4: 0, 5: 1}
+
+    update_resp = api_client.put(
+        f"/api/v1/reviews/{kept['review']['id']}",
+        json={'rating': 3},
+        headers=first['headers']
+    )
+    assert update_resp.status_code == 200
+    stats = _stats()
+    assert stats['total_reviews'] == 2
+    assert stats['average_rating'] == 2.5
+    assert stats['rating_distribution'] == {1: 0, 2: 1, 3: 1, 4: 0, 5: 0}
+
+    delete_resp = api_client.delete(f"/api/v1/reviews/{removed['review']['id']}", headers=second['headers'])
+    assert delete_resp.status_code == 200
+    stats = _stats()
+    assert stats['total_reviews'] == 1
+    assert stats['average_rating'] == 3.0
+    assert stats['rating_distribution'] == {1: 0, 2: 0, 3: 1, 4: 0, 5: 0}
+
+    listing = api_client.get('/api/v1/places', query_string={'search': 'Counting'}).get_json()
+    assert listing['places'][0]['review_count'] == 1
+    assert listing['places'][0]['average_rating'] == 3.0
+
+
+def test_review_listing_cursor_pagination(api_app, api_client, user_factory):
+    """Cursor pages walk every review exactly once, newest first."""
+    api_app.config['MAX_PAGE_SIZE'] = 3
+    author = user_factory(email='pager@example.com', username='pager')
+    created = []
+    for index in range(5):
+        place = _create_place(api_client, author['headers'], name=f'Paged Place {index}')
+        created.append(_create_review(api_client, author['headers'], place_id=place['id'])['review']['id'])
+
+    seen = []
+    cursor = None
+    pages = 0
+    while True:
+        query = {'limit': 2, 'user_id': author['user']['id']}
+        if cursor:
+            query['cursor'] = cursor
+        payload = api_client.get('/api/v1/reviews', query_string=query).get_json()
+        seen.extend(review['id'] for review in payload['reviews'])
+        pages += 1
+        cursor = payload['next_cursor']
+        if not cursor:
+            break
+    assert pages == 3
+    assert seen == list(reversed(created))
+
+    clamped = api_client.get('/api/v1/reviews', query_string={'limit': 50}).get_json()
+    assert clamped['count'] == 3
+    assert clamped['next_cursor']
+
+    invalid = api_client.get('/api/v1/reviews', query_string={'cursor': 'not-a-cursor'})
+    assert invalid.status_code == 400
+    assert invalid.get_json()['error'] == 'Invalid cursor'
+
+    place_id = place['id']
+    invalid_for_place = api_client.get(f'/api/v1/places/{place_id}/reviews', query_string={'cursor': 'not-a-cursor'})
+    assert invalid_for_place.status_code == 400
+    assert invalid_for_place.get_json()['error'] == 'Invalid cursor'
+    unknown_place = api_client.get('/api/v1/places/missing/reviews')
+    assert unknown_place.status_code == 404
+
+
+def test_review_search_is_ranked_and_prefix_matched(api_app, api_client, user_factory):
+    """Full-text search matches word prefixes and ranks title hits first."""
+    assert api_app.extensions['naya_full_text'] == 'fts5'
+    first = user_factory(email='seeker1@example.com', username='seeker1')
+    second = user_factory(email='seeker2@example.com', username='seeker2')
+    place = _create_place(api_client, first['headers'], name='Alpine Lodge')
+    _create_review(
+        api_client, first['headers'], place_id=place['id'],
+        title='Quiet weekend', content='We went on a long mountain hike before dinner.'
+    )
+    _create_review(
+        api_client, second['headers'], place_id=place['id'],
+        title='Mountain views', content='The terrace looks straight at the glacier.'
+    )
+
+    response = api_client.get('/api/v1/reviews', query_string={'search': 'mount'})
+    titles = [review['title'] for review in response.get_json()['reviews']]
+    assert titles == ['Mountain views', 'Quiet weekend']
+
+    narrowed = api_client.get('/api/v1/reviews', query_string={'search': 'mountain glac'})
+    assert [review['title'] for review in narrowed.get_json()['reviews']] == ['Mountain views']
+
+    places = api_client.get('/api/v1/places/search', query_string={'q': 'alp'}).get_json()
+    assert [place['name'] for place in places['places']] == ['Alpine Lodge']
+
+
+def test_place_statistics_are_cached_until_reviews_change(api_client, user_factory, count_queries):
+    """Statistics are served from the cache and refreshed by review writes."""
+    author = user_factory(email='cached@example.com', username='cached')
+    admin = user_factory(email='admin@example.com', username='admin')
+    place = _create_place(api_client, author['headers'], name='Cached Place')
+    url = f"/api/v1/reviews/statistics/{place['id']}"
+
+    def _metrics():
+        response = api_client.get('/api/v1/admin/metrics', headers=admin['headers'])
+        assert response.status_code == 200
+        return response.get_json()['metrics']['cache']['namespaces']['place_statistics']
+
+    assert api_client.get(url).get_json()['data']['total_reviews'] == 0
+    before = _metrics()
+    with count_queries() as statements:
+        assert api_client.get(url).get_json()['data']['total_reviews'] == 0
+    assert _metrics()['hits'] == before['hits'] + 1
+    # Only the conditional GET change marker reaches the database
+    assert len(statements) == 1
+
+    review = _create_review(api_client, author['headers'], place['id'], rating=4)
+    stats = api_client.get(url).get_json()['data']
+    assert stats['total_reviews'] == 1 and stats['average_rating'] == 4
+
+    api_client.put(f"/api/v1/reviews/{review['review']['id']}", json={'rating': 2}, headers=author['headers'])
+    assert api_client.get(url).get_json()['data']['average_rating'] == 2
+
+    api_client.delete(f"/api/v1/reviews/{review['review']['id']}", headers=author['headers'])
+    assert api_client.get(url).get_json()['data']['total_reviews'] == 0
+    assert _metrics()['invalidations'] >= 3
+
+    denied = api_client.get('/api/v1/admin/metrics', headers=author['headers'])
+    assert denied.status_code == 403
+
+
+def test_review_deletion_queues_photo_files(api_app, api_client, user_factory, monkeypatch, count_queries):
+    """Deleting a review drops its photos in one go and removes unshared files via the deletion queue."""
+    import os
+
+    from click.testing import CliRunner
+
+    from app.models import PendingFileDeletion, Photo
+    from app.services import photo_service
+
+    owner = user_factory(email='purge@example.com', username='purge')
+    admin = user_factory(email='admin@example.com', username='purgeadmin')
+    place = _create_place(api_client, owner['headers'])
+    review = _create_review(api_client, owner['headers'], place['id'])['review']
+    other_place = _create_place(api_client, owner['headers'], name='Second Place')
+    other_review = _create_review(api_client, owner['headers'], other_place['id'])['review']
+
+    photos = []
+    photos.append(_upload_photo(api_client, owner['headers'], review['id']))
+    for index in range(3):
+        # Give each upload distinct bytes (trailing data after the GIF trailer)
+        variant = io.BytesIO(b'GIF89a\x01\x00\x01\x00\x80\x00\x00\xff\xff\xff\x00\x00\x00,\x00\x00\x00\x00'
+                             b'\x01\x00\x01\x00\x00\x02\x02D\x01\x00;' + bytes([index]))
+        resp = api_client.post('/api/v1/photos', data={'photo_file': (variant, f'v{index}.gif'),
+                                                        'review_id': review['id']},
+                               headers=owner['headers'])
+        photos.append(resp.get_json()['data'])
+    shared = _upload_photo(api_client, owner['headers'], other_review['id'])
+    paths = {photo['file_path'] for photo in photos}
+    assert len(paths) == 4 and shared['file_path'] in paths
+
+    with count_queries() as statements:
+        assert api_client.delete(f"/api/v1/reviews/{review['id']}", headers=owner['headers']).status_code == 200
+    assert len([sql for sql in statements if sql.startswith('DELETE FROM photos')]) == 1
+
+    assert os.path.exists(shared['file_path'])
+    assert [path for path in paths - {shared['file_path']} if os.path.exists(path)] == []
+    with api_app.app_context():
+        assert Photo.query.count() == 1
+        assert PendingFileDeletion.query.count() == 0
+
+    # A file that cannot be removed stays queued and is retried later
+    def _refuse(self, file_path, renditions):
+        raise PermissionError('read-only volume')
+    monkeypatch.setattr(photo_service.PhotoService, '_remove_blob', _refuse)
+    assert api_client.delete(f"/api/v1/reviews/{other_review['id']}", headers=owner['headers']).status_code == 200
+    assert os.path.exists(shared['file_path'])
+    with api_app.app_context():
+        entry = PendingFileDeletion.query.one()
+        assert entry.attempts == 1 and 'read-only' in entry.last_error
+    metrics = api_client.get('/api/v1/admin/metrics', headers=admin['headers']).get_json()['metrics']
+    assert metrics['file_deletions'] == {'pending': 1}
+
+    monkeypatch.undo()
+    runner = CliRunner()
+    assert 'Removed 0 file(s)' in runner.invoke(api_app.cli, ['process-file-deletions']).output
+    with api_app.app_context():
+        db.session.execute(db.update(PendingFileDeletion).values(next_attempt_at=entry.created_at))
+        db.session.commit()
+    result = runner.invoke(api_app.cli, ['process-file-deletions'])
+    assert 'Removed 1 file(s), kept 0 still in use, 0 failed' in result.output
+    assert not os.path.exists(shared['file_path'])
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Schema tests: hot lookup paths must be served by indexes.
+"""
+
+import pytest
+from sqlalchemy import inspect, text
+
+from app import db, _ensure_schema_integrity
+from app.models.photo import Photo
+from app.models.place import Place
+from app.models.review import Review
+
+
+def _query_plan(query):
+    """Return SQLite's EXPLAIN QUERY PLAN details for an ORM query."""
+    sql = str(query.statement.compile(dialect=db.engine.dialect, compile_kwargs={'literal_binds': True}))
+    rows = db.session.execute(text(f'EXPLAIN QUERY PLAN {sql}')).all()
+    return ' | '.join(row[-1] for row in rows)
+
+
+@pytest.mark.parametrize('build_query, index_name', [
+    (lambda: Review.query.filter_by(place_id='p').order_by(Review.created_at.desc()),
+     'ix_reviews_place_id_created_at'),
+    (lambda: Review.query.filter_by(user_id='u').order_by(Review.created_at.desc()),
+     'ix_reviews_user_id_created_at'),
+    (lambda: Photo.query.filter_by(review_id='r').order_by(Photo.created_at.desc()),
+     'ix_photos_review_id_created_at'),
+    (lambda: Photo.query.filter_by(user_id='u').order_by(Photo.created_at.desc()),
+     'ix_photos_user_id_created_at'),
+    (lambda: Place.query.filter_by(name='n', city='c', country='k'),
+     'ix_places_name_city_country'),
+    (lambda: Place.query.filter_by(city='c'), 'ix_places_city'),
+    (lambda: Place.query.filter_by(country='k'), 'ix_places_country'),
+])
+def test_hot_queries_use_indexes(api_app, build_query, index_name):
+    with api_app.app_context():
+        plan = _query_plan(build_query())
+    assert index_name in plan
+    assert 'USE TEMP B-TREE' not in plan
+
+
+def test_schema_upgrade_creates_missing_indexes(api_app):
+    with api_app.app_context():
+        db.session.execute(text('DROP INDEX ix_reviews_place_id_created_at'))
+        db.session.commit()
+
+        _ensure_schema_integrity()
+
+        index_names = {index['name'] for index in inspect(db.engine).get_indexes('reviews')}
+        assert 'ix_reviews_place_id_created_at' in index_names
+
+
+def test_schema_upgrade_backfills_normalized_user_columns(api_app):
+    with api_app.app_context():
+        for column in ('email_normalized', 'username_normalized'):
+            db.session.execute(text(f'DROP INDEX ix_users_{column}'))
+            db.session.execute(text(f'ALTER TABLE users DROP COLUMN {column}'))
+        for user_id, email, username, created_at in (
+            ('u1', 'Ana@Example.com', 'Ana', '2024-01-01'),
+            ('u2', 'ana@example.com', 'ana_b', '2024-02-01'),
+        ):
+            db.session.execute(text(
+                'INSERT INTO users (id, email, username, password_hash, is_active, is_verified, is_admin, '
+                'created_at, updated_at) VALUES (:id, :email, :username, \'x\', 1, 0, 0, :created_at, :created_at)'
+            ), {'id': user_id, 'email': email, 'username': username, 'created_at': created_at})
+        db.session.commit()
+
+        _ensure_schema_integrity()
+
+        rows = db.session.execute(text(
+            'SELECT id, email_normalized, username_normalized FROM users ORDER BY id'
+        )).all()
+        # The newer account whose email only differs in case is left for exact matches
+        assert [tuple(row) for row in rows] == [('u1', 'ana@example.com', 'ana'), ('u2', None, 'ana_b')]
+        unique_indexes = {index['name'] for index in inspect(db.engine).get_indexes('users') if index['unique']}
+        assert {'ix_users_email_normalized', 'ix_users_username_normalized'} <= unique_indexes
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Tests for the compiled model serializers.
+"""
+
+from datetime import date
+
+import pytest
+
+from app import db
+from app.models.place import Place
+from app.models.review import Review
+from app.models.serializer import serializer_for
+from app.models.user import PUBLIC_FIELDS, User
+
+
+def test_to_dict_is_column_driven(api_app):
+    """Serialisation covers every column, formats dates and leaves out private columns."""
+    with api_app.app_context():
+        user = User(email='cols@example.com', username='cols', password='Password123!')
+        place = Place(name='Harbour', city='Porto', country='Portugal', latitude=41.14, longitude=-8.61)
+        db.session.add_all([user, place])
+        db.session.flush()
+        review = Review(title='Sunset', content='Watching the boats come in.', rating=5,
+                        visit_date=date(2024, 6, 1), user_id=user.id, place_id=place.id)
+        db.session.add(review)
+        db.session.commit()
+
+        # Committed instances are expired; serialising reloads them instead of returning {}
+        user_data = user.to_dict()
+        assert 'password_hash' not in user_data
+        assert user_data['is_admin'] is False and user_data['email'] == 'cols@example.com'
+        assert set(user.to_public_dict()) == set(PUBLIC_FIELDS)
+
+        place_data = place.to_dict()
+        assert place_data['review_count'] == 0
+        assert 'rating_sum' not in place_data and 'rating_5_count' not in place_data
+
+        review_data = review.to_dict()
+        assert review_data['visit_date'] == '2024-06-01'
+        assert review_data['created_at'] == review.created_at.isoformat()
+
+
+def test_serializers_are_cached_per_field_subset():
+    assert serializer_for(Review) is serializer_for(Review)
+    subset = serializer_for(Review, ('id', 'rating'))
+    assert subset is serializer_for(Review, ['id', 'rating'])
+    assert subset.fields == ('id', 'rating')
+    with pytest.raises(ValueError):
+        serializer_for(Review, ('id', 'author'))